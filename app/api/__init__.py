@@ -1,3 +1,10 @@
 from .trucks import trucks_router
 from .truck_models import truck_models_router
+from .admin import admin_router
+from .metrics import metrics_router
+from .imports import import_router
+from .jobs import jobs_router
+from .changes import changes_router
+from .fleet import fleet_router
+from .dispatch import dispatch_router
 from .response_api import api_response
\ No newline at end of file
@@ -0,0 +1,210 @@
+from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from .response_api import api_response
+from app.config import settings
+from app.core.admission import admission
+from app.core.fleet_state import fleet_state
+from app.core.profiling import profile_store
+from app.core.singleflight import read_coalescer
+from app.db.slow_queries import slow_query_log
+from app.db.writer import group_writer
+from app.dependencies import verify_admin_access
+from app.schemas.http_response import ResponseSchema, ErrorResponseSchema
+from app.utils.tracing import exporter as trace_exporter
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["Служебные"],
+    dependencies=[Depends(verify_admin_access)],
+)
+
+
+# ──── SINGLE-FLIGHT ────
+@admin_router.get(
+    "/coalescing",
+    response_model=ResponseSchema,
+    summary="Статистика объединения одинаковых запросов на чтение",
+)
+async def get_coalescing_stats():
+    return api_response.success(data=read_coalescer.stats())
+
+
+# ──── ГРУППОВАЯ ФИКСАЦИЯ ────
+@admin_router.get(
+    "/group-commit",
+    response_model=ResponseSchema,
+    summary="Статистика групповой фиксации изменяющих операций",
+)
+async def get_group_commit_stats():
+    return api_response.success(data=group_writer.stats())
+
+
+# ──── КОНТРОЛЬ ДОПУСКА ────
+@admin_router.get(
+    "/admission",
+    response_model=ResponseSchema,
+    summary="Контроль допуска: занятые места и очереди по классам запросов, ожидание пула, отказы",
+)
+async def get_admission_stats():
+    return api_response.success(data=admission.status())
+
+
+# ──── СОСТОЯНИЕ ПАРКА В ПАМЯТИ ────
+def _fleet_state_disabled():
+    return api_response.error(
+        error="Состояние парка отключено",
+        message="Включите fleet_state__enabled",
+        status_code=status.HTTP_409_CONFLICT,
+    )
+
+
+@admin_router.get(
+    "/fleet-state",
+    response_model=ResponseSchema,
+    summary="Состояние парка в памяти: размер, позиция в журнале, обновления, память",
+)
+async def get_fleet_state():
+    return api_response.success(data=fleet_state.status())
+
+
+@admin_router.post(
+    "/fleet-state/verify",
+    response_model=ResponseSchema,
+    responses={409: {"model": ErrorResponseSchema}},
+    summary="Сверить состояние парка в памяти с БД",
+)
+async def verify_fleet_state():
+    if not settings.fleet_state.enabled:
+        return _fleet_state_disabled()
+    return api_response.success(data=await fleet_state.verify())
+
+
+@admin_router.post(
+    "/fleet-state/reload",
+    response_model=ResponseSchema,
+    responses={409: {"model": ErrorResponseSchema}},
+    summary="Перезагрузить состояние парка из БД",
+)
+async def reload_fleet_state():
+    if not settings.fleet_state.enabled:
+        return _fleet_state_disabled()
+    await fleet_state.load()
+    return api_response.success(data=fleet_state.status())
+
+
+def _profile_not_found(profile_id: str):
+    return api_response.error(
+        error="Профиль не найден",
+        message=f"Профиль {profile_id} не найден или уже удален",
+        status_code=status.HTTP_404_NOT_FOUND,
+    )
+
+
+# ──── ПРОФИЛИ ЗАПРОСОВ ────
+@admin_router.get(
+    "/profiles",
+    response_model=ResponseSchema,
+    summary="Список последних профилей запросов",
+)
+async def list_profiles():
+    return api_response.success(data=profile_store.list())
+
+
+@admin_router.get(
+    "/profiles/{profile_id}",
+    responses={
+        200: {"content": {"application/octet-stream": {}}},
+        404: {"model": ErrorResponseSchema},
+    },
+    summary="Скачать профиль запроса (pstats)",
+)
+async def download_profile(profile_id: str = Path(default=...)):
+    if not profile_store.exists(profile_id):
+        return _profile_not_found(profile_id)
+
+    return FileResponse(
+        profile_store.pstats_path(profile_id),
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.pstats",
+    )
+
+
+@admin_router.get(
+    "/profiles/{profile_id}/summary",
+    response_class=PlainTextResponse,
+    responses={404: {"model": ErrorResponseSchema}},
+    summary="Сводка профиля: самые дорогие функции",
+)
+async def get_profile_summary(
+        profile_id: str = Path(default=...),
+        sort: str = Query(default="cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+        limit: int = Query(default=40, ge=1, le=500),
+):
+    if not profile_store.exists(profile_id):
+        return _profile_not_found(profile_id)
+
+    return PlainTextResponse(profile_store.summary(profile_id, sort=sort, limit=limit))
+
+
+@admin_router.get(
+    "/profiles/{profile_id}/memory",
+    response_class=PlainTextResponse,
+    responses={404: {"model": ErrorResponseSchema}},
+    summary="Разница выделений памяти (tracemalloc) за время запроса",
+)
+async def get_profile_memory(profile_id: str = Path(default=...)):
+    if not profile_store.exists(profile_id) or not profile_store.memory_path(profile_id).exists():
+        return _profile_not_found(profile_id)
+
+    return PlainTextResponse(profile_store.memory_path(profile_id).read_text(encoding="utf-8"))
+
+
+# ──── ТРАССИРОВКИ ────
+@admin_router.get(
+    "/traces",
+    response_model=ResponseSchema,
+    summary="Последние трассировки из кольцевого буфера",
+)
+async def list_traces(limit: int = Query(default=50, ge=1, le=500)):
+    return api_response.success(data=trace_exporter.traces(limit))
+
+
+@admin_router.get(
+    "/traces/{trace_id}",
+    response_model=ResponseSchema,
+    responses={404: {"model": ErrorResponseSchema}},
+    summary="Участки трассировки",
+)
+async def get_trace(trace_id: str = Path(default=...)):
+    spans = trace_exporter.trace(trace_id.lower())
+    if not spans:
+        return api_response.error(
+            error="Трассировка не найдена",
+            message=f"Трассировка {trace_id} отсутствует в буфере",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    return api_response.success(data=spans)
+
+
+# ──── МЕДЛЕННЫЕ ЗАПРОСЫ ────
+@admin_router.get(
+    "/slow-queries",
+    response_model=ResponseSchema,
+    summary="Медленные SQL-запросы, агрегированные по отпечатку",
+)
+async def list_slow_queries(table_scan_only: bool = Query(default=False, description="Только запросы с полным просмотром таблицы")):
+    entries = slow_query_log.entries()
+    if table_scan_only:
+        entries = [entry for entry in entries if entry["table_scan"]]
+    return api_response.success(data=entries)
+
+
+@admin_router.delete(
+    "/slow-queries",
+    response_model=ResponseSchema,
+    summary="Очистить журнал медленных запросов",
+)
+async def reset_slow_queries():
+    slow_query_log.reset()
+    return api_response.success(data=None)
@@ -0,0 +1,55 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+
+from .response_api import api_response
+from .routing import ApiRoute
+from app.config import settings
+from app.schemas import ChangeSchema
+from app.schemas.http_response import ResponseSchema, ErrorResponseSchema, ChangeFeedGoneError
+from app.services import ChangesService
+from app.dependencies import get_changes_service
+
+changes_router = APIRouter(
+    prefix="/changes",
+    tags=["Журнал изменений"],
+    route_class=ApiRoute,
+)
+
+
+# ──── READ ────
+@changes_router.get(
+    "",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        410: {"model": ErrorResponseSchema},
+    },
+    summary="Изменения самосвалов и моделей после позиции since",
+    description=(
+        "Записи create/update несут состояние записи целиком — применяйте их как UPSERT по ID, "
+        "delete — как удаление. Пока has_more, запрашивайте снова с since=next_since. "
+        "Первичная синхронизация: запомнить last_seq, загрузить полные списки, затем читать "
+        "изменения с since=last_seq. Ответ 410 — позиция удалена сжатием журнала, "
+        "нужна полная синхронизация."
+    ),
+)
+async def list_changes(
+    since: int = Query(default=0, ge=0, description="Последний обработанный номер изменения"),
+    limit: int = Query(default=1000, ge=1, le=settings.changes.max_page, description="Записей в ответе"),
+    entity: Optional[Literal["truck", "model"]] = Query(default=None, description="Только самосвалы или модели"),
+    service: ChangesService = Depends(get_changes_service),
+):
+    try:
+        page = await service.get_changes(since, limit, entity)
+        return api_response.success(data={
+            **page,
+            "changes": [ChangeSchema.model_validate(entry) for entry in page["changes"]],
+        })
+
+    except ChangeFeedGoneError as e:
+        return api_response.error(
+            error="Нужна полная синхронизация",
+            message=str(e),
+            status_code=status.HTTP_410_GONE,
+        )
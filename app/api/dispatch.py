@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, status
+
+from .fleet import DATA_SOURCE_HEADER
+from .response_api import api_response
+from .routing import ApiRoute
+from app.config import settings
+from app.dependencies import get_truck_service
+from app.schemas import DispatchRequestSchema
+from app.schemas.http_response import ResponseSchema, ErrorResponseSchema
+from app.services import TruckService
+
+dispatch_router = APIRouter(
+    prefix="/dispatch",
+    tags=["Диспетчеризация"],
+    route_class=ApiRoute,
+)
+
+
+# ──── OPTIMIZE ────
+@dispatch_router.post(
+    "/optimize",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        422: {"model": ErrorResponseSchema},
+    },
+    summary="Распределить ожидающие погрузки грузы по самосвалам",
+    description=(
+        "Грузы назначаются самосвалам без перегруза с учетом текущего веса и резерва грузоподъемности, "
+        "от тяжелых к легким — в самосвал с наименьшим подходящим свободным местом, чтобы недогруз "
+        "задействованных самосвалов был минимальным. Перегруженные самосвалы не участвуют. "
+        "Грузы, которым не нашлось места или до которых не дошла очередь за time_limit, "
+        "перечислены в unassigned с причиной. План не сохраняется и вес самосвалов не изменяет."
+    ),
+)
+async def optimize_dispatch(
+    request: DispatchRequestSchema,
+    truck_service: TruckService = Depends(get_truck_service),
+):
+    if len(request.loads) > settings.dispatch.max_loads:
+        return api_response.error(
+            error="Слишком много грузов",
+            message=f"Не больше {settings.dispatch.max_loads} грузов за один запрос",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    plan, source = await truck_service.plan_dispatch(request)
+    return api_response.success(data=plan, headers={DATA_SOURCE_HEADER: source})
@@ -0,0 +1,75 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from .response_api import api_response
+from .routing import ApiRoute
+from app.schemas.http_response import ResponseSchema
+from app.services import FleetService
+from app.dependencies import get_fleet_service
+
+fleet_router = APIRouter(
+    prefix="/fleet",
+    tags=["Парк"],
+    route_class=ApiRoute,
+)
+
+# Источник ответа: состояние в памяти или запрос к БД (пока состояние не загружено)
+DATA_SOURCE_HEADER = "X-Data-Source"
+
+
+# ──── READ ────
+@fleet_router.get(
+    "/summary",
+    response_model=ResponseSchema,
+    summary="Сводка по моделям: самосвалы, перегруженные, суммарный вес, средняя загрузка",
+)
+async def get_fleet_summary(service: FleetService = Depends(get_fleet_service)):
+    summary, source = await service.get_summary()
+    return api_response.success(data=summary, headers={DATA_SOURCE_HEADER: source})
+
+
+@fleet_router.get(
+    "/trucks",
+    response_model=ResponseSchema,
+    summary="Самосвалы с фильтрами по модели, проценту загрузки и перегрузу",
+)
+async def list_fleet_trucks(
+    request: Request,
+    model_id: Optional[int] = Query(default=None, ge=1, description="ID модели"),
+    min_load: Optional[float] = Query(default=None, ge=0, description="Загрузка не меньше, %"),
+    max_load: Optional[float] = Query(default=None, ge=0, description="Загрузка не больше, %"),
+    overloaded: Optional[bool] = Query(default=None, description="Только перегруженные / только без перегруза"),
+    board_number: Optional[str] = Query(default=None, description="Фильтр по бортовому номеру"),
+    order: Literal["id", "load_desc", "load_asc"] = Query(default="id", description="Порядок"),
+    page: int = Query(default=1, ge=1, description="Номер страницы"),
+    per_page: int = Query(default=50, ge=1, le=1000, description="Количество записей на странице"),
+    service: FleetService = Depends(get_fleet_service),
+):
+    (trucks, total), source = await service.query_trucks(
+        model_id=model_id, min_load=min_load, max_load=max_load, overloaded=overloaded,
+        board_number=board_number, order=order, skip=(page - 1) * per_page, limit=per_page,
+    )
+
+    return api_response.success(
+        data=trucks,
+        total=total,
+        page=page,
+        per_page=per_page,
+        request=request,
+        headers={DATA_SOURCE_HEADER: source},
+    )
+
+
+@fleet_router.get(
+    "/top",
+    response_model=ResponseSchema,
+    summary="N самосвалов с наибольшей загрузкой",
+)
+async def get_top_loaded(
+    n: int = Query(default=10, ge=1, le=1000, description="Сколько самосвалов"),
+    model_id: Optional[int] = Query(default=None, ge=1, description="ID модели"),
+    service: FleetService = Depends(get_fleet_service),
+):
+    trucks, source = await service.get_top_loaded(n, model_id)
+    return api_response.success(data=trucks, headers={DATA_SOURCE_HEADER: source})
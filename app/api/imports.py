@@ -0,0 +1,52 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request, status
+
+from .response_api import api_response
+from .routing import ApiRoute
+from app.schemas.http_response import ResponseSchema, ErrorResponseSchema, ImportFormatError
+from app.services import ImportService
+from app.dependencies import get_import_service
+
+import_router = APIRouter(
+    prefix="/import",
+    tags=["Импорт"],
+    route_class=ApiRoute,
+)
+
+
+# ──── IMPORT ────
+@import_router.post(
+    "/{kind}",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        415: {"model": ErrorResponseSchema},
+    },
+    summary="Потоковый импорт самосвалов или моделей из CSV / NDJSON",
+    description=(
+        "Тело запроса — файл CSV (с заголовком) или NDJSON; формат берется из параметра "
+        "format или из Content-Type (text/csv, application/x-ndjson). Строки с ошибками "
+        "попадают в отчет и не прерывают импорт."
+    ),
+)
+async def import_data(
+    request: Request,
+    kind: Literal["trucks", "models"] = Path(..., description="Что импортировать"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(default=None, description="Формат тела запроса"),
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=100_000, description="Строк в одной транзакции"),
+    service: ImportService = Depends(get_import_service),
+):
+    try:
+        report = await service.import_stream(
+            kind, request.stream(), fmt=format, content_type=request.headers.get("content-type"),
+            chunk_size=chunk_size,
+        )
+        return api_response.success(data=report)
+
+    except ImportFormatError as e:
+        return api_response.error(
+            error="Неподдерживаемый формат",
+            message=str(e),
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
@@ -0,0 +1,193 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request, status
+from fastapi.responses import FileResponse
+
+from .response_api import api_response
+from .routing import ApiRoute
+from app.config import settings
+from app.schemas import JobCreateSchema, JobSchema, JobStatus
+from app.schemas.http_response import (
+    ResponseSchema, ErrorResponseSchema, ImportFormatError, JobNotFoundError, JobStateError, UploadTooLargeError
+)
+from app.services import JobService
+from app.dependencies import get_job_service
+
+jobs_router = APIRouter(
+    prefix="/jobs",
+    tags=["Фоновые задачи"],
+    route_class=ApiRoute,
+)
+
+_MEDIA_TYPES = {".csv": "text/csv", ".ndjson": "application/x-ndjson", ".json": "application/json"}
+
+
+# ──── CREATE ────
+@jobs_router.post(
+    "/",
+    response_model=ResponseSchema,
+    responses={
+        202: {"model": ResponseSchema},
+    },
+    summary="Поставить фоновую задачу: выгрузка, пересчет статистики, обслуживание индексов",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_job(job_in: JobCreateSchema, service: JobService = Depends(get_job_service)):
+    job = await service.submit(job_in.kind, job_in.job_params())
+    return api_response.success(
+        data=JobSchema.model_validate(job),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"{settings.api_prefix}/jobs/{job.id}"},
+    )
+
+
+@jobs_router.post(
+    "/import/{entity}",
+    response_model=ResponseSchema,
+    responses={
+        202: {"model": ResponseSchema},
+        413: {"model": ErrorResponseSchema},
+        415: {"model": ErrorResponseSchema},
+    },
+    summary="Загрузить файл CSV / NDJSON и импортировать его в фоне",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_import_job(
+    request: Request,
+    entity: Literal["trucks", "models"] = Path(..., description="Что импортировать"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(default=None, description="Формат тела запроса"),
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=100_000, description="Строк в одной транзакции"),
+    service: JobService = Depends(get_job_service),
+):
+    try:
+        job = await service.submit_import(
+            entity, request.stream(), fmt=format, content_type=request.headers.get("content-type"),
+            chunk_size=chunk_size,
+        )
+        return api_response.success(
+            data=JobSchema.model_validate(job),
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": f"{settings.api_prefix}/jobs/{job.id}"},
+        )
+
+    except ImportFormatError as e:
+        return api_response.error(
+            error="Неподдерживаемый формат",
+            message=str(e),
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        )
+    except UploadTooLargeError as e:
+        return api_response.error(
+            error="Слишком большой файл",
+            message=str(e),
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+# ──── READ ────
+@jobs_router.get(
+    "/",
+    response_model=ResponseSchema,
+    summary="Последние фоновые задачи",
+)
+async def list_jobs(
+    status_filter: Optional[JobStatus] = Query(default=None, alias="status", description="Фильтр по статусу"),
+    limit: int = Query(default=50, ge=1, le=500, description="Количество задач"),
+    service: JobService = Depends(get_job_service),
+):
+    jobs = await service.get_jobs(status_filter, limit)
+    return api_response.success(data=[JobSchema.model_validate(job) for job in jobs])
+
+
+@jobs_router.get(
+    "/{job_id}",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        404: {"model": ErrorResponseSchema},
+    },
+    summary="Статус и прогресс фоновой задачи",
+)
+async def get_job_status(
+    job_id: str = Path(..., max_length=32, description="ID задачи"),
+    service: JobService = Depends(get_job_service),
+):
+    try:
+        job = await service.get_job(job_id)
+        return api_response.success(data=JobSchema.model_validate(job))
+
+    except JobNotFoundError as e:
+        return api_response.error(
+            error="Задача не найдена",
+            message=str(e),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+
+@jobs_router.get(
+    "/{job_id}/result",
+    response_class=FileResponse,
+    responses={
+        200: {"description": "Файл результата"},
+        404: {"model": ErrorResponseSchema},
+        409: {"model": ErrorResponseSchema},
+    },
+    summary="Скачать файл результата задачи",
+)
+async def download_job_result(
+    job_id: str = Path(..., max_length=32, description="ID задачи"),
+    service: JobService = Depends(get_job_service),
+):
+    try:
+        job, path = await service.get_result(job_id)
+        return FileResponse(
+            path,
+            media_type=_MEDIA_TYPES.get(path.suffix, "application/octet-stream"),
+            filename=f"{job.kind}_{job.id}{path.suffix}",
+        )
+
+    except JobNotFoundError as e:
+        return api_response.error(
+            error="Результат не найден",
+            message=str(e),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    except JobStateError as e:
+        return api_response.error(
+            error="Задача не завершена",
+            message=str(e),
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+
+# ──── CANCEL ────
+@jobs_router.post(
+    "/{job_id}/cancel",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        404: {"model": ErrorResponseSchema},
+        409: {"model": ErrorResponseSchema},
+    },
+    summary="Отменить задачу в очереди или в работе",
+)
+async def cancel_job(
+    job_id: str = Path(..., max_length=32, description="ID задачи"),
+    service: JobService = Depends(get_job_service),
+):
+    try:
+        job = await service.cancel(job_id)
+        return api_response.success(data=JobSchema.model_validate(job))
+
+    except JobNotFoundError as e:
+        return api_response.error(
+            error="Задача не найдена",
+            message=str(e),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    except JobStateError as e:
+        return api_response.error(
+            error="Задачу нельзя отменить",
+            message=str(e),
+            status_code=status.HTTP_409_CONFLICT,
+        )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import registry
+
+metrics_router = APIRouter(
+    tags=["Служебные"],
+)
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """ Метрики в текстовом формате Prometheus """
+    return PlainTextResponse(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,123 @@
+"""
+    Согласование формата: MessagePack для бортовых блоков и шлюзов вместо JSON.
+
+    Клиент с заголовком Accept: application/msgpack (вес q выше, чем у application/json;
+    при равных весах — JSON) получает ту же обертку ответа (data / meta / links или ошибку)
+    в MessagePack; тело запроса с Content-Type: application/msgpack разбирается так же, как JSON. Формат ответа выбирается в ApiRoute
+    и хранится в contextvar — ApiResponse читает его, не получая запрос.
+
+    Пакет msgpack необязателен: без него заголовок Accept игнорируется (ответ в JSON),
+    а тело MessagePack отклоняется с кодом 415.
+"""
+from contextvars import ContextVar
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+JSON_MEDIA_TYPES = ("application/json",)
+
+# Формат ответа текущего запроса: "json" или "msgpack"
+response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+
+def _accepted(header: Optional[str]) -> Dict[str, float]:
+    """ Типы из заголовка Accept и их вес q (по умолчанию 1; q=0 — тип исключен клиентом) """
+    accepted: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        if not media_type:
+            continue
+        quality = next((param[2:] for param in params if param.replace(" ", "").startswith("q=")), "1")
+        try:
+            weight = min(max(float(quality.strip(" =")), 0.0), 1.0)
+        except ValueError:
+            weight = 1.0
+        media_type = media_type.lower()
+        accepted[media_type] = max(weight, accepted.get(media_type, 0.0))
+    return accepted
+
+
+def _quality(accepted: Dict[str, float], media_types: Tuple[str, ...]) -> float:
+    """ Вес формата: по самому точному совпадению — сам тип, затем application/*, затем */* """
+    explicit = [accepted[media_type] for media_type in media_types if media_type in accepted]
+    if explicit:
+        return max(explicit)
+    return accepted.get("application/*", accepted.get("*/*", 0.0))
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+        Формат ответа по заголовку Accept: MessagePack, если пакет установлен и вес q у него
+        больше, чем у JSON; при равных весах и без заголовка — JSON
+    """
+    if msgpack is None:
+        return "json"
+    accepted = _accepted(accept)
+    if _quality(accepted, MSGPACK_MEDIA_TYPES) > _quality(accepted, JSON_MEDIA_TYPES):
+        return "msgpack"
+    return "json"
+
+
+def _default(value: Any) -> Any:
+    """ Типы, которых нет в MessagePack, — так же, как их кодирует jsonable_encoder """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (UUID, Enum)):
+        return str(value.value if isinstance(value, Enum) else value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Тип {type(value).__name__} не кодируется в MessagePack")
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_default, use_bin_type=True)
+
+
+def unpackb(body: bytes) -> Any:
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+class MsgPackResponse(Response):
+    """ Ответ в MessagePack """
+
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+class MsgPackRequest(Request):
+    """
+        Запрос с телом MessagePack: FastAPI разбирает тело через request.json() только для
+        JSON-типов, поэтому заголовок Content-Type подменяется на application/json,
+        а json() возвращает уже декодированное тело
+    """
+
+    def __init__(self, request: Request, body: bytes):
+        headers = [
+            (name, b"application/json" if name == b"content-type" else value)
+            for name, value in request.scope["headers"]
+        ]
+        super().__init__({**request.scope, "headers": headers}, request.receive)
+        self._body = body
+        self._json = unpackb(body)
@@ -1,16 +1,22 @@
 import math
+from time import perf_counter
 from typing import Optional, Any, Dict
 from fastapi import status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
 
+from .negotiation import MsgPackResponse, msgpack, response_format
+
+from app.config import settings
 from app.schemas.http_response import (
     ResponseSchema, ResponseMetaSchema, ResponseLinksSchema, ErrorResponseSchema
 )
+from app.utils.metrics import response_serialize_duration
+from app.utils.tracing import start_span
 
 
 class ApiResponse:
-    """ Класс для JSON-ответов API """
+    """ Класс для ответов API: JSON или MessagePack по заголовку Accept (app.api.negotiation) """
 
     @classmethod
     def success(
@@ -21,8 +27,10 @@ class ApiResponse:
             per_page: Optional[int] = None,
             request: Optional[Request] = None,
             status_code: int = status.HTTP_200_OK,
-    ) -> JSONResponse:
+            headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
         """ Успешный ответ """
+        start = perf_counter()
 
         # Вычисляем метаданные пагинации
         meta = None
@@ -42,7 +50,24 @@ class ApiResponse:
             if request:
                 links = cls._generate_links(request, page, total_pages, per_page)
 
-        prepared_data = cls._prepare_data(data) if data is not None else None
+        with start_span("ApiResponse.prepare_data"):
+            prepared_data = cls._prepare_data(data) if data is not None else None
+
+        if response_format.get() == "msgpack":
+            # Та же обертка, что у JSON, без ResponseSchema и jsonable_encoder: строки кодируются как есть
+            content = {"data": prepared_data}
+            if meta is not None:
+                content["meta"] = meta.model_dump(exclude_none=True)
+            if links is not None:
+                content["links"] = links.model_dump(exclude_none=True)
+            with start_span("ApiResponse.encode"):
+                response = MsgPackResponse(
+                    content={key: value for key, value in content.items() if value is not None},
+                    status_code=status_code,
+                    headers=cls._headers(headers),
+                )
+            cls._observe("success", start)
+            return response
 
         response_obj = ResponseSchema(
             data=prepared_data,
@@ -50,10 +75,14 @@ class ApiResponse:
             links=links
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(response_obj.model_dump(exclude_none=True)),
-            status_code=status_code,
-        )
+        with start_span("ApiResponse.encode"):
+            response = JSONResponse(
+                content=jsonable_encoder(response_obj.model_dump(exclude_none=True)),
+                status_code=status_code,
+                headers=cls._headers(headers),
+            )
+        cls._observe("success", start)
+        return response
 
     @classmethod
     def error(
@@ -63,8 +92,9 @@ class ApiResponse:
             details: Optional[str] = None,
             status_code: int = status.HTTP_400_BAD_REQUEST,
             headers: Optional[Dict[str, str]] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """ Ответ с ошибкой """
+        start = perf_counter()
 
         error_obj = ErrorResponseSchema(
             error=error,
@@ -73,11 +103,27 @@ class ApiResponse:
             status_code=status_code,
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(error_obj.model_dump(exclude_none=True)),
-            status_code=status_code,
-            headers=headers,
-        )
+        response_class = MsgPackResponse if response_format.get() == "msgpack" else JSONResponse
+        with start_span("ApiResponse.encode"):
+            response = response_class(
+                content=error_obj.model_dump(mode="json", exclude_none=True),
+                status_code=status_code,
+                headers=cls._headers(headers),
+            )
+        cls._observe("error", start)
+        return response
+
+    @staticmethod
+    def _observe(outcome: str, start: float) -> None:
+        if settings.metrics_enabled:
+            response_serialize_duration.labels(outcome).observe(perf_counter() - start)
+
+    @staticmethod
+    def _headers(headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """ Формат ответа зависит от Accept — кэши должны это учитывать """
+        if msgpack is None:
+            return headers
+        return {**(headers or {}), "Vary": "Accept"}
 
     @classmethod
     def _generate_links(
@@ -150,6 +196,13 @@ class ApiResponse:
             except Exception:
                 pass
 
+            # Флаги аномалий веса по последнему анализу телеметрии
+            try:
+                if 'anomalies' in data.__dict__:
+                    result['anomaly_flags'] = [anomaly.flag for anomaly in data.anomalies]
+            except Exception:
+                pass
+
             # Добавляем связанные объекты
             try:
                 if hasattr(data, 'model') and 'model' in data.__dict__ and data.model:
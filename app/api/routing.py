@@ -0,0 +1,56 @@
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response, status
+from fastapi.routing import APIRoute
+
+from .negotiation import MsgPackRequest, is_msgpack, msgpack, negotiate, response_format
+from .response_api import api_response
+from app.utils.tracing import start_span
+
+
+class ApiRoute(APIRoute):
+    """
+        Маршрут API: обработчик (зависимости и эндпоинт) выполняется в отдельном участке трассировки.
+        Формат ответа согласуется по заголовку Accept, тело MessagePack декодируется до разбора схемы
+        (app.api.negotiation)
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        span_name = f"handler {self.name}"
+
+        async def traced_handler(request: Request) -> Response:
+            token = response_format.set(negotiate(request.headers.get("accept")))
+            try:
+                if is_msgpack(request.headers.get("content-type")):
+                    request = await self._decode_msgpack(request)
+                    if isinstance(request, Response):
+                        return request
+                with start_span(span_name):
+                    return await handler(request)
+            finally:
+                response_format.reset(token)
+
+        return traced_handler
+
+    @staticmethod
+    async def _decode_msgpack(request: Request) -> Any:
+        """ Запрос с декодированным телом MessagePack или ответ с ошибкой """
+        if msgpack is None:
+            return api_response.error(
+                error="Формат не поддерживается",
+                message="Тело MessagePack не принимается: пакет msgpack не установлен",
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        body = await request.body()
+        if not body:
+            return request
+        try:
+            return MsgPackRequest(request, body)
+        except (ValueError, msgpack.UnpackException) as e:
+            return api_response.error(
+                error="Некорректное тело запроса",
+                message="Тело не разбирается как MessagePack",
+                details=str(e) or type(e).__name__,
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Path, Query, status, Request
 
 from .response_api import api_response
+from .routing import ApiRoute
 from app.schemas import TruckModelCreateSchema
 from app.schemas.http_response import ResponseSchema, ErrorResponseSchema
 from app.services import TruckModelService
@@ -11,6 +12,7 @@ from app.schemas.services import ModelInUseError
 truck_models_router = APIRouter(
     prefix="/models",
     tags=["Модели самосвалов"],
+    route_class=ApiRoute,
 )
 
 
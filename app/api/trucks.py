@@ -1,18 +1,22 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, Path, Query, status, Request
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, Path, Query, status, Request
 
+from .fleet import DATA_SOURCE_HEADER
 from .response_api import api_response
-from app.schemas import DumpTruckCreateSchema
+from .routing import ApiRoute
+from app.schemas import DumpTruckCreateSchema, TruckSyncSchema
 from app.schemas.http_response import ResponseSchema, ErrorResponseSchema
 from app.services import TruckService
 from app.dependencies import get_truck_service
 from app.schemas.http_response import (
-    TruckNotFoundError, TruckModelNotFoundError, DuplicateBoardNumberError
+    TruckNotFoundError, TruckModelNotFoundError, DuplicateBoardNumberError, IdempotencyKeyReusedError,
+    IdempotencyKeyConflictError,
 )
 
 trucks_router = APIRouter(
     prefix="/trucks",
     tags=["Самосвалы"],
+    route_class=ApiRoute,
 )
 
 
@@ -87,6 +91,125 @@ async def list_dump_trucks(
     )
 
 
+# Статические пути ниже (/suggest, /anomalies, /top-overloaded, /sync) регистрируются
+# до маршрутов /{truck_id}, иначе они будут разобраны как ID
+
+# ──── SUGGEST ────
+@trucks_router.get(
+    "/suggest",
+    response_model=ResponseSchema,
+    summary="Подсказки бортовых номеров при вводе",
+    description=(
+        "Сначала номера, начинающиеся с q, затем содержащие q (для q от 3 символов), "
+        "в каждой группе по возрастанию номера. Регистр и пробелы по краям не важны."
+    ),
+)
+async def suggest_board_numbers(
+    q: str = Query(default=..., min_length=1, max_length=10, description="Начало или часть бортового номера"),
+    limit: int = Query(default=10, ge=1, le=50, description="Сколько подсказок"),
+    truck_service: TruckService = Depends(get_truck_service),
+):
+    suggestions, source = await truck_service.suggest_board_numbers(q, limit)
+    return api_response.success(data=suggestions, headers={DATA_SOURCE_HEADER: source})
+
+
+# ──── ANOMALIES ────
+@trucks_router.get(
+    "/anomalies",
+    response_model=ResponseSchema,
+    summary="Аномалии показаний веса",
+    description=(
+        "Результат последнего анализа истории веса (задача anomaly_scan): out_of_range — вес вне 0..500 т, "
+        "spike — выброс относительно скользящего среднего, jump — невозможная скорость изменения, "
+        "flatline — залипшие весы, negative_drift — устойчивое снижение показаний. "
+        "Последние показания с аномалией первыми."
+    ),
+)
+async def list_anomalies(
+    request: Request,
+    flag: Optional[Literal["out_of_range", "spike", "jump", "flatline", "negative_drift"]] = Query(
+        default=None, description="Фильтр по признаку",
+    ),
+    page: int = Query(default=1, ge=1, description="Номер страницы"),
+    per_page: int = Query(default=50, ge=1, le=100, description="Количество записей на странице"),
+    truck_service: TruckService = Depends(get_truck_service),
+):
+    anomalies, total_count = await truck_service.get_anomalies(
+        flag=flag,
+        skip=(page - 1) * per_page,
+        limit=per_page,
+    )
+    return api_response.success(
+        data=anomalies,
+        total=total_count,
+        page=page,
+        per_page=per_page,
+        request=request,
+    )
+
+
+# ──── TOP OVERLOADED ────
+@trucks_router.get(
+    "/top-overloaded",
+    response_model=ResponseSchema,
+    summary="Самые перегруженные самосвалы",
+    description="По убыванию отношения текущего веса к грузоподъемности модели; только перегруженные.",
+)
+async def get_top_overloaded(
+    n: int = Query(default=10, ge=1, le=100, description="Сколько самосвалов"),
+    truck_service: TruckService = Depends(get_truck_service),
+):
+    trucks, source = await truck_service.get_top_overloaded(n)
+    return api_response.success(data=trucks, headers={DATA_SOURCE_HEADER: source})
+
+
+# ──── SYNC ────
+@trucks_router.put(
+    "/sync",
+    response_model=ResponseSchema,
+    responses={
+        200: {"model": ResponseSchema},
+        404: {"model": ErrorResponseSchema},
+        409: {"model": ErrorResponseSchema},
+        422: {"model": ErrorResponseSchema},
+    },
+    summary="Синхронизировать самосвалы с эталонным списком по бортовому номеру",
+)
+async def sync_dump_trucks(
+    payload: TruckSyncSchema,
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Повтор запроса с тем же ключом вернет сохраненный результат",
+    ),
+    truck_service: TruckService = Depends(get_truck_service),
+):
+    try:
+        summary, replayed = await truck_service.sync_trucks(payload, idempotency_key)
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return api_response.success(data=summary, headers=headers)
+
+    except TruckModelNotFoundError as e:
+        return api_response.error(
+            error="Модель не найдена",
+            message=str(e),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    except IdempotencyKeyReusedError as e:
+        return api_response.error(
+            error="Ключ идемпотентности уже использован",
+            message=str(e),
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    except IdempotencyKeyConflictError as e:
+        return api_response.error(
+            error="Запрос с этим ключом выполняется",
+            message=str(e),
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+
 # ──── READ (один самосвал) ────
 @trucks_router.get(
     "/{truck_id}",
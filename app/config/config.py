@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,6 +16,117 @@ class DataBaseSettings(BaseSettings):
     name: str = ""
     server: str = ""
     sqlalchemy_echo: bool = False
+    query_budget: int = 10
+    n_plus_one_threshold: int = 3
+    slow_query_ms: float = 100
+    slow_query_redact_params: bool = True
+    slow_query_max_entries: int = 500
+    group_commit: Literal["auto", "on", "off"] = "auto"
+    group_commit_max_batch: int = 128
+    group_commit_max_delay_ms: float = 0
+
+
+class ProfilingSettings(BaseSettings):
+    enabled: bool = True
+    dir: str = "./profiles"
+    max_profiles: int = 50
+    memory_top: int = 25
+
+
+class TracingSettings(BaseSettings):
+    enabled: bool = True
+    sample_ratio: float = 0.0
+    service_name: str = "dump-trucks"
+    buffer_size: int = 5000
+    otlp_file: str = ""
+    batch_size: int = 256
+
+
+class SeedSettings(BaseSettings):
+    on_startup: bool = True
+    models: int = 24
+    trucks: int = 0
+    overload_ratio: float = 0.1
+    history: int = 0
+    seed: int = 42
+
+
+class ServerSettings(BaseSettings):
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 0
+    backlog: int = 2048
+    keep_alive: int = 5
+    graceful_timeout: int = 30
+    access_log: bool = False
+
+
+class JobSettings(BaseSettings):
+    concurrency: int = 2
+    process_workers: int = 2
+    results_dir: str = ""
+    retention_hours: int = 72
+    max_upload_mb: int = 512
+    progress_interval: float = 0.5
+
+
+class ChangeLogSettings(BaseSettings):
+    retention_hours: int = 168
+    compact_every: int = 10_000
+    max_page: int = 5000
+
+
+class FleetStateSettings(BaseSettings):
+    enabled: bool = True
+    poll_interval: float = 1.0
+    warm_on_startup: bool = True
+
+
+class AnomalySettings(BaseSettings):
+    hours: int = 24
+    batch_trucks: int = 2000
+    window: int = 12
+    z_threshold: float = 4.0
+    min_std: float = 2.0
+    max_rate_per_min: float = 100.0
+    flatline_samples: int = 8
+    drift_samples: int = 10
+
+
+class DispatchSettings(BaseSettings):
+    time_limit: float = 2.0
+    max_loads: int = 50_000
+
+
+class CompressionSettings(BaseSettings):
+    enabled: bool = True
+    min_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    zstd_level: int = 3
+    etag: bool = True
+    cache_bytes: int = 32 * 1024 * 1024
+    thread_min_size: int = 256 * 1024
+
+
+class AdmissionSettings(BaseSettings):
+    enabled: bool = True
+    max_concurrency: int = 64
+    telemetry_concurrency: int = 48
+    detail_concurrency: int = 32
+    other_concurrency: int = 16
+    list_concurrency: int = 16
+    bulk_concurrency: int = 4
+    queue_size: int = 256
+    queue_timeout: float = 2.0
+    pool_wait_ms: float = 100.0
+    pool_wait_half_life: float = 2.0
+    max_retry_after: int = 30
+
+
+class BulkImportSettings(BaseSettings):
+    chunk_size: int = 5000
+    max_errors: int = 1000
 
 
 class Settings(BaseSettings):
@@ -23,8 +135,25 @@ class Settings(BaseSettings):
     description: str = "Веб приложение для контроля работы самосвалов"
     api_prefix: str = "/api/v1"
     debug: bool = True
+    admin_token: str = ""
+    read_coalescing: bool = True
+    metrics_enabled: bool = True
+    run_startup_tasks: bool = True
+    idempotency_ttl_hours: int = 48
 
     db: DataBaseSettings = DataBaseSettings()
+    profiling: ProfilingSettings = ProfilingSettings()
+    tracing: TracingSettings = TracingSettings()
+    seed: SeedSettings = SeedSettings()
+    server: ServerSettings = ServerSettings()
+    bulk_import: BulkImportSettings = BulkImportSettings()
+    jobs: JobSettings = JobSettings()
+    changes: ChangeLogSettings = ChangeLogSettings()
+    fleet_state: FleetStateSettings = FleetStateSettings()
+    anomalies: AnomalySettings = AnomalySettings()
+    dispatch: DispatchSettings = DispatchSettings()
+    compression: CompressionSettings = CompressionSettings()
+    admission: AdmissionSettings = AdmissionSettings()
 
     model_config = SettingsConfigDict(
         case_sensitive=True,
@@ -0,0 +1,214 @@
+"""
+    Контроль допуска запросов и сброс нагрузки при насыщении пула соединений БД.
+
+    Запросы API делятся на классы по методу и пути (classify), в порядке приоритета:
+      telemetry — показания веса: POST /trucks/, PUT /trucks/{id};
+      detail    — карточки и легкие чтения: GET /trucks/{id}, /models/{id}, /jobs/{id}, подсказки, top-N;
+      other     — прочие изменения: модели, удаление, постановка задач;
+      list      — списки, сводки и журнал изменений;
+      bulk      — выгрузка файлов, импорт, синхронизация, распределение грузов.
+    Служебные /admin и пути вне API не ограничиваются.
+
+    У каждого класса свой предел одновременных запросов, у всех вместе — общий
+    (admission__*_concurrency, admission__max_concurrency). Запрос сверх предела ждет
+    в ограниченной очереди; освободившееся место получает самый приоритетный ожидающий
+    класс, внутри класса — по порядку прихода. Ответ 503 с Retry-After отдается сразу:
+      - ожидание соединения из пула (checkout_wait) выше порога класса — admission__pool_wait_ms,
+        умноженного на множитель класса: bulk отсекается первым, telemetry — последним;
+      - очередь заполнена на долю, отведенную классу;
+    и после ожидания в очереди дольше admission__queue_timeout.
+    Retry-After — оценка времени до освобождения места: текущее ожидание пула плюс очередь
+    впереди, деленная на предел класса, со средним временем обработки запроса класса.
+"""
+import asyncio
+import math
+import re
+from collections import deque
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.config import settings
+from app.db.instrumentation import checkout_wait
+from app.utils.metrics import admission_queue_wait, admission_rejected_total
+
+CLASSES = ("telemetry", "detail", "other", "list", "bulk")
+
+# Порог ожидания пула относительно admission__pool_wait_ms и доля очереди, доступная классу
+_POOL_WAIT_FACTOR = {"telemetry": 8.0, "detail": 4.0, "other": 2.0, "list": 1.0, "bulk": 0.5}
+_QUEUE_SHARE = {"telemetry": 1.0, "detail": 0.75, "other": 0.5, "list": 0.5, "bulk": 0.25}
+
+# Пути относительно префикса API; первое совпадение определяет класс, без совпадения — other
+_RULES = (
+    ("bulk", None, re.compile(r"^/(jobs/)?import(/|$)|^/jobs/[^/]+/result$|^/trucks/sync$|^/dispatch/")),
+    ("telemetry", ("POST", "PUT", "PATCH"), re.compile(r"^/trucks/(\d+)?$")),
+    ("detail", ("GET",), re.compile(r"^/(trucks|models)/(\d+|suggest|top-overloaded)$|^/jobs/[^/]+$|^/fleet/top$")),
+    ("list", ("GET",), re.compile(r"^/")),
+)
+_EXEMPT = re.compile(r"^/admin(/|$)")
+
+# Начальная оценка времени обработки запроса, пока нет замеров; вес нового замера в среднем
+_INITIAL_SERVICE_TIME = 0.05
+_SERVICE_ALPHA = 0.1
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """ Класс запроса; None — запрос не ограничивается """
+    prefix = settings.api_prefix
+    if not path.startswith(f"{prefix}/"):
+        return None
+    path = path[len(prefix):]
+    if _EXEMPT.match(path):
+        return None
+    for route_class, methods, pattern in _RULES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return route_class
+    return "other"
+
+
+class Rejected(Exception):
+    """ Запрос не допущен: причина и через сколько секунд повторить """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """ Пределы одновременных запросов по классам и очередь с приоритетом классов """
+
+    def __init__(self) -> None:
+        self._active = {route_class: 0 for route_class in CLASSES}
+        self._total_active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {route_class: deque() for route_class in CLASSES}
+        self._service = {route_class: _INITIAL_SERVICE_TIME for route_class in CLASSES}
+        self._stats = {"admitted": 0, "queued_total": 0, "rejected_pool_wait": 0, "rejected_queue_full": 0, "timed_out": 0}
+
+    # ──── ПРЕДЕЛЫ ────
+    @staticmethod
+    def _limit(route_class: str) -> int:
+        return getattr(settings.admission, f"{route_class}_concurrency")
+
+    def _has_slot(self, route_class: str) -> bool:
+        return (
+            self._active[route_class] < self._limit(route_class)
+            and self._total_active < settings.admission.max_concurrency
+        )
+
+    def _take(self, route_class: str) -> None:
+        self._active[route_class] += 1
+        self._total_active += 1
+
+    def _release(self, route_class: str) -> None:
+        self._active[route_class] -= 1
+        self._total_active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """ Отдать свободные места ожидающим: классы по приоритету, внутри класса — по порядку """
+        for route_class in CLASSES:
+            queue = self._queues[route_class]
+            while queue and self._has_slot(route_class):
+                future = queue.popleft()
+                if future.done():
+                    continue
+                self._take(route_class)
+                future.set_result(None)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    # ──── ДОПУСК ────
+    def _retry_after(self, route_class: str) -> int:
+        position = CLASSES.index(route_class)
+        ahead = sum(len(self._queues[other]) for other in CLASSES[:position + 1])
+        estimate = checkout_wait.current() + (ahead + 1) * self._service[route_class] / self._limit(route_class)
+        return min(max(math.ceil(estimate), 1), settings.admission.max_retry_after)
+
+    def _reject(self, route_class: str, reason: str) -> Rejected:
+        self._stats[f"rejected_{reason}"] += 1
+        if settings.metrics_enabled:
+            admission_rejected_total.labels(route_class, reason).inc()
+        return Rejected(reason, self._retry_after(route_class))
+
+    async def _acquire(self, route_class: str) -> None:
+        config = settings.admission
+        if checkout_wait.current() * 1000 > config.pool_wait_ms * _POOL_WAIT_FACTOR[route_class]:
+            raise self._reject(route_class, "pool_wait")
+        if self._has_slot(route_class) and not self._queues[route_class]:
+            self._take(route_class)
+            return
+        if self.queued >= config.queue_size * _QUEUE_SHARE[route_class]:
+            raise self._reject(route_class, "queue_full")
+
+        self._stats["queued_total"] += 1
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues[route_class]
+        queue.append(future)
+        start = perf_counter()
+        try:
+            async with asyncio.timeout(config.queue_timeout):
+                await future
+        except TimeoutError:
+            # Место могло освободиться одновременно с истечением времени — тогда оно уже наше
+            if not future.done() or future.cancelled():
+                if future in queue:
+                    queue.remove(future)
+                self._stats["timed_out"] += 1
+                if settings.metrics_enabled:
+                    admission_rejected_total.labels(route_class, "queue_timeout").inc()
+                raise Rejected("queue_timeout", self._retry_after(route_class))
+        except asyncio.CancelledError:
+            # Клиент ушел: выданное место возвращается, иначе ожидание снимается с очереди
+            if future.done() and not future.cancelled():
+                self._release(route_class)
+            elif future in queue:
+                queue.remove(future)
+            raise
+        finally:
+            if settings.metrics_enabled:
+                admission_queue_wait.labels(route_class).observe(perf_counter() - start)
+
+    @asynccontextmanager
+    async def admit(self, route_class: str) -> AsyncIterator[None]:
+        """ Занять место класса на время обработки запроса или отказать (Rejected) """
+        await self._acquire(route_class)
+        self._stats["admitted"] += 1
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self._service[route_class] += (elapsed - self._service[route_class]) * _SERVICE_ALPHA
+            self._release(route_class)
+
+    def status(self) -> Dict[str, Any]:
+        """ Состояние для GET /admin/admission """
+        config = settings.admission
+        return {
+            "enabled": config.enabled,
+            "active": self._total_active,
+            "max_concurrency": config.max_concurrency,
+            "queued": self.queued,
+            "queue_size": config.queue_size,
+            "pool_wait_ms": round(checkout_wait.current() * 1000, 2),
+            "pool_waiting": checkout_wait.waiting,
+            "classes": [
+                {
+                    "name": route_class,
+                    "active": self._active[route_class],
+                    "limit": self._limit(route_class),
+                    "queued": len(self._queues[route_class]),
+                    "queue_limit": int(config.queue_size * _QUEUE_SHARE[route_class]),
+                    "shed_pool_wait_ms": config.pool_wait_ms * _POOL_WAIT_FACTOR[route_class],
+                    "service_ms": round(self._service[route_class] * 1000, 2),
+                }
+                for route_class in CLASSES
+            ],
+            **self._stats,
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,105 @@
+"""
+    Поиск аномалий показаний веса (неисправности датчиков) по истории телеметрии.
+
+    Функции выполняются в пуле процессов (app.core.jobs): модуль зависит только от NumPy.
+    Порция — показания нескольких самосвалов, упорядоченные по (самосвал, время); все
+    признаки считаются векторно по порции целиком, границы рядов самосвалов учитываются
+    масками, без цикла по показаниям:
+      - out_of_range — вес вне 0..max_weight (отрицательный или выше предела валидатора);
+      - spike — отклонение от скользящего среднего предыдущих window показаний больше
+        z_threshold скользящих стандартных отклонений;
+      - jump — скорость изменения веса больше max_rate_per_min тонн в минуту
+        или скачок больше max_weight за одно показание;
+      - flatline — flatline_samples одинаковых ненулевых показаний подряд (залипшие весы);
+      - negative_drift — drift_samples снижений веса подряд (уход нуля датчика).
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+FLAGS = ("out_of_range", "spike", "jump", "flatline", "negative_drift")
+
+
+def _run_positions(condition: np.ndarray) -> np.ndarray:
+    """ Номер элемента внутри серии подряд идущих True (0 — первый); для False — -1 """
+    index = np.arange(len(condition))
+    # Начало серии — последняя позиция False перед элементом
+    last_false = np.maximum.accumulate(np.where(condition, -1, index))
+    return np.where(condition, index - last_false - 1, -1)
+
+
+def detect(
+        truck_ids: np.ndarray,
+        minutes: np.ndarray,
+        weights: np.ndarray,
+        params: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+        Аномалии порции показаний, упорядоченных по (truck_id, время).
+        :param minutes: время показаний в минутах от любой общей точки отсчета
+        :return по самосвалу с аномалиями: truck_id, флаг, число показаний с ним, минута последнего
+    """
+    size = len(weights)
+    if not size:
+        return []
+    x = weights.astype(np.float64)
+    index = np.arange(size)
+
+    # Начало ряда самосвала и номер ряда для каждого показания
+    first = np.ones(size, dtype=bool)
+    first[1:] = truck_ids[1:] != truck_ids[:-1]
+    series = np.cumsum(first) - 1
+    series_start = np.maximum.accumulate(np.where(first, index, 0))
+
+    delta = np.zeros(size)
+    delta[1:] = np.diff(x)
+    elapsed = np.zeros(size)
+    elapsed[1:] = np.diff(minutes)
+    has_previous = ~first
+
+    max_weight = params["max_weight"]
+    flags = {"out_of_range": (x < 0) | (x > max_weight)}
+
+    # Скользящие среднее и стандартное отклонение предыдущих window показаний того же ряда
+    window = params["window"]
+    sums = np.concatenate(([0.0], np.cumsum(x)))
+    squares = np.concatenate(([0.0], np.cumsum(x * x)))
+    start = np.maximum(index - window, series_start)
+    count = index - start
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (sums[index] - sums[start]) / count
+        std = np.sqrt(np.maximum((squares[index] - squares[start]) / count - mean * mean, 0))
+        z = np.abs(x - mean) / std
+    flags["spike"] = (count >= max(window // 2, 3)) & (std >= params["min_std"]) & (z > params["z_threshold"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.abs(delta) / elapsed
+    flags["jump"] = has_previous & (
+        (np.abs(delta) > max_weight) | ((elapsed > 0) & (rate > params["max_rate_per_min"]))
+    )
+
+    # Серии считаются от второго показания ряда: первое не сравнивается с предыдущим рядом.
+    # Серия отмечается один раз — на показании, где она достигла заданной длины
+    same = has_previous & (delta == 0) & (x > 0)
+    flags["flatline"] = _run_positions(same) == params["flatline_samples"] - 2
+    falling = has_previous & (delta < 0)
+    flags["negative_drift"] = _run_positions(falling) == params["drift_samples"] - 1
+
+    series_count = int(series[-1]) + 1
+    series_truck = truck_ids[first]
+    anomalies = []
+    for flag in FLAGS:
+        mask = flags[flag]
+        if not mask.any():
+            continue
+        counts = np.bincount(series[mask], minlength=series_count)
+        last = np.full(series_count, -1)
+        np.maximum.at(last, series[mask], index[mask])
+        for position in np.flatnonzero(counts):
+            anomalies.append({
+                "truck_id": int(series_truck[position]),
+                "flag": flag,
+                "samples": int(counts[position]),
+                "last_minute": float(minutes[last[position]]),
+            })
+    return anomalies
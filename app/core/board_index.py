@@ -0,0 +1,189 @@
+"""
+    Индекс бортовых номеров для подсказок при вводе: префикс и подстрока.
+
+    Основная часть строится целиком по всему парку и не изменяется:
+      - номера, отсортированные по возрастанию, и ID — префикс ищется двоичным поиском (searchsorted);
+      - триграммы номеров в сжатом виде (CSR): отсортированные коды триграмм, смещения и строки
+        основной части — кандидаты подстроки дает пересечение списков триграмм образца.
+    Изменения после построения копятся в небольшой добавочной части (отсортированный список
+    и триграммы в словаре), а строки основной части с устаревшим номером помечаются удаленными.
+    Когда добавочная часть вырастает, индекс перестраивается по текущему парку.
+
+    Номера хранятся нормализованными, как в validate_board_number: без пробелов, в верхнем регистре.
+    Память основной части на миллион самосвалов при номерах до 10 символов: номера ~40 МБ,
+    ID 8 МБ, триграммы ~32 МБ (до 8 на номер по 4 байта) — около 80 МБ.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Добавочная часть, после которой индекс перестраивается: не меньше, чем доля основной части
+_MIN_DELTA = 10_000
+_DELTA_RATIO = 0.1
+
+# Кандидатов подстроки, проверяемых за один шаг (поиск останавливается, набрав limit совпадений)
+_VERIFY_CHUNK = 4096
+
+_GRAM = 3
+
+
+def normalize(query: str) -> str:
+    return query.strip().upper()
+
+
+def _grams(board: str) -> Set[str]:
+    return {board[i:i + _GRAM] for i in range(len(board) - _GRAM + 1)}
+
+
+def _gram_code(gram: str) -> int:
+    """ Код триграммы: три кодовые точки Unicode по 21 биту """
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+class BoardIndex:
+    """ Префиксный и триграммный индекс бортовых номеров с добавочной частью для изменений """
+
+    def __init__(self) -> None:
+        self.build(np.zeros(0, dtype=np.int64), np.zeros(0, dtype="U1"))
+
+    def build(self, ids: np.ndarray, boards: np.ndarray) -> None:
+        """ Построить основную часть по всему парку; добавочная часть очищается """
+        # Ширина по самому длинному номеру: массив состояния парка хранит номера с запасом
+        width = max(int(np.strings.str_len(boards).max()) if len(boards) else 0, 1)
+        order = np.argsort(boards, kind="stable")
+        self._boards = boards[order].astype(f"U{width}")
+        self._ids = ids[order]
+
+        # Кодовые точки номеров матрицей (строк x ширина); пустые позиции — нули
+        chars = self._boards.view(np.uint32).reshape(len(self._boards), width).astype(np.int64)
+        codes, rows = [], []
+        for i in range(max(width - _GRAM + 1, 0)):
+            code = (chars[:, i] << 42) | (chars[:, i + 1] << 21) | chars[:, i + 2]
+            present = np.flatnonzero(chars[:, i + 2] != 0)
+            codes.append(code[present])
+            rows.append(present.astype(np.int32))
+        codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+
+        # Строки внутри триграммы — по возрастанию; повторы триграммы в одном номере не нужны
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        unique = np.ones(len(codes), dtype=bool)
+        unique[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[unique], rows[unique]
+        self._gram_keys, starts = np.unique(codes, return_index=True)
+        self._gram_offsets = np.append(starts, len(codes)).astype(np.int64)
+        self._gram_rows = rows
+
+        self._removed: Set[int] = set()
+        self._delta: List[Tuple[str, int]] = []
+        self._delta_boards: Dict[int, str] = {}
+        self._delta_grams: Dict[str, Set[int]] = {}
+
+    # ──── ИЗМЕНЕНИЯ ────
+    @property
+    def stale(self) -> bool:
+        """ Добавочная часть выросла — пора перестроить """
+        changes = len(self._delta) + len(self._removed)
+        return changes > max(_MIN_DELTA, int(len(self._boards) * _DELTA_RATIO))
+
+    def update(self, truck_id: int, old_board: Optional[str], new_board: Optional[str]) -> None:
+        """ Номер самосвала изменился: old_board None — новый самосвал, new_board None — удален """
+        if old_board == new_board:
+            return
+        if old_board is not None:
+            self._discard(truck_id)
+        if new_board is not None:
+            self._delta_boards[truck_id] = new_board
+            insort(self._delta, (new_board, truck_id))
+            for gram in _grams(new_board):
+                self._delta_grams.setdefault(gram, set()).add(truck_id)
+
+    def _discard(self, truck_id: int) -> None:
+        board = self._delta_boards.pop(truck_id, None)
+        if board is None:
+            # Строка основной части; ID без строки в основной части не мешает
+            self._removed.add(truck_id)
+            return
+        del self._delta[bisect_left(self._delta, (board, truck_id))]
+        for gram in _grams(board):
+            ids = self._delta_grams[gram]
+            ids.discard(truck_id)
+            if not ids:
+                del self._delta_grams[gram]
+
+    # ──── ПОИСК ────
+    def suggest(self, query: str, limit: int) -> List[Dict[str, object]]:
+        """
+            До limit номеров: сначала начинающиеся с образца, затем содержащие его,
+            в каждой группе по возрастанию номера. Подстрока ищется для образца от 3 символов.
+        """
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+        found = self._prefix(query, limit)
+        if len(found) < limit and len(query) >= _GRAM:
+            found += self._substring(query, limit - len(found))
+        return [{"id": truck_id, "board_number": board} for board, truck_id in found]
+
+    def _prefix(self, query: str, limit: int) -> List[Tuple[str, int]]:
+        found = []
+        start = int(np.searchsorted(self._boards, query, side="left"))
+        for row in range(start, len(self._boards)):
+            board = str(self._boards[row])
+            if not board.startswith(query) or len(found) >= limit:
+                break
+            truck_id = int(self._ids[row])
+            if truck_id not in self._removed:
+                found.append((board, truck_id))
+
+        position = bisect_left(self._delta, (query, -1))
+        for board, truck_id in self._delta[position:position + limit]:
+            if not board.startswith(query):
+                break
+            found.append((board, truck_id))
+        return sorted(found)[:limit]
+
+    def _postings(self, gram: str) -> np.ndarray:
+        code = _gram_code(gram)
+        pos = int(np.searchsorted(self._gram_keys, code))
+        if pos == len(self._gram_keys) or self._gram_keys[pos] != code:
+            return self._gram_rows[:0]
+        return self._gram_rows[self._gram_offsets[pos]:self._gram_offsets[pos + 1]]
+
+    def _substring(self, query: str, limit: int) -> List[Tuple[str, int]]:
+        grams = _grams(query)
+        found = []
+
+        # Основная часть: пересечение списков триграмм, начиная с самого короткого
+        postings = sorted((self._postings(gram) for gram in grams), key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+
+        # Строки по возрастанию — это номера по возрастанию: проверка порциями до limit совпадений
+        for start in range(0, len(candidates), _VERIFY_CHUNK):
+            rows = candidates[start:start + _VERIFY_CHUNK]
+            # Позиция 0 — совпадение по префиксу, оно уже в первой группе
+            rows = rows[np.strings.find(self._boards[rows], query) > 0]
+            for board, truck_id in zip(self._boards[rows].tolist(), self._ids[rows].tolist()):
+                if truck_id not in self._removed:
+                    found.append((board, truck_id))
+            if len(found) >= limit:
+                break
+
+        delta_ids = set.intersection(*(self._delta_grams.get(gram, set()) for gram in grams))
+        for truck_id in delta_ids:
+            board = self._delta_boards[truck_id]
+            if query in board and not board.startswith(query):
+                found.append((board, truck_id))
+        return sorted(found)[:limit]
+
+    def memory(self) -> int:
+        """ Память основной части в байтах (добавочная часть мала и не учитывается) """
+        return int(sum(
+            array.nbytes for array in (self._boards, self._ids, self._gram_keys, self._gram_offsets, self._gram_rows)
+        ))
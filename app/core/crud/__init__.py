@@ -3,5 +3,7 @@ from app.core.crud.truck import (
     get_truck_by_id,
     get_trucks_list,
     update_truck,
-    delete_truck
+    delete_truck,
+    sync_trucks,
+    upsert_trucks,
 )
\ No newline at end of file
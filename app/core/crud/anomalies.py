@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import DumpTruck, TruckAnomaly, WeightSample
+
+# Строк в одном пакете INSERT
+_INSERT_BATCH = 1000
+
+
+def weight_samples_stmt(first_id: int, last_id: int, since: datetime):
+    """ Показания самосвалов first_id..last_id после since, по (самосвал, время) — по индексу truck_id, recorded_at """
+    return (
+        select(WeightSample.truck_id, WeightSample.recorded_at, WeightSample.weight)
+        .where(
+            WeightSample.truck_id.between(first_id, last_id),
+            WeightSample.recorded_at >= since,
+        )
+        .order_by(WeightSample.truck_id, WeightSample.recorded_at)
+    )
+
+
+async def replace_anomalies(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """ Заменить результаты предыдущего анализа новыми одной транзакцией """
+    await db.execute(delete(TruckAnomaly))
+    for start in range(0, len(rows), _INSERT_BATCH):
+        await db.execute(insert(TruckAnomaly), rows[start:start + _INSERT_BATCH])
+    return len(rows)
+
+
+async def get_anomalies_list(
+        db: AsyncSession,
+        flag: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+        Аномалии последнего анализа с бортовыми номерами, последние показания первыми.
+        :return (список, общее количество)
+    """
+    filters = [TruckAnomaly.flag == flag] if flag else []
+    total = await db.scalar(select(func.count()).select_from(TruckAnomaly).where(*filters))
+    rows = await db.execute(
+        select(
+            TruckAnomaly.truck_id, DumpTruck.board_number, TruckAnomaly.flag, TruckAnomaly.samples,
+            TruckAnomaly.last_at, TruckAnomaly.detected_at,
+        )
+        .join(DumpTruck, DumpTruck.id == TruckAnomaly.truck_id)
+        .where(*filters)
+        .order_by(TruckAnomaly.last_at.desc(), TruckAnomaly.truck_id, TruckAnomaly.flag)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows], total
@@ -0,0 +1,241 @@
+"""
+    Журнал изменений самосвалов и моделей для инкрементальной синхронизации клиентов.
+
+    Каждая изменяющая CRUD-операция добавляет записи в change_log в своей же транзакции:
+    create и update несут состояние записи после изменения, delete — ключи удаленной.
+    Клиент применяет записи как UPSERT / удаление по ID и запоминает последний seq.
+
+    Сжатие (фоновая задача compact_changes) удаляет записи, замененные более поздними
+    записями той же сущности, и записи об удалении старше changes.retention_hours.
+    Номер последней удаленной записи об удалении — граница: клиенту с since меньше нее
+    нужна полная синхронизация.
+
+    Подписчики (subscribe) получают изменения сразу после фиксации транзакции, в которой
+    они сделаны, — так кэши процесса (app.core.fleet_state) обновляются без опроса журнала.
+
+    Порядок номеров совпадает с порядком фиксации: в SQLite пишет один писатель, в PostgreSQL
+    записи журнала добавляются под транзакционной advisory-блокировкой, в MySQL / MariaDB —
+    под блокировкой строки change_log_state (SELECT ... FOR UPDATE, держится до конца транзакции).
+    Иначе клиент, опрашивающий журнал, мог бы пропустить запись, зафиксированную позже
+    записи с большим номером.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction, aliased
+
+from app.config import settings
+from app.db.models import ChangeLogEntry, ChangeLogState
+from app.utils.dates import utc_now
+
+logger = logging.getLogger(__name__)
+
+TRUCK = "truck"
+MODEL = "model"
+
+# Ключ advisory-блокировки журнала в PostgreSQL
+_PG_LOCK_KEY = 0x6368616E6765
+
+# Блокировка строки состояния журнала в MySQL / MariaDB (строка создается миграцией 7)
+_LOCK_STATE_STMT = select(ChangeLogState.id).where(ChangeLogState.id == 1).with_for_update()
+
+# Записей, удаляемых за один запрос при сжатии
+_COMPACT_BATCH = 5000
+
+_changes_since_compaction = 0
+_background: Set[asyncio.Task] = set()
+
+# Изменения текущей транзакции сессии — до фиксации
+_PENDING_KEY = "pending_changes"
+# Сколько изменений было на момент открытия каждой вложенной точки сохранения
+_SAVEPOINTS_KEY = "pending_changes_savepoints"
+
+ChangeListener = Callable[[List[Dict[str, Any]]], None]
+_listeners: List[ChangeListener] = []
+
+
+def truck_data(truck: Any) -> Dict[str, Any]:
+    """ Состояние самосвала для журнала (объект или строка с теми же полями) """
+    return {
+        "id": truck.id,
+        "board_number": truck.board_number,
+        "model_id": truck.model_id,
+        "current_weight": truck.current_weight,
+    }
+
+
+def model_data(model: Any) -> Dict[str, Any]:
+    """ Состояние модели для журнала """
+    return {"id": model.id, "name": model.name, "max_capacity": model.max_capacity}
+
+
+async def record_changes(
+        db: AsyncSession,
+        entity: str,
+        op: str,
+        items: Iterable[Tuple[int, Optional[Dict[str, Any]]]],
+) -> None:
+    """ Добавить записи журнала (entity_id, data) в текущей транзакции """
+    rows = [{"entity": entity, "entity_id": entity_id, "op": op, "data": data} for entity_id, data in items]
+    if not rows:
+        return
+
+    # Номера из последовательности выдаются до фиксации; блокировка до конца транзакции
+    # не дает более позднему номеру стать видимым раньше более раннего
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    elif dialect in ("mysql", "mariadb"):
+        await db.execute(_LOCK_STATE_STMT)
+    await db.execute(insert(ChangeLogEntry.__table__), rows)
+    db.info.setdefault(_PENDING_KEY, []).extend(rows)
+
+
+def subscribe(listener: ChangeListener) -> None:
+    """ Получать зафиксированные изменения: listener(записи без seq) вызывается синхронно после COMMIT """
+    _listeners.append(listener)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.nested:
+        session.info.setdefault(_SAVEPOINTS_KEY, []).append(len(session.info.get(_PENDING_KEY, ())))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    if session.get_nested_transaction() is not None:
+        # RELEASE точки сохранения: изменения ждут фиксации внешней транзакции
+        session.info[_SAVEPOINTS_KEY].pop()
+        return
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for listener in _listeners:
+        try:
+            listener(changes)
+        except Exception:
+            logger.exception("Ошибка подписчика журнала изменений")
+    # Считаются только зафиксированные изменения: откаченные не приближают сжатие
+    _schedule_compaction(len(changes))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    if session.get_nested_transaction() is not None:
+        # Откат к точке сохранения (операция писателя групповой фиксации): отбрасываются
+        # только изменения, сделанные после нее
+        mark = session.info[_SAVEPOINTS_KEY].pop()
+        del session.info.get(_PENDING_KEY, [])[mark:]
+        return
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _schedule_compaction(count: int) -> None:
+    """ Каждые changes.compact_every изменений процесса — фоновая задача сжатия журнала """
+    global _changes_since_compaction
+    _changes_since_compaction += count
+    if not settings.changes.compact_every or _changes_since_compaction < settings.changes.compact_every:
+        return
+    _changes_since_compaction = 0
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    async def submit() -> None:
+        from app.core.jobs import job_runner
+
+        try:
+            await job_runner.submit("compact_changes", {})
+        except Exception as e:
+            logger.warning("Не удалось поставить сжатие журнала изменений: %s", e)
+
+    # Не из текущей операции: она может выполняться внутри писателя групповой фиксации
+    task = loop.create_task(submit())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def get_purged_seq(db: AsyncSession) -> int:
+    return await db.scalar(select(ChangeLogState.purged_seq).where(ChangeLogState.id == 1)) or 0
+
+
+async def get_last_seq(db: AsyncSession) -> int:
+    """ Номер последнего изменения (последняя запись могла быть удалена сжатием — тогда граница) """
+    last = await db.scalar(select(func.max(ChangeLogEntry.seq))) or 0
+    return max(last, await get_purged_seq(db))
+
+
+async def get_changes(
+        db: AsyncSession,
+        since: int,
+        limit: int,
+        entity: Optional[str] = None,
+) -> Tuple[List[ChangeLogEntry], bool]:
+    """
+        Изменения с номером больше since, по возрастанию номера.
+        :return (записи, есть ли еще)
+    """
+    stmt = select(ChangeLogEntry).where(ChangeLogEntry.seq > since).order_by(ChangeLogEntry.seq).limit(limit + 1)
+    if entity:
+        stmt = stmt.where(ChangeLogEntry.entity == entity)
+    entries = list((await db.execute(stmt)).scalars())
+    return entries[:limit], len(entries) > limit
+
+
+async def compact_superseded(db: AsyncSession) -> int:
+    """
+        Удалить порцию записей, замененных более поздними записями той же сущности.
+        :return сколько удалено (0 — замененных не осталось)
+    """
+    newer = aliased(ChangeLogEntry)
+    seqs = list((await db.execute(
+        select(ChangeLogEntry.seq)
+        .where(
+            select(newer.seq)
+            .where(
+                newer.entity == ChangeLogEntry.entity,
+                newer.entity_id == ChangeLogEntry.entity_id,
+                newer.seq > ChangeLogEntry.seq,
+            )
+            .exists()
+        )
+        .limit(_COMPACT_BATCH)
+    )).scalars())
+    if seqs:
+        await db.execute(delete(ChangeLogEntry).where(ChangeLogEntry.seq.in_(seqs)))
+    return len(seqs)
+
+
+async def purge_tombstones(db: AsyncSession) -> int:
+    """
+        Удалить порцию записей об удалении старше changes.retention_hours и сдвинуть границу.
+        :return сколько удалено (0 — старых записей не осталось)
+    """
+    seqs = list((await db.execute(
+        select(ChangeLogEntry.seq)
+        .where(
+            ChangeLogEntry.op == "delete",
+            ChangeLogEntry.changed_at < utc_now() - timedelta(hours=settings.changes.retention_hours),
+        )
+        .order_by(ChangeLogEntry.seq)
+        .limit(_COMPACT_BATCH)
+    )).scalars())
+    if not seqs:
+        return 0
+
+    await db.execute(delete(ChangeLogEntry).where(ChangeLogEntry.seq.in_(seqs)))
+    state = await db.get(ChangeLogState, 1)
+    if state is None:
+        db.add(ChangeLogState(id=1, purged_seq=seqs[-1]))
+    else:
+        state.purged_seq = max(state.purged_seq, seqs[-1])
+    await db.flush()
+    return len(seqs)
@@ -0,0 +1,170 @@
+"""
+    Запросы по парку на стороне БД — для состояния парка в памяти (app.core.fleet_state):
+    загрузка, сверка и ответы, пока состояние еще не загружено.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import DumpTruck, ModelTruck
+
+# Процент загрузки как в DumpTruck.load_percentage; перегруз — вес больше грузоподъемности
+LOAD = func.round(cast(DumpTruck.current_weight, Float) * 100 / ModelTruck.max_capacity, 2)
+OVERLOADED = DumpTruck.current_weight > ModelTruck.max_capacity
+
+FLEET_COLUMNS = (
+    DumpTruck.id, DumpTruck.board_number, DumpTruck.model_id, DumpTruck.current_weight,
+    ModelTruck.max_capacity, LOAD.label("load_percentage"),
+)
+
+TRUCK_ROWS_STMT = select(DumpTruck.id, DumpTruck.board_number, DumpTruck.model_id, DumpTruck.current_weight)
+
+MODEL_ROWS_STMT = select(ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity)
+
+
+def fleet_row(row: Any) -> Dict[str, Any]:
+    """ Строка ответа: самосвал с грузоподъемностью модели и процентом загрузки """
+    return {
+        "id": row.id,
+        "board_number": row.board_number,
+        "model_id": row.model_id,
+        "current_weight": row.current_weight,
+        "max_capacity": row.max_capacity,
+        "load_percentage": float(row.load_percentage),
+        "is_overloaded": row.current_weight > row.max_capacity,
+    }
+
+
+def _filters(
+        model_id: Optional[int],
+        min_load: Optional[float],
+        max_load: Optional[float],
+        overloaded: Optional[bool],
+        board_number: Optional[str],
+) -> List[Any]:
+    filters = []
+    if model_id is not None:
+        filters.append(DumpTruck.model_id == model_id)
+    if min_load is not None:
+        filters.append(LOAD >= min_load)
+    if max_load is not None:
+        filters.append(LOAD <= max_load)
+    if overloaded is not None:
+        filters.append(OVERLOADED if overloaded else ~OVERLOADED)
+    if board_number:
+        filters.append(DumpTruck.board_number.ilike(f"%{board_number}%"))
+    return filters
+
+
+_ORDERS = {
+    "id": (DumpTruck.id,),
+    "load_desc": (LOAD.desc(), DumpTruck.id),
+    "load_asc": (LOAD.asc(), DumpTruck.id),
+}
+
+
+async def query_fleet(
+        db: AsyncSession,
+        model_id: Optional[int] = None,
+        min_load: Optional[float] = None,
+        max_load: Optional[float] = None,
+        overloaded: Optional[bool] = None,
+        board_number: Optional[str] = None,
+        order: str = "id",
+        skip: int = 0,
+        limit: int = 50,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """ Самосвалы с фильтрами по модели, загрузке, перегрузу и бортовому номеру """
+    filters = _filters(model_id, min_load, max_load, overloaded, board_number)
+    base = select(*FLEET_COLUMNS).join(ModelTruck, DumpTruck.model_id == ModelTruck.id).where(*filters)
+    total = await db.scalar(select(func.count()).select_from(base.subquery()))
+    rows = await db.execute(base.order_by(*_ORDERS[order]).offset(skip).limit(limit))
+    return [fleet_row(row) for row in rows], total
+
+
+async def top_overloaded(db: AsyncSession, n: int) -> List[Dict[str, Any]]:
+    """ n самосвалов с наибольшим отношением веса к грузоподъемности среди перегруженных """
+    rows = await db.execute(
+        select(*FLEET_COLUMNS)
+        .join(ModelTruck, DumpTruck.model_id == ModelTruck.id)
+        .where(OVERLOADED)
+        .order_by((cast(DumpTruck.current_weight, Float) / ModelTruck.max_capacity).desc(), DumpTruck.id)
+        .limit(n)
+    )
+    return [fleet_row(row) for row in rows]
+
+
+async def suggest_board_numbers(db: AsyncSession, query: str, limit: int) -> List[Dict[str, Any]]:
+    """
+        Подсказки бортовых номеров запросом к БД, в порядке app.core.board_index: сначала
+        начинающиеся с образца, затем содержащие его (образец от 3 символов), по возрастанию номера.
+        Образец уже нормализован и состоит из букв и цифр — экранирование LIKE не нужно.
+    """
+    columns = select(DumpTruck.id, DumpTruck.board_number).order_by(DumpTruck.board_number)
+    rows = (await db.execute(columns.where(DumpTruck.board_number.like(f"{query}%")).limit(limit))).all()
+    if len(rows) < limit and len(query) >= 3:
+        rows += (await db.execute(
+            columns
+            .where(DumpTruck.board_number.like(f"%{query}%"), DumpTruck.board_number.not_like(f"{query}%"))
+            .limit(limit - len(rows))
+        )).all()
+    return [{"id": row.id, "board_number": row.board_number} for row in rows]
+
+
+async def fleet_summary(db: AsyncSession) -> List[Dict[str, Any]]:
+    """ Сводка по моделям: самосвалы, перегруженные, суммарный вес, средняя загрузка """
+    overloaded = func.sum(case((OVERLOADED, 1), else_=0))
+    rows = await db.execute(
+        select(
+            ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity,
+            func.count(DumpTruck.id).label("trucks"),
+            overloaded.label("overloaded"),
+            func.coalesce(func.sum(DumpTruck.current_weight), 0).label("total_weight"),
+        )
+        .outerjoin(DumpTruck, DumpTruck.model_id == ModelTruck.id)
+        .group_by(ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity)
+        .order_by(ModelTruck.id)
+    )
+    return [
+        {
+            "model_id": row.id,
+            "model_name": row.name,
+            "max_capacity": row.max_capacity,
+            "trucks": row.trucks,
+            "overloaded": int(row.overloaded or 0),
+            "total_weight": int(row.total_weight),
+            "avg_load_percentage": (
+                round(row.total_weight * 100 / (row.trucks * row.max_capacity), 2) if row.trucks else 0
+            ),
+        }
+        for row in rows
+    ]
+
+
+async def dispatch_candidates(
+        db: AsyncSession,
+        model_id: Optional[int] = None,
+        truck_ids: Optional[List[int]] = None,
+) -> Dict[str, np.ndarray]:
+    """ Самосвалы без перегруза массивами для распределения грузов, как FleetState.dispatch_candidates """
+    filters = [DumpTruck.current_weight < ModelTruck.max_capacity]
+    if model_id is not None:
+        filters.append(DumpTruck.model_id == model_id)
+    if truck_ids is not None:
+        filters.append(DumpTruck.id.in_(truck_ids))
+    rows = (await db.execute(
+        select(DumpTruck.id, DumpTruck.board_number, DumpTruck.model_id, DumpTruck.current_weight, ModelTruck.max_capacity)
+        .join(ModelTruck, DumpTruck.model_id == ModelTruck.id)
+        .where(*filters)
+        .order_by(DumpTruck.id)
+    )).all()
+    columns = list(zip(*rows)) or [()] * 5
+    return {
+        "id": np.array(columns[0], dtype=np.int64),
+        "board_number": np.array(columns[1], dtype=str),
+        "model_id": np.array(columns[2], dtype=np.int64),
+        "current_weight": np.array(columns[3], dtype=np.int64),
+        "max_capacity": np.array(columns[4], dtype=np.int64),
+    }
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import IdempotencyKey
+from app.schemas.http_response import IdempotencyKeyConflictError
+from app.utils.dates import utc_now
+
+
+async def get_idempotency_record(db: AsyncSession, scope: str, key: str) -> Optional[IdempotencyKey]:
+    """ Сохраненный результат по ключу идемпотентности (просроченные не учитываются) """
+    record = await db.get(IdempotencyKey, (scope, key))
+    if record is None or record.created_at < _expired_before():
+        return None
+    return record
+
+
+async def save_idempotency_record(db: AsyncSession, scope: str, key: str, request_hash: str, response: Any) -> None:
+    """
+        Сохранить результат в текущей транзакции; заодно удаляются просроченные ключи.
+        IdempotencyKeyConflictError — ключ уже сохранил параллельный запрос (нарушение первичного ключа)
+    """
+    await db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.created_at < _expired_before(),
+    ))
+    # Просроченная запись с тем же ключом уже удалена выше
+    try:
+        async with db.begin_nested():
+            db.add(IdempotencyKey(scope=scope, key=key, request_hash=request_hash, response=response))
+    except IntegrityError as e:
+        raise IdempotencyKeyConflictError("Запрос с этим ключом идемпотентности уже выполняется") from e
+
+
+def _expired_before() -> datetime:
+    # created_at заполняется CURRENT_TIMESTAMP БД — время в UTC
+    return utc_now() - timedelta(hours=settings.idempotency_ttl_hours)
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Job
+from app.utils.dates import utc_now
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+async def create_job(db: AsyncSession, job_id: str, kind: str, params: Dict[str, Any]) -> Job:
+    """ Новая задача в очереди """
+    job = Job(id=job_id, kind=kind, status="queued", params=params, progress=0.0)
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[Job]:
+    return await db.get(Job, job_id)
+
+
+async def get_jobs_list(db: AsyncSession, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    """ Последние задачи, новые первыми """
+    stmt = select(Job).order_by(Job.created_at.desc(), Job.id).limit(limit)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    return list((await db.execute(stmt)).scalars())
+
+
+async def update_job(db: AsyncSession, job_id: str, from_statuses: tuple, **values) -> bool:
+    """
+        Изменить задачу, только если она в одном из статусов from_statuses.
+        :return False — статус уже другой (например, задачу отменили)
+    """
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_(from_statuses))
+        .values(**values)
+    )
+    return result.rowcount > 0
+
+
+async def fail_interrupted_jobs(db: AsyncSession) -> int:
+    """ Задачи, выполнявшиеся до перезапуска, не будут продолжены — помечаем их ошибкой """
+    result = await db.execute(
+        update(Job)
+        .where(Job.status.in_(ACTIVE_STATUSES))
+        .values(status="failed", error="Прервано перезапуском приложения", finished_at=utc_now())
+    )
+    return result.rowcount
+
+
+async def delete_expired_jobs(db: AsyncSession) -> List[str]:
+    """
+        Удалить завершенные задачи старше jobs.retention_hours.
+        :return файлы результатов удаленных задач
+    """
+    expired = (
+        Job.status.not_in(ACTIVE_STATUSES),
+        Job.created_at < utc_now() - timedelta(hours=settings.jobs.retention_hours),
+    )
+    files = list((await db.execute(select(Job.result_file).where(*expired, Job.result_file.is_not(None)))).scalars())
+    await db.execute(delete(Job).where(*expired))
+    return files
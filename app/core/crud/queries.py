@@ -0,0 +1,165 @@
+"""
+    Заранее построенные запросы для горячих CRUD-операций.
+    Запросы создаются один раз с параметрами привязки (bindparam), поэтому на каждый
+    вызов не тратится время на построение выражения, а ключ кэша компиляции SQLAlchemy
+    у них постоянный — скомпилированная форма переиспользуется.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, bindparam, func, or_, select
+from sqlalchemy.orm import selectinload
+
+from app.db.models.trucks import DumpTruck, ModelTruck
+
+
+# ──── САМОСВАЛЫ ────
+TRUCK_BY_ID_STMT = (
+    select(DumpTruck)
+    .options(selectinload(DumpTruck.model), selectinload(DumpTruck.anomalies))
+    .where(DumpTruck.id == bindparam("truck_id"))
+)
+
+TRUCK_ID_BY_BOARD_NUMBER_STMT = (
+    select(DumpTruck.id)
+    .where(DumpTruck.board_number.ilike(bindparam("board_number")))
+)
+
+TRUCK_ID_BY_BOARD_NUMBER_EXCLUDING_STMT = (
+    select(DumpTruck.id)
+    .where(
+        DumpTruck.board_number.ilike(bindparam("board_number")),
+        DumpTruck.id != bindparam("exclude_id"),
+    )
+)
+
+
+def truck_filters(by_board_number: bool, by_model_name: bool) -> List[Any]:
+    """ Условия фильтрации списка самосвалов (общие для выборки страницы и подсчета) """
+    filters = []
+    if by_board_number:
+        filters.append(DumpTruck.board_number.ilike(bindparam("board_pattern")))
+    if by_model_name:
+        filters.append(DumpTruck.model.has(ModelTruck.name.ilike(bindparam("model_pattern"))))
+    return filters
+
+
+def truck_filter_params(
+    board_number: Optional[str] = None,
+    model_name: Optional[str] = None,
+) -> Tuple[Tuple[bool, bool], Dict[str, Any]]:
+    """ Набор включенных фильтров и значения их параметров """
+    params = {}
+    if board_number:
+        params["board_pattern"] = f"%{board_number}%"
+    if model_name:
+        params["model_pattern"] = f"%{model_name}%"
+    return (bool(board_number), bool(model_name)), params
+
+
+@lru_cache(maxsize=None)
+def trucks_page_stmt(by_board_number: bool, by_model_name: bool) -> Select:
+    """ Страница списка самосвалов для заданного набора фильтров """
+    return (
+        select(DumpTruck)
+        .options(selectinload(DumpTruck.model), selectinload(DumpTruck.anomalies))
+        .where(*truck_filters(by_board_number, by_model_name))
+        .order_by(DumpTruck.id)
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+
+
+@lru_cache(maxsize=None)
+def trucks_count_stmt(by_board_number: bool, by_model_name: bool) -> Select:
+    """ Подсчет самосвалов для заданного набора фильтров """
+    return (
+        select(func.count(DumpTruck.id))
+        .where(*truck_filters(by_board_number, by_model_name))
+    )
+
+
+# ──── СИНХРОНИЗАЦИЯ ────
+TRUCKS_BY_BOARD_NUMBERS_STMT = (
+    select(DumpTruck.id, DumpTruck.board_number, DumpTruck.model_id, DumpTruck.current_weight)
+    .where(DumpTruck.board_number.in_(bindparam("board_numbers", expanding=True)))
+)
+
+TRUCK_BOARD_NUMBERS_STMT = select(DumpTruck.id, DumpTruck.board_number)
+
+MODEL_IDS_STMT = (
+    select(ModelTruck.id)
+    .where(ModelTruck.id.in_(bindparam("model_ids", expanding=True)))
+)
+
+
+def _upsert_stmt(dialect_name: str, table, key: str, columns: Tuple[str, ...]):
+    """
+        INSERT ... ON CONFLICT (key) DO UPDATE для пакетной вставки (executemany).
+        Существующая строка обновляется, только если значения columns действительно изменились.
+    """
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update(
+            **{column: stmt.inserted[column] for column in columns},
+            updated_at=func.now(),
+        )
+
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"UPSERT не поддерживается для {dialect_name}")
+
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[key]],
+        set_={**{column: stmt.excluded[column] for column in columns}, "updated_at": func.now()},
+        where=or_(*(table.c[column] != stmt.excluded[column] for column in columns)),
+    )
+
+
+@lru_cache(maxsize=None)
+def upsert_trucks_stmt(dialect_name: str):
+    """ UPSERT самосвалов по бортовому номеру """
+    return _upsert_stmt(dialect_name, DumpTruck.__table__, "board_number", ("model_id", "current_weight"))
+
+
+# ──── МОДЕЛИ ────
+MODEL_ID_BY_NAME_STMT = (
+    select(ModelTruck.id)
+    .where(ModelTruck.name.ilike(bindparam("name")))
+)
+
+MODEL_ID_BY_NAME_EXCLUDING_STMT = (
+    select(ModelTruck.id)
+    .where(
+        ModelTruck.name.ilike(bindparam("name")),
+        ModelTruck.id != bindparam("exclude_id"),
+    )
+)
+
+MODELS_PAGE_STMT = (
+    select(ModelTruck)
+    .order_by(ModelTruck.name)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+MODELS_COUNT_STMT = select(func.count(ModelTruck.id))
+
+MODEL_IDS_BY_NAME_STMT = select(ModelTruck.id, ModelTruck.name)
+
+MODELS_BY_NAMES_STMT = (
+    select(ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity)
+    .where(ModelTruck.name.in_(bindparam("names", expanding=True)))
+)
+
+
+@lru_cache(maxsize=None)
+def upsert_models_stmt(dialect_name: str):
+    """ UPSERT моделей по названию """
+    return _upsert_stmt(dialect_name, ModelTruck.__table__, "name", ("max_capacity",))
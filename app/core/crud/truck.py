@@ -1,14 +1,26 @@
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.db.models.trucks import DumpTruck, ModelTruck
-from app.schemas import DumpTruckCreateSchema
+from app.core.crud.changes import TRUCK, record_changes, truck_data
+from app.core.crud.queries import (
+    TRUCK_BY_ID_STMT, TRUCK_ID_BY_BOARD_NUMBER_STMT, TRUCK_ID_BY_BOARD_NUMBER_EXCLUDING_STMT,
+    TRUCKS_BY_BOARD_NUMBERS_STMT, TRUCK_BOARD_NUMBERS_STMT, MODEL_IDS_STMT,
+    truck_filter_params, trucks_page_stmt, trucks_count_stmt, upsert_trucks_stmt,
+)
+from app.db.models import DumpTruck, ModelTruck, TruckAnomaly, WeightSample
+from app.schemas import DumpTruckCreateSchema, TruckSyncItemSchema
 from app.schemas.http_response import (
     TruckNotFoundError, TruckModelNotFoundError, DuplicateBoardNumberError
 )
+from app.utils.dates import utc_now
+
+
+def _add_weight_sample(db: AsyncSession, truck_id: int, weight: int) -> None:
+    """ Показание веса в историю телеметрии — для анализа аномалий (app.core.anomalies) """
+    db.add(WeightSample(truck_id=truck_id, recorded_at=utc_now(), weight=weight))
 
 
 async def create_truck(
@@ -23,18 +35,20 @@ async def create_truck(
         raise TruckModelNotFoundError("Модель самосвала с таким ID не найдена")
 
     # уникальность бортового номера
-    stmt = select(DumpTruck.id).where(
-        DumpTruck.board_number.ilike(payload.board_number)
-    )
-    if await db.scalar(stmt):
+    if await db.scalar(TRUCK_ID_BY_BOARD_NUMBER_STMT, {"board_number": payload.board_number}):
         raise DuplicateBoardNumberError("Самосвал с таким бортовым номером уже существует")
 
-    truck = DumpTruck(**payload.model_dump())
+    # updated_at новой записи пуст; задан явно — иначе INSERT дочитывал бы его отдельным SELECT
+    truck = DumpTruck(**payload.model_dump(), updated_at=None)
     db.add(truck)
-    await db.commit()
-    await db.refresh(truck)
+    await db.flush()
 
-    await db.refresh(truck, ['model'])
+    # Связи нового самосвала известны без запросов: модель уже загружена, аномалий еще нет —
+    # ответ той же формы, что у GET и PUT (с anomaly_flags)
+    set_committed_value(truck, "model", model)
+    set_committed_value(truck, "anomalies", [])
+    _add_weight_sample(db, truck.id, truck.current_weight)
+    await record_changes(db, TRUCK, "create", [(truck.id, truck_data(truck))])
     return truck
 
 
@@ -43,8 +57,7 @@ async def get_truck_by_id(
     truck_id: int
 ) -> DumpTruck:
     """ Получить самосвал по ID """
-    stmt = select(DumpTruck).options(selectinload(DumpTruck.model)).where(DumpTruck.id == truck_id)
-    result = await db.execute(stmt)
+    result = await db.execute(TRUCK_BY_ID_STMT, {"truck_id": truck_id})
     truck = result.unique().scalar_one_or_none()
     if not truck:
         raise TruckNotFoundError(f"Самосвал с ID {truck_id} не найден")
@@ -62,39 +75,12 @@ async def get_trucks_list(
         Получить список самосвалов с фильтрацией и пагинацией.
         :return (список самосвалов, общее количество)
     """
-    stmt = (
-        select(DumpTruck)
-        .options(selectinload(DumpTruck.model))
-        .order_by(DumpTruck.id)
-    )
-
-    # Фильтры
-    if board_number:
-        stmt = stmt.where(
-            DumpTruck.board_number.ilike(f"%{board_number}%")
-        )
-
-    if model_name:
-        stmt = stmt.where(
-            DumpTruck.model.has(ModelTruck.name.ilike(f"%{model_name}%"))
-        )
+    filters, params = truck_filter_params(board_number, model_name)
 
     # Подсчет общего количества
-    count_stmt = select(func.count(DumpTruck.id))
-
-    if board_number:
-        count_stmt = count_stmt.where(
-            DumpTruck.board_number.ilike(f"%{board_number}%")
-        )
-    if model_name:
-        count_stmt = count_stmt.where(
-            DumpTruck.model.has(ModelTruck.name.ilike(f"%{model_name}%"))
-        )
-
-    total_count = await db.scalar(count_stmt)
+    total_count = await db.scalar(trucks_count_stmt(*filters), params)
 
-    stmt = stmt.offset(skip).limit(limit)
-    result = await db.execute(stmt)
+    result = await db.execute(trucks_page_stmt(*filters), {**params, "skip": skip, "limit": limit})
     trucks = list(result.unique().scalars().all())
 
     return trucks, total_count
@@ -112,34 +98,183 @@ async def update_truck(
     """
 
     # Проверяем изменение модели
+    model = truck.model
     if payload.model_id != truck.model_id:
-        if not await db.get(ModelTruck, payload.model_id):
+        model = await db.get(ModelTruck, payload.model_id)
+        if not model:
             raise TruckModelNotFoundError("Новая модель самосвала не найдена")
 
     # Проверяем уникальность бортового номера
     if payload.board_number.lower() != truck.board_number.lower():
-        stmt = select(DumpTruck.id).where(
-            DumpTruck.board_number.ilike(payload.board_number),
-            DumpTruck.id != truck.id,
-        )
-        if await db.scalar(stmt):
+        params = {"board_number": payload.board_number, "exclude_id": truck.id}
+        if await db.scalar(TRUCK_ID_BY_BOARD_NUMBER_EXCLUDING_STMT, params):
             raise DuplicateBoardNumberError("Самосвал с таким бортовым номером уже существует")
 
+    # Каждое показание — в историю, и повтор прежнего веса тоже: по повторам видны залипшие весы
+    _add_weight_sample(db, truck.id, payload.current_weight)
+
     truck.model_id = payload.model_id
     truck.board_number = payload.board_number
     truck.current_weight = payload.current_weight
 
-    # Перезагружаем объект со всеми связями
-    await db.refresh(truck)
-    stmt = select(DumpTruck).options(selectinload(DumpTruck.model)).where(DumpTruck.id == truck.id)
-    result = await db.execute(stmt)
-    refreshed_truck = result.unique().scalar_one()
+    await db.flush()
+
+    # Без повторной выборки: updated_at вернул сам UPDATE, новая модель уже загружена
+    # проверкой выше, аномалии изменением не затрагиваются
+    set_committed_value(truck, "model", model)
+    await record_changes(db, TRUCK, "update", [(truck.id, truck_data(truck))])
 
-    return refreshed_truck
+    return truck
 
 
 async def delete_truck(db: AsyncSession, truck: DumpTruck) -> None:
     """ Удалить самосвал """
 
+    tombstone = {"id": truck.id, "board_number": truck.board_number}
+    await db.execute(delete(WeightSample).where(WeightSample.truck_id == truck.id))
+    await db.execute(delete(TruckAnomaly).where(TruckAnomaly.truck_id == truck.id))
     await db.delete(truck)
-    await db.commit()
\ No newline at end of file
+    await db.flush()
+    await record_changes(db, TRUCK, "delete", [(tombstone["id"], tombstone)])
+
+
+# Строк в одном IN (...) и в одном пакете UPSERT
+SYNC_BATCH_SIZE = 500
+
+
+async def sync_trucks(
+    db: AsyncSession,
+    items: List[TruckSyncItemSchema],
+    delete_missing: bool = False,
+) -> Dict[str, int]:
+    """
+        Синхронизация с эталонным списком по бортовому номеру.
+        Сравнение и запись — пакетами: выборка существующих по IN (...),
+        вставка и изменение одним INSERT ... ON CONFLICT на пакет.
+        :return сводка изменений
+    """
+    # Все модели списка должны существовать
+    model_ids = sorted({item.model_id for item in items})
+    found_models = set()
+    for start in range(0, len(model_ids), SYNC_BATCH_SIZE):
+        chunk = model_ids[start:start + SYNC_BATCH_SIZE]
+        found_models.update((await db.execute(MODEL_IDS_STMT, {"model_ids": chunk})).scalars())
+    missing_models = [model_id for model_id in model_ids if model_id not in found_models]
+    if missing_models:
+        raise TruckModelNotFoundError(f"Модели самосвалов не найдены: {missing_models}")
+
+    # Текущее состояние самосвалов из списка
+    board_numbers = [item.board_number for item in items]
+    existing = await _trucks_by_board_numbers(db, board_numbers)
+
+    rows = []
+    readings = {}
+    summary = {"received": len(items), "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    for item in items:
+        current = existing.get(item.board_number)
+        if current is None:
+            weight = item.current_weight if item.current_weight is not None else 0
+            readings[item.board_number] = weight
+            summary["inserted"] += 1
+        else:
+            weight = item.current_weight if item.current_weight is not None else current.current_weight
+            if item.current_weight is not None:
+                readings[item.board_number] = weight
+            if current.model_id == item.model_id and current.current_weight == weight:
+                summary["unchanged"] += 1
+                continue
+            summary["updated"] += 1
+        rows.append({"board_number": item.board_number, "model_id": item.model_id, "current_weight": weight})
+
+    written = await _write_truck_rows(db, rows, existing)
+    await _add_weight_samples(db, readings, {**{b: row.id for b, row in existing.items()}, **written})
+
+    if delete_missing:
+        keep = set(board_numbers)
+        stale = [row for row in await db.execute(TRUCK_BOARD_NUMBERS_STMT) if row.board_number not in keep]
+        for start in range(0, len(stale), SYNC_BATCH_SIZE):
+            chunk = stale[start:start + SYNC_BATCH_SIZE]
+            chunk_ids = [row.id for row in chunk]
+            await db.execute(delete(WeightSample).where(WeightSample.truck_id.in_(chunk_ids)))
+            await db.execute(delete(TruckAnomaly).where(TruckAnomaly.truck_id.in_(chunk_ids)))
+            await db.execute(delete(DumpTruck).where(DumpTruck.id.in_(chunk_ids)))
+            await record_changes(
+                db, TRUCK, "delete", [(row.id, {"id": row.id, "board_number": row.board_number}) for row in chunk],
+            )
+        summary["deleted"] = len(stale)
+
+    return summary
+
+
+async def upsert_trucks(db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+        Вставить или изменить самосвалы по бортовому номеру (модели должны существовать).
+        current_weight None — вес не указан: у существующего самосвала не меняется, новому — 0.
+        :return сколько вставлено, изменено и оставлено без изменений
+    """
+    existing = await _trucks_by_board_numbers(db, [row["board_number"] for row in rows])
+    changed = []
+    readings = {}
+    for row in rows:
+        current = existing.get(row["board_number"])
+        weight = row["current_weight"]
+        if weight is None:
+            weight = current.current_weight if current is not None else 0
+        if row["current_weight"] is not None or current is None:
+            readings[row["board_number"]] = weight
+        if current is None or current.model_id != row["model_id"] or current.current_weight != weight:
+            changed.append({**row, "current_weight": weight})
+    written = await _write_truck_rows(db, changed, existing)
+    await _add_weight_samples(db, readings, {**{b: row.id for b, row in existing.items()}, **written})
+    inserted = sum(row["board_number"] not in existing for row in changed)
+    return {"inserted": inserted, "updated": len(changed) - inserted, "unchanged": len(rows) - len(changed)}
+
+
+async def _trucks_by_board_numbers(db: AsyncSession, board_numbers: List[str]) -> Dict[str, Any]:
+    """ Текущее состояние самосвалов по бортовым номерам (пакетами IN (...)) """
+    found = {}
+    for start in range(0, len(board_numbers), SYNC_BATCH_SIZE):
+        chunk = board_numbers[start:start + SYNC_BATCH_SIZE]
+        for row in await db.execute(TRUCKS_BY_BOARD_NUMBERS_STMT, {"board_numbers": chunk}):
+            found[row.board_number] = row
+    return found
+
+
+async def _write_truck_rows(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    existing: Dict[str, Any],
+) -> Dict[str, int]:
+    """
+        UPSERT измененных строк пакетами и записи журнала изменений для них
+        :return ID записанных самосвалов по бортовому номеру
+    """
+    ids = {}
+    stmt = upsert_trucks_stmt(db.bind.dialect.name)
+    for start in range(0, len(rows), SYNC_BATCH_SIZE):
+        chunk = rows[start:start + SYNC_BATCH_SIZE]
+        await db.execute(stmt, chunk)
+
+        # ID новых самосвалов известны только после вставки
+        written = await _trucks_by_board_numbers(db, [row["board_number"] for row in chunk])
+        ids.update({board_number: truck.id for board_number, truck in written.items()})
+        for op, is_new in (("create", True), ("update", False)):
+            await record_changes(db, TRUCK, op, [
+                (truck.id, truck_data(truck)) for truck in written.values()
+                if (truck.board_number not in existing) is is_new
+            ])
+    return ids
+
+
+async def _add_weight_samples(db: AsyncSession, readings: Dict[str, int], ids: Dict[str, int]) -> None:
+    """
+        Показания веса пакетами в историю телеметрии, как при создании и изменении по одному:
+        каждое переданное, в том числе равное прежнему весу
+    """
+    now = utc_now()
+    samples = [
+        {"truck_id": ids[board_number], "recorded_at": now, "weight": weight}
+        for board_number, weight in readings.items()
+    ]
+    for start in range(0, len(samples), SYNC_BATCH_SIZE):
+        await db.execute(insert(WeightSample.__table__), samples[start:start + SYNC_BATCH_SIZE])
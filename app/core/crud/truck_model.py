@@ -1,8 +1,12 @@
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.crud.changes import MODEL, model_data, record_changes
+from app.core.crud.queries import (
+    MODEL_ID_BY_NAME_STMT, MODEL_ID_BY_NAME_EXCLUDING_STMT, MODELS_PAGE_STMT, MODELS_COUNT_STMT,
+    MODELS_BY_NAMES_STMT, upsert_models_stmt,
+)
 from app.db.models.trucks import ModelTruck
 from app.schemas.http_response import ModelNotFoundError, DuplicateModelNameError
 from app.schemas import TruckModelCreateSchema
@@ -15,16 +19,14 @@ async def create_model(
     """Создать модель самосвала"""
 
     # Проверяем уникальность названия модели
-    stmt = select(ModelTruck.id).where(
-        ModelTruck.name.ilike(payload.name)
-    )
-    if await db.scalar(stmt):
+    if await db.scalar(MODEL_ID_BY_NAME_STMT, {"name": payload.name}):
         raise DuplicateModelNameError("Модель с таким названием уже существует")
 
     model = ModelTruck(**payload.model_dump())
     db.add(model)
-    await db.commit()
+    await db.flush()
     await db.refresh(model)
+    await record_changes(db, MODEL, "create", [(model.id, model_data(model))])
     return model
 
 
@@ -48,16 +50,9 @@ async def get_models_list(
     """ Получить список всех моделей """
 
     # Подсчет общего количества
-    count_stmt = select(func.count(ModelTruck.id))
-    total_count = await db.scalar(count_stmt)
-
-    stmt = (
-        select(ModelTruck)
-        .order_by(ModelTruck.name)
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(stmt)
+    total_count = await db.scalar(MODELS_COUNT_STMT)
+
+    result = await db.execute(MODELS_PAGE_STMT, {"skip": skip, "limit": limit})
     models = list(result.scalars().all())
 
     return models, total_count
@@ -72,18 +67,16 @@ async def update_model(
 
     # Проверяем уникальность названия
     if payload.name.lower() != model.name.lower():
-        stmt = select(ModelTruck.id).where(
-            ModelTruck.name.ilike(payload.name),
-            ModelTruck.id != model.id,
-        )
-        if await db.scalar(stmt):
+        params = {"name": payload.name, "exclude_id": model.id}
+        if await db.scalar(MODEL_ID_BY_NAME_EXCLUDING_STMT, params):
             raise DuplicateModelNameError("Модель с таким названием уже существует")
 
     model.name = payload.name
     model.max_capacity = payload.max_capacity
 
-    await db.commit()
+    await db.flush()
     await db.refresh(model)
+    await record_changes(db, MODEL, "update", [(model.id, model_data(model))])
     return model
 
 
@@ -93,5 +86,47 @@ async def delete_model(
 ) -> None:
     """ Удалить модель самосвала """
 
+    tombstone = {"id": model.id, "name": model.name}
     await db.delete(model)
-    await db.commit()
\ No newline at end of file
+    await db.flush()
+    await record_changes(db, MODEL, "delete", [(tombstone["id"], tombstone)])
+
+
+# Строк в одном IN (...) и в одном пакете UPSERT
+UPSERT_BATCH_SIZE = 500
+
+
+async def upsert_models(db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+        Вставить или изменить модели по названию.
+        :return сколько вставлено, изменено и оставлено без изменений
+    """
+    existing = await _models_by_names(db, [row["name"] for row in rows])
+    changed = [
+        row for row in rows
+        if (current := existing.get(row["name"])) is None or current.max_capacity != row["max_capacity"]
+    ]
+
+    stmt = upsert_models_stmt(db.bind.dialect.name)
+    for start in range(0, len(changed), UPSERT_BATCH_SIZE):
+        chunk = changed[start:start + UPSERT_BATCH_SIZE]
+        await db.execute(stmt, chunk)
+
+        written = await _models_by_names(db, [row["name"] for row in chunk])
+        for op, is_new in (("create", True), ("update", False)):
+            await record_changes(db, MODEL, op, [
+                (model.id, model_data(model)) for model in written.values()
+                if (model.name not in existing) is is_new
+            ])
+
+    inserted = sum(row["name"] not in existing for row in changed)
+    return {"inserted": inserted, "updated": len(changed) - inserted, "unchanged": len(rows) - len(changed)}
+
+
+async def _models_by_names(db: AsyncSession, names: List[str]) -> Dict[str, Any]:
+    found = {}
+    for start in range(0, len(names), UPSERT_BATCH_SIZE):
+        chunk = names[start:start + UPSERT_BATCH_SIZE]
+        for row in await db.execute(MODELS_BY_NAMES_STMT, {"names": chunk}):
+            found[row.name] = row
+    return found
\ No newline at end of file
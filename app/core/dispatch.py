@@ -0,0 +1,136 @@
+"""
+    Распределение ожидающих погрузки грузов по самосвалам (задача упаковки в контейнеры).
+
+    Контейнер — самосвал, его вместимость — свободная грузоподъемность: max_capacity за вычетом
+    резерва и текущего веса. Грузы назначаются так, чтобы ни один самосвал не был перегружен,
+    а недогруз использованных самосвалов был минимальным: «лучший подходящий по убыванию»
+    (best-fit decreasing) — грузы от тяжелых к легким, каждый в самосвал с наименьшим
+    свободным местом, куда он помещается. Свободные места хранятся в отсортированном
+    списке, подходящий самосвал ищется двоичным поиском: O(L log L + L log T) сравнений
+    на L грузов и T самосвалов (плюс сдвиги списка при вставке).
+
+    Самосвалы, у которых свободного места меньше самого легкого груза, из списка
+    выбывают. Если время расчета вышло, оставшиеся грузы возвращаются неназначенными.
+"""
+from bisect import bisect_left, insort
+from time import perf_counter
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Как часто сверяться с ограничением времени, грузов
+_DEADLINE_CHECK = 256
+
+
+def free_capacity(trucks: Dict[str, np.ndarray], reserve_percentage: float) -> np.ndarray:
+    """ Свободная грузоподъемность с учетом резерва на погрешность весов; у перегруженных — отрицательная """
+    limit = np.floor(trucks["max_capacity"] * (1 - reserve_percentage / 100)).astype(np.int64)
+    return limit - trucks["current_weight"]
+
+
+def best_fit_decreasing(
+        free: np.ndarray,
+        weights: np.ndarray,
+        deadline: float,
+) -> Dict[str, Any]:
+    """
+        Назначить грузы weights самосвалам со свободным местом free.
+        :param deadline: момент perf_counter(), после которого назначение прекращается
+        :return bins — позиция самосвала для каждого груза (-1 — не назначен),
+                timed_out — позиции грузов, до которых не дошла очередь
+    """
+    bins = np.full(len(weights), -1, dtype=np.int64)
+    if not len(weights):
+        return {"bins": bins, "timed_out": np.zeros(0, dtype=np.int64)}
+
+    order = np.argsort(-weights, kind="stable")
+    lightest = int(weights.min())
+    usable = np.flatnonzero(free >= lightest)
+    # Пары (свободное место, позиция самосвала): при равном месте — самосвал с меньшей позицией
+    slots = sorted(zip(free[usable].tolist(), usable.tolist()))
+
+    sorted_weights = weights[order].tolist()
+    for number, (load, weight) in enumerate(zip(order.tolist(), sorted_weights)):
+        if number % _DEADLINE_CHECK == 0 and perf_counter() > deadline:
+            return {"bins": bins, "timed_out": order[number:]}
+        i = bisect_left(slots, (weight, -1))
+        if i == len(slots):
+            continue
+        space, truck = slots.pop(i)
+        bins[load] = truck
+        if space - weight >= lightest:
+            insort(slots, (space - weight, truck))
+    return {"bins": bins, "timed_out": np.zeros(0, dtype=np.int64)}
+
+
+def plan_dispatch(
+        trucks: Dict[str, np.ndarray],
+        load_ids: List[str],
+        weights: np.ndarray,
+        reserve_percentage: float,
+        time_limit: float,
+) -> Dict[str, Any]:
+    """
+        План погрузки: по каждому задействованному самосвалу — грузы и вес после погрузки,
+        неназначенные грузы с причиной и сводка.
+        :param trucks: массивы id, board_number, model_id, current_weight, max_capacity
+    """
+    start = perf_counter()
+    free = free_capacity(trucks, reserve_percentage)
+    result = best_fit_decreasing(free, weights, start + time_limit)
+    bins = result["bins"]
+
+    assigned = np.flatnonzero(bins >= 0)
+    used, slot = np.unique(bins[assigned], return_inverse=True)
+    assigned_weight = np.bincount(slot, weights=weights[assigned], minlength=len(used)).astype(np.int64)
+    loads_by_truck: List[List[str]] = [[] for _ in range(len(used))]
+    for load, position in zip(assigned.tolist(), slot.tolist()):
+        loads_by_truck[position].append(load_ids[load])
+
+    before = trucks["current_weight"][used]
+    capacity = trucks["max_capacity"][used]
+    after = before + assigned_weight
+    plan = [
+        {
+            "truck_id": truck_id,
+            "board_number": board,
+            "model_id": model_id,
+            "max_capacity": max_capacity,
+            "current_weight": weight,
+            "loads": loads,
+            "assigned_weight": added,
+            "weight_after": total,
+            "load_percentage_after": round(total * 100 / max_capacity, 2),
+        }
+        for truck_id, board, model_id, max_capacity, weight, loads, added, total in zip(
+            trucks["id"][used].tolist(), trucks["board_number"][used].tolist(), trucks["model_id"][used].tolist(),
+            capacity.tolist(), before.tolist(), loads_by_truck, assigned_weight.tolist(), after.tolist(),
+        )
+    ]
+
+    timed_out = np.zeros(len(weights), dtype=bool)
+    timed_out[result["timed_out"]] = True
+    unassigned = [
+        {"id": load_ids[load], "weight": weight, "reason": "time_limit" if late else "no_capacity"}
+        for load, weight, late in zip(
+            np.flatnonzero(bins < 0).tolist(), weights[bins < 0].tolist(), timed_out[bins < 0].tolist(),
+        )
+    ]
+
+    capacity_total = int(capacity.sum())
+    return {
+        "trucks": plan,
+        "unassigned": unassigned,
+        "summary": {
+            "loads": len(weights),
+            "assigned": len(assigned),
+            "unassigned": len(unassigned),
+            "assigned_weight": int(assigned_weight.sum()),
+            "trucks_available": int(np.count_nonzero(free > 0)),
+            "trucks_used": len(used),
+            "unused_capacity": int((np.floor(capacity * (1 - reserve_percentage / 100)) - after).sum()),
+            "fill_percentage": round(int(after.sum()) * 100 / capacity_total, 2) if capacity_total else 0.0,
+            "complete": not len(result["timed_out"]),
+            "seconds": round(perf_counter() - start, 4),
+        },
+    }
@@ -0,0 +1,570 @@
+"""
+    Состояние парка в памяти процесса: самосвалы в колоночных массивах NumPy.
+
+    Фильтры по модели и загрузке, поиск перегруженных, top-N и сводка по моделям
+    считаются векторно по массивам, без запросов к БД. Пока состояние не загружено
+    (или отключено fleet_state.enabled), API отвечает запросами к БД (app.core.crud.fleet).
+
+    Актуальность:
+      - изменения этого процесса применяются сразу после COMMIT (подписка на журнал изменений);
+      - изменения других процессов — опросом change_log каждые fleet_state.poll_interval секунд;
+      - если позиция опроса удалена сжатием журнала — полная перезагрузка.
+    Записи журнала несут состояние целиком, поэтому повторное применение безопасно.
+
+    Загрузка: сначала запоминается номер последнего изменения, затем самосвалы читаются
+    порциями по ключу в новые массивы, которые подменяют текущие; изменения, сделанные
+    во время загрузки, догоняются опросом с запомненного номера.
+"""
+import asyncio
+import logging
+import sys
+from time import monotonic, perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.core.board_index import BoardIndex
+from app.core.crud.changes import MODEL, TRUCK, get_changes, get_last_seq, get_purged_seq, subscribe
+from app.core.crud.fleet import MODEL_ROWS_STMT, TRUCK_ROWS_STMT
+from app.db.models import DumpTruck
+from app.db.session import AsyncSessionLocal
+from app.utils.indexed_heap import IndexedHeap
+
+logger = logging.getLogger(__name__)
+
+# Строк за один запрос при загрузке и сверке
+_PAGE_SIZE = 20_000
+
+# Записей журнала за один запрос опроса
+_POLL_PAGE = 5000
+
+# Начальная емкость массивов; при заполнении емкость удваивается
+_MIN_CAPACITY = 1024
+
+ORDERS = ("id", "load_desc", "load_asc")
+
+
+def load_percentages(weights: np.ndarray, capacities: np.ndarray) -> np.ndarray:
+    """ Процент загрузки как в DumpTruck.load_percentage: округление до 2 знаков, не меньше 0 """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loads = np.round(weights / capacities * 100, 2)
+    return np.where(capacities > 0, np.maximum(loads, 0), 0.0)
+
+
+def _padded(pages: List[np.ndarray], capacity: int, dtype: Any) -> np.ndarray:
+    """ Порции колонки одним массивом емкостью capacity """
+    values = np.concatenate(pages).astype(dtype) if pages else np.zeros(0, dtype=dtype)
+    column = np.zeros(capacity, dtype=values.dtype)
+    column[:len(values)] = values
+    return column
+
+
+async def _truck_pages() -> Any:
+    """ Самосвалы порциями по ключу — короткими запросами, не держа транзакцию чтения """
+    last = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                TRUCK_ROWS_STMT.where(DumpTruck.id > last).order_by(DumpTruck.id).limit(_PAGE_SIZE)
+            )).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+class FleetState:
+    """ Самосвалы процесса в массивах: позиция строки — по ID через словарь, удаление — перестановкой последней строки """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.applied_seq = 0
+        self._size = 0
+        self._pos: Dict[int, int] = {}
+        self._allocate(0)
+
+        # Грузоподъемность по ID модели (0 — модели нет) и названия моделей
+        self._capacities = np.zeros(0, dtype=np.int64)
+        self._model_names: Dict[int, str] = {}
+
+        # Перегруженные самосвалы по убыванию отношения веса к грузоподъемности: ключ (-отношение, ID)
+        self._overloaded = IndexedHeap()
+
+        # Бортовые номера для подсказок; пока индекс перестраивается в потоке, его изменения копятся в журнале
+        self._board_index = BoardIndex()
+        self._board_index_log: Optional[List[Tuple[int, Optional[str], Optional[str]]]] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+        self._stats = {
+            "loads": 0,
+            "reloads_after_compaction": 0,
+            "write_through_changes": 0,
+            "polled_changes": 0,
+            "poll_errors": 0,
+            "board_index_rebuilds": 0,
+            "last_load_seconds": 0.0,
+        }
+        self._loaded_at: Optional[float] = None
+
+    # ──── МАССИВЫ ────
+    def _allocate(self, capacity: int, board_width: int = 16) -> None:
+        capacity = max(capacity, _MIN_CAPACITY)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._model_ids = np.zeros(capacity, dtype=np.int64)
+        self._weights = np.zeros(capacity, dtype=np.int64)
+        self._loads = np.zeros(capacity, dtype=np.float64)
+        self._boards = np.zeros(capacity, dtype=f"U{board_width}")
+
+    def _grow(self, capacity: int, board_width: int) -> None:
+        """ Увеличить емкость и/или ширину бортового номера, сохранив строки """
+        old = (self._ids, self._model_ids, self._weights, self._loads, self._boards)
+        self._allocate(capacity, board_width)
+        for new, current in zip((self._ids, self._model_ids, self._weights, self._loads, self._boards), old):
+            new[:self._size] = current[:self._size]
+
+    def _ensure_room(self, board: str) -> None:
+        width = self._boards.dtype.itemsize // 4
+        full = self._size == len(self._ids)
+        if full or len(board) > width:
+            self._grow(len(self._ids) * 2 if full else len(self._ids), max(width, len(board) * 2))
+
+    def _set_capacity(self, model_id: int, capacity: int) -> None:
+        if model_id >= len(self._capacities):
+            grown = np.zeros(max(model_id + 1, len(self._capacities) * 2), dtype=np.int64)
+            grown[:len(self._capacities)] = self._capacities
+            self._capacities = grown
+        self._capacities[model_id] = capacity
+
+    def _capacity_at(self, model_id: int) -> int:
+        return int(self._capacities[model_id]) if model_id < len(self._capacities) else 0
+
+    def _capacity_of(self, model_ids: np.ndarray) -> np.ndarray:
+        known = model_ids < len(self._capacities)
+        return np.where(known, self._capacities[np.where(known, model_ids, 0)], 0)
+
+    # ──── ИЗМЕНЕНИЯ ────
+    def _index_board(self, truck_id: int, old_board: Optional[str], new_board: Optional[str]) -> None:
+        self._board_index.update(truck_id, old_board, new_board)
+        if self._board_index_log is not None:
+            self._board_index_log.append((truck_id, old_board, new_board))
+
+    def _rank(self, truck_id: int, weight: int, capacity: int) -> None:
+        """ Поддержать кучу перегруженных после изменения веса или грузоподъемности """
+        if 0 < capacity < weight:
+            self._overloaded.set(truck_id, (-weight / capacity, truck_id))
+        else:
+            self._overloaded.discard(truck_id)
+
+    def _upsert_truck(self, data: Dict[str, Any]) -> None:
+        truck_id, board = data["id"], data["board_number"]
+        pos = self._pos.get(truck_id)
+        if pos is None:
+            self._ensure_room(board)
+            pos = self._size
+            self._size += 1
+            self._pos[truck_id] = pos
+            self._index_board(truck_id, None, board)
+        else:
+            self._index_board(truck_id, str(self._boards[pos]), board)
+            if len(board) > self._boards.dtype.itemsize // 4:
+                self._ensure_room(board)
+
+        model_id, weight = data["model_id"], data["current_weight"]
+        self._ids[pos] = truck_id
+        self._boards[pos] = board
+        self._model_ids[pos] = model_id
+        self._weights[pos] = weight
+        capacity = self._capacity_at(model_id)
+        self._loads[pos] = load_percentages(np.array(weight), np.array(capacity))
+        self._rank(truck_id, weight, capacity)
+
+    def _delete_truck(self, truck_id: int) -> None:
+        self._overloaded.discard(truck_id)
+        pos = self._pos.pop(truck_id, None)
+        if pos is None:
+            return
+        self._index_board(truck_id, str(self._boards[pos]), None)
+        last = self._size - 1
+        if pos != last:
+            for column in (self._ids, self._model_ids, self._weights, self._loads, self._boards):
+                column[pos] = column[last]
+            self._pos[int(self._ids[pos])] = pos
+        self._size = last
+
+    def _apply_model(self, model_id: int, data: Optional[Dict[str, Any]]) -> None:
+        if data is None:
+            self._model_names.pop(model_id, None)
+            self._set_capacity(model_id, 0)
+        else:
+            self._model_names[model_id] = data["name"]
+            self._set_capacity(model_id, data["max_capacity"])
+
+        # Грузоподъемность изменилась — пересчитать загрузку самосвалов модели
+        rows = np.flatnonzero(self._model_ids[:self._size] == model_id)
+        if len(rows):
+            capacity = self._capacity_at(model_id)
+            self._loads[rows] = load_percentages(self._weights[rows], capacity)
+            for truck_id, weight in zip(self._ids[rows].tolist(), self._weights[rows].tolist()):
+                self._rank(truck_id, weight, capacity)
+
+    def apply(self, changes: Iterable[Dict[str, Any]]) -> int:
+        """ Применить записи журнала (entity, entity_id, op, data) по порядку """
+        applied = 0
+        for change in changes:
+            if change["entity"] == TRUCK:
+                if change["op"] == "delete":
+                    self._delete_truck(change["entity_id"])
+                else:
+                    self._upsert_truck(change["data"])
+            elif change["entity"] == MODEL:
+                self._apply_model(change["entity_id"], None if change["op"] == "delete" else change["data"])
+            applied += 1
+        return applied
+
+    def _on_commit(self, changes: List[Dict[str, Any]]) -> None:
+        """ Подписчик журнала: изменения этого процесса — сразу после фиксации """
+        if self.ready:
+            self._stats["write_through_changes"] += self.apply(changes)
+
+    # ──── ЗАГРУЗКА И ОПРОС ────
+    async def load(self) -> None:
+        """ Полная загрузка из БД с подменой массивов и догоняющим опросом журнала """
+        async with self._refresh_lock:
+            await self._load()
+
+    async def catch_up(self) -> int:
+        """ Применить изменения из журнала после applied_seq; позиция удалена сжатием — перезагрузка """
+        async with self._refresh_lock:
+            return await self._catch_up()
+
+    async def _load(self) -> None:
+        start = perf_counter()
+        async with AsyncSessionLocal() as db:
+            seq = await get_last_seq(db)
+            models = (await db.execute(MODEL_ROWS_STMT)).all()
+
+        pages = []
+        async for rows in _truck_pages():
+            pages.append(tuple(np.array(column) for column in zip(*rows)))
+
+        # Сборка целиком до подмены: запросы во время загрузки видят прежнее состояние
+        size = sum(len(page[0]) for page in pages)
+        capacity = max(size * 2, _MIN_CAPACITY)
+        ids, boards, model_ids, weights = (
+            _padded([page[i] for page in pages], capacity, dtype)
+            for i, dtype in enumerate((np.int64, str, np.int64, np.int64))
+        )
+        if boards.dtype.itemsize // 4 < 16:
+            boards = boards.astype("U16")
+
+        self._capacities = np.zeros(0, dtype=np.int64)
+        for model_id, _, max_capacity in models:
+            self._set_capacity(model_id, max_capacity)
+        self._model_names = {model_id: name for model_id, name, _ in models}
+        loads = np.zeros(capacity, dtype=np.float64)
+        capacities = self._capacity_of(model_ids[:size])
+        loads[:size] = load_percentages(weights[:size], capacities)
+        over = np.flatnonzero((capacities > 0) & (weights[:size] > capacities))
+        over_ids = ids[over].tolist()
+        self._overloaded.build(zip(zip((-weights[over] / capacities[over]).tolist(), over_ids), over_ids))
+        board_index = BoardIndex()
+        await asyncio.to_thread(board_index.build, ids[:size], boards[:size])
+        self._board_index = board_index
+
+        self._ids, self._boards, self._model_ids, self._weights, self._loads = ids, boards, model_ids, weights, loads
+        self._size = size
+        self._pos = dict(zip(ids[:size].tolist(), range(size)))
+        self.applied_seq = seq
+        self.ready = True
+
+        self._stats["loads"] += 1
+        self._stats["last_load_seconds"] = round(perf_counter() - start, 3)
+        self._loaded_at = monotonic()
+        await self._catch_up()
+
+    async def _catch_up(self) -> int:
+        polled = 0
+        async with AsyncSessionLocal() as db:
+            if self.applied_seq < await get_purged_seq(db):
+                self._stats["reloads_after_compaction"] += 1
+                reload = True
+            else:
+                reload = False
+                while True:
+                    entries, has_more = await get_changes(db, self.applied_seq, _POLL_PAGE)
+                    polled += self.apply(
+                        {"entity": e.entity, "entity_id": e.entity_id, "op": e.op, "data": e.data}
+                        for e in entries
+                    )
+                    if entries:
+                        self.applied_seq = entries[-1].seq
+                    if not has_more:
+                        break
+        if reload:
+            await self._load()
+        self._stats["polled_changes"] += polled
+        return polled
+
+    async def _rebuild_board_index(self) -> None:
+        """
+            Перестроить индекс номеров по снимку массивов в потоке; изменения, сделанные
+            во время построения, затем применяются к новому индексу
+        """
+        async with self._refresh_lock:
+            size = self._size
+            ids, boards = self._ids[:size].copy(), self._boards[:size].copy()
+            self._board_index_log = []
+            try:
+                board_index = BoardIndex()
+                await asyncio.to_thread(board_index.build, ids, boards)
+                for change in self._board_index_log:
+                    board_index.update(*change)
+                self._board_index = board_index
+                self._stats["board_index_rebuilds"] += 1
+            finally:
+                self._board_index_log = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.ready:
+                    await self.catch_up()
+                    if self._board_index.stale:
+                        await self._rebuild_board_index()
+                else:
+                    await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._stats["poll_errors"] += 1
+                logger.exception("Ошибка обновления состояния парка")
+            await asyncio.sleep(settings.fleet_state.poll_interval)
+
+    async def start(self) -> None:
+        """ Загрузить (fleet_state.warm_on_startup) и запустить опрос журнала """
+        if not settings.fleet_state.enabled or self._task is not None:
+            return
+        if settings.fleet_state.warm_on_startup:
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Состояние парка не загружено при запуске, ответы из БД до загрузки")
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.ready = False
+
+    # ──── ЗАПРОСЫ ────
+    def _rows(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        model_ids = self._model_ids[positions]
+        capacities = self._capacity_of(model_ids)
+        weights = self._weights[positions]
+        return [
+            {
+                "id": truck_id,
+                "board_number": board,
+                "model_id": model_id,
+                "current_weight": weight,
+                "max_capacity": capacity,
+                "load_percentage": load,
+                "is_overloaded": weight > capacity,
+            }
+            for truck_id, board, model_id, weight, capacity, load in zip(
+                self._ids[positions].tolist(), self._boards[positions].tolist(), model_ids.tolist(),
+                weights.tolist(), capacities.tolist(), self._loads[positions].tolist(),
+            )
+        ]
+
+    def _first(self, positions: np.ndarray, keys: np.ndarray, k: int) -> np.ndarray:
+        """ Первые k позиций по (keys, id): частичная сортировка вместо полной, если k мало """
+        ids = self._ids[positions]
+        if k < len(positions):
+            # Все строки с ключом не больше k-го — с ними и равные ему, порядок по ID решает lexsort
+            kth = np.partition(keys, k - 1)[k - 1]
+            candidates = np.flatnonzero(keys <= kth)
+            positions, keys, ids = positions[candidates], keys[candidates], ids[candidates]
+        return positions[np.lexsort((ids, keys))][:k]
+
+    def query(
+            self,
+            model_id: Optional[int] = None,
+            min_load: Optional[float] = None,
+            max_load: Optional[float] = None,
+            overloaded: Optional[bool] = None,
+            board_number: Optional[str] = None,
+            order: str = "id",
+            skip: int = 0,
+            limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """ Те же фильтры и порядок, что app.core.crud.fleet.query_fleet """
+        size = self._size
+        loads = self._loads[:size]
+        mask = np.ones(size, dtype=bool)
+        if model_id is not None:
+            mask &= self._model_ids[:size] == model_id
+        if min_load is not None:
+            mask &= loads >= min_load
+        if max_load is not None:
+            mask &= loads <= max_load
+        if overloaded is not None:
+            over = self._weights[:size] > self._capacity_of(self._model_ids[:size])
+            mask &= over if overloaded else ~over
+        positions = np.flatnonzero(mask)
+
+        # Подстрока бортового номера — после числовых фильтров, по оставшимся строкам.
+        # Номера хранятся в верхнем регистре (DumpTruckCreateSchema), поэтому регистр приводится только у образца
+        if board_number and len(positions):
+            positions = positions[np.strings.find(self._boards[positions], board_number.upper()) >= 0]
+
+        total = len(positions)
+        if skip >= total or limit <= 0:
+            return [], total
+
+        if order == "id":
+            keys = self._ids[positions]
+        elif order == "load_desc":
+            keys = -self._loads[positions]
+        else:
+            keys = self._loads[positions]
+        return self._rows(self._first(positions, keys, skip + limit)[skip:]), total
+
+    def top_overloaded(self, n: int) -> List[Dict[str, Any]]:
+        """ n самосвалов с наибольшим перегрузом — из кучи, без просмотра всего парка """
+        positions = [self._pos[truck_id] for _, truck_id in self._overloaded.smallest(n)]
+        return self._rows(np.array(positions, dtype=np.int64))
+
+    def suggest(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """ Подсказки бортовых номеров: см. BoardIndex.suggest """
+        return self._board_index.suggest(query, limit)
+
+    def dispatch_candidates(
+            self,
+            model_id: Optional[int] = None,
+            truck_ids: Optional[List[int]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """ Массивы самосвалов для распределения грузов (app.core.dispatch), копии строк без перегруза """
+        size = self._size
+        capacities = self._capacity_of(self._model_ids[:size])
+        mask = (capacities > 0) & (self._weights[:size] < capacities)
+        if model_id is not None:
+            mask &= self._model_ids[:size] == model_id
+        if truck_ids is not None:
+            mask &= np.isin(self._ids[:size], np.asarray(truck_ids, dtype=np.int64))
+        positions = np.flatnonzero(mask)
+        return {
+            "id": self._ids[positions],
+            "board_number": self._boards[positions],
+            "model_id": self._model_ids[positions],
+            "current_weight": self._weights[positions],
+            "max_capacity": capacities[positions],
+        }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """ Сводка по моделям, как app.core.crud.fleet.fleet_summary """
+        size = self._size
+        model_ids = self._model_ids[:size]
+        length = max(len(self._capacities), int(model_ids.max()) + 1 if size else 0)
+        trucks = np.bincount(model_ids, minlength=length)
+        weights = np.bincount(model_ids, weights=self._weights[:size], minlength=length)
+        overloaded = np.bincount(
+            model_ids, weights=self._weights[:size] > self._capacity_of(model_ids), minlength=length,
+        )
+
+        summary = []
+        for model_id, name in sorted(self._model_names.items()):
+            capacity = self._capacity_at(model_id)
+            count = int(trucks[model_id])
+            total_weight = int(weights[model_id])
+            summary.append({
+                "model_id": model_id,
+                "model_name": name,
+                "max_capacity": capacity,
+                "trucks": count,
+                "overloaded": int(overloaded[model_id]),
+                "total_weight": total_weight,
+                "avg_load_percentage": round(total_weight * 100 / (count * capacity), 2) if count and capacity else 0,
+            })
+        return summary
+
+    # ──── СВЕРКА И СОСТОЯНИЕ ────
+    async def verify(self, samples: int = 20) -> Dict[str, Any]:
+        """
+            Сверить массивы с БД после догоняющего опроса.
+            При одновременной записи последние изменения могут дать временные расхождения.
+        """
+        if not self.ready:
+            return {"ready": False}
+        await self.catch_up()
+        start = perf_counter()
+
+        missing, mismatched, seen = [], [], set()
+        async for rows in _truck_pages():
+            for truck_id, board, model_id, weight in rows:
+                seen.add(truck_id)
+                pos = self._pos.get(truck_id)
+                if pos is None:
+                    missing.append(truck_id)
+                elif (str(self._boards[pos]), int(self._model_ids[pos]), int(self._weights[pos])) != (board, model_id, weight):
+                    mismatched.append(truck_id)
+        extra = [truck_id for truck_id in self._pos if truck_id not in seen]
+
+        # Куча перегруженных должна совпадать с перегруженными по массивам
+        size = self._size
+        capacities = self._capacity_of(self._model_ids[:size])
+        over = (capacities > 0) & (self._weights[:size] > capacities)
+        heap_consistent = (
+            len(self._overloaded) == int(over.sum())
+            and all(truck_id in self._overloaded for truck_id in self._ids[:size][over].tolist())
+        )
+
+        async with AsyncSessionLocal() as db:
+            models = {model_id: (name, capacity) for model_id, name, capacity in await db.execute(MODEL_ROWS_STMT)}
+        models_mismatched = sorted(
+            model_id for model_id in models.keys() | self._model_names.keys()
+            if models.get(model_id) != (self._model_names.get(model_id), self._capacity_at(model_id))
+        )
+
+        return {
+            "ready": True,
+            "consistent": not (missing or extra or mismatched or models_mismatched) and heap_consistent,
+            "overloaded_heap_consistent": heap_consistent,
+            "checked": len(seen),
+            "missing": len(missing),
+            "extra": len(extra),
+            "mismatched": len(mismatched),
+            "models_mismatched": models_mismatched[:samples],
+            "sample_ids": sorted(missing + extra + mismatched)[:samples],
+            "applied_seq": self.applied_seq,
+            "seconds": round(perf_counter() - start, 3),
+        }
+
+    def memory(self) -> Dict[str, int]:
+        """ Память состояния: массивы по емкости и словарь позиций (оценка по размерам объектов) """
+        arrays = sum(column.nbytes for column in (self._ids, self._model_ids, self._weights, self._loads, self._boards))
+        index = sys.getsizeof(self._pos) + sum(sys.getsizeof(key) for key in self._pos)
+        return {"arrays_bytes": int(arrays + self._capacities.nbytes), "index_bytes": index}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.fleet_state.enabled,
+            "ready": self.ready,
+            "trucks": self._size,
+            "capacity": len(self._ids),
+            "models": len(self._model_names),
+            "overloaded": len(self._overloaded),
+            "board_index_bytes": self._board_index.memory(),
+            "applied_seq": self.applied_seq,
+            "loaded_seconds_ago": round(monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            **self._stats,
+            **self.memory(),
+        }
+
+
+fleet_state = FleetState()
+subscribe(fleet_state._on_commit)
@@ -0,0 +1,90 @@
+"""
+    Вычислительные шаги фоновых задач.
+
+    Функции выполняются в пуле процессов (app.core.jobs), поэтому модуль не зависит
+    от приложения: в дочернем процессе импортируется только стандартная библиотека.
+    Агрегаты по порциям строк объединяемы — порции считаются независимо, а итог
+    собирается в родительском процессе.
+"""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# model_id -> [самосвалов, перегруженных, суммарный вес, Counter(процент загрузки -> самосвалов)]
+LoadAggregate = Dict[int, list]
+
+
+def load_aggregate(rows: Sequence[Tuple[int, int, int]]) -> LoadAggregate:
+    """ Агрегат загрузки по порции строк (model_id, max_capacity, current_weight) """
+    aggregate: LoadAggregate = {}
+    for model_id, capacity, weight in rows:
+        item = aggregate.get(model_id)
+        if item is None:
+            item = aggregate[model_id] = [0, 0, 0, Counter()]
+        item[0] += 1
+        item[1] += weight > capacity
+        item[2] += weight
+        item[3][weight * 100 // capacity] += 1
+    return aggregate
+
+
+def merge_aggregates(total: LoadAggregate, part: LoadAggregate) -> LoadAggregate:
+    for model_id, (count, overloaded, weight_sum, histogram) in part.items():
+        item = total.get(model_id)
+        if item is None:
+            total[model_id] = [count, overloaded, weight_sum, histogram]
+            continue
+        item[0] += count
+        item[1] += overloaded
+        item[2] += weight_sum
+        item[3].update(histogram)
+    return total
+
+
+def _percentile(histogram: Counter, count: int, q: float) -> int:
+    rank = max(1, round(q * count))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+    return 0
+
+
+def summarize(aggregate: LoadAggregate, models: Dict[int, Tuple[str, int]]) -> List[Dict[str, Any]]:
+    """ Статистика загрузки по моделям: models — model_id -> (название, грузоподъемность) """
+    summary = []
+    for model_id, (name, capacity) in sorted(models.items()):
+        count, overloaded, weight_sum, histogram = aggregate.get(model_id, [0, 0, 0, Counter()])
+        summary.append({
+            "model_id": model_id,
+            "model_name": name,
+            "max_capacity": capacity,
+            "trucks": count,
+            "overloaded": overloaded,
+            "overloaded_ratio": round(overloaded / count, 4) if count else 0,
+            "avg_load_percentage": round(weight_sum * 100 / (count * capacity), 2) if count else 0,
+            "p50_load_percentage": _percentile(histogram, count, 0.5) if count else 0,
+            "p95_load_percentage": _percentile(histogram, count, 0.95) if count else 0,
+            "max_load_percentage": max(histogram) if count else 0,
+        })
+    return summary
+
+
+def _plain(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def format_rows(fmt: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
+    """ Порция строк выгрузки в CSV (без заголовка) или NDJSON """
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({column: _plain(value) for column, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
@@ -0,0 +1,308 @@
+"""
+    Потоковый импорт самосвалов и моделей из CSV и NDJSON.
+
+    Тело читается по частям и разбирается построчно — файл целиком в память не загружается.
+    Строки проверяются пакетами одной валидацией списка (TypeAdapter), названия моделей
+    разрешаются по справочнику, загруженному одним запросом, а запись идет фиксированными
+    порциями (UPSERT по бортовому номеру / названию модели), каждая — своей транзакцией.
+    Ошибочные строки попадают в отчет с номером строки и не прерывают импорт; повтор
+    бортового номера / названия модели в файле — тоже ошибка строки, записывается первая.
+
+    CSV — первая строка с заголовком, одна запись на строку (переводы строк внутри полей
+    не поддерживаются). Колонки самосвалов: board_number, model_name или model_id,
+    current_weight (без веса у существующего самосвала вес не меняется); моделей: name, max_capacity.
+
+    python -m app.core.importer trucks fleet.csv
+    python -m app.core.importer models models.ndjson --chunk-size 1000
+"""
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import logging
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.crud.queries import MODEL_IDS_BY_NAME_STMT
+from app.core.crud import upsert_trucks
+from app.core.crud.truck_model import upsert_models
+from app.db.writer import write
+from app.schemas import TruckImportSchema, TruckModelCreateSchema
+from app.schemas.http_response import ImportFormatError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+KINDS = ("trucks", "models")
+
+# Сколько строк разбирается и проверяется за один проход
+PARSE_BATCH = 1000
+
+_ADAPTERS = {
+    "trucks": TypeAdapter(List[TruckImportSchema]),
+    "models": TypeAdapter(List[TruckModelCreateSchema]),
+}
+
+Record = Tuple[int, Any]    # (номер строки, запись или текст ошибки разбора)
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """ Формат по Content-Type """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """ Строки текста из потока байтов (UTF-8, BOM допускается) """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_batches(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[List[Record]]:
+    """ Разобранные записи пакетами по PARSE_BATCH; пустые строки пропускаются """
+    header: Optional[List[str]] = None
+    batch: List[Tuple[int, str]] = []
+    line_no = 0
+
+    def parse(lines: List[Tuple[int, str]]) -> List[Record]:
+        if fmt == "ndjson":
+            return [_parse_json(number, line) for number, line in lines]
+        records = []
+        for (number, _), row in zip(lines, csv.reader(line for _, line in lines)):
+            if len(row) != len(header):
+                records.append((number, f"ожидалось колонок: {len(header)}, получено: {len(row)}"))
+            else:
+                # Пустые ячейки — как отсутствующие значения
+                records.append((number, {key: value for key, value in zip(header, row) if value != ""}))
+        return records
+
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip() for name in next(csv.reader([line]))]
+            continue
+        batch.append((line_no, line))
+        if len(batch) >= PARSE_BATCH:
+            yield parse(batch)
+            batch = []
+
+    if batch:
+        yield parse(batch)
+
+
+def _parse_json(number: int, line: str) -> Record:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return number, f"некорректный JSON: {e}"
+    if not isinstance(record, dict):
+        return number, "ожидался JSON-объект"
+    return number, record
+
+
+def validate_batch(kind: str, records: List[Record]) -> Tuple[List[Tuple[int, Any]], List[Tuple[int, str]]]:
+    """
+        Проверка пакета одной валидацией списка.
+        Если в пакете есть ошибки, они собираются по индексам, а оставшиеся строки
+        проверяются повторно (уже без ошибок).
+        :return (проверенные объекты, ошибки) — с номерами строк
+    """
+    errors = [(number, record) for number, record in records if isinstance(record, str)]
+    parsed = [(number, record) for number, record in records if not isinstance(record, str)]
+    adapter = _ADAPTERS[kind]
+
+    try:
+        objects = adapter.validate_python([record for _, record in parsed])
+    except ValidationError as e:
+        bad: Dict[int, str] = {}
+        for error in e.errors(include_url=False, include_input=False):
+            index, *loc = error["loc"]
+            field = ".".join(str(part) for part in loc)
+            bad.setdefault(index, f"{field}: {error['msg']}" if field else error["msg"])
+        errors += [(parsed[index][0], message) for index, message in bad.items()]
+        parsed = [item for index, item in enumerate(parsed) if index not in bad]
+        objects = adapter.validate_python([record for _, record in parsed])
+
+    return [(number, obj) for (number, _), obj in zip(parsed, objects)], sorted(errors)
+
+
+async def _load_models(db: AsyncSession) -> Tuple[Dict[str, int], set]:
+    """ Справочник моделей одним запросом: название (без учета регистра) -> ID и множество ID """
+    rows = (await db.execute(MODEL_IDS_BY_NAME_STMT)).all()
+    return {row.name.lower(): row.id for row in rows}, {row.id for row in rows}
+
+
+class _ImportReport:
+    """ Счетчики и ошибки импорта """
+
+    def __init__(self, kind: str, fmt: str, max_errors: int):
+        self.kind = kind
+        self.format = fmt
+        self.max_errors = max_errors
+        self.rows = self.imported = self.failed = self.chunks = 0
+        self.written = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self.errors: List[Dict[str, Any]] = []
+        self.started = perf_counter()
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = perf_counter() - self.started
+        return {
+            "kind": self.kind,
+            "format": self.format,
+            "rows": self.rows,
+            "imported": self.imported,
+            **self.written,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed) if elapsed else self.rows,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def import_stream(
+        db: AsyncSession,
+        kind: str,
+        fmt: str,
+        chunks: AsyncIterator[bytes],
+        chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+        Импорт из потока байтов.
+        :param kind: trucks или models
+        :param fmt: csv или ndjson
+        :param chunk_size: строк в одной транзакции (по умолчанию bulk_import.chunk_size)
+        :return отчет: счетчики, ошибки по строкам, строк в секунду
+    """
+    if kind not in KINDS:
+        raise ImportFormatError(f"Неизвестный тип данных: {kind}")
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Неподдерживаемый формат: {fmt}; допустимы {', '.join(FORMATS)}")
+
+    chunk_size = chunk_size or settings.bulk_import.chunk_size
+    report = _ImportReport(kind, fmt, settings.bulk_import.max_errors)
+    model_ids, known_model_ids = await _load_models(db) if kind == "trucks" else ({}, set())
+    # Ключ UPSERT -> (номер строки, значения) текущей порции
+    pending: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    # Ключ -> номер первой строки с ним за весь импорт
+    seen: Dict[str, int] = {}
+
+    async def flush() -> None:
+        if not pending:
+            return
+        lines = [number for number, _ in pending.values()]
+        rows = [row for _, row in pending.values()]
+        pending.clear()
+        try:
+            written = await write(db, upsert_trucks if kind == "trucks" else upsert_models, rows=rows)
+        except Exception as e:
+            logger.warning("Порция импорта не записана: %s", e)
+            for number in lines:
+                report.error(number, f"ошибка записи порции: {e}")
+            return
+        report.chunks += 1
+        report.imported += len(rows)
+        for key, value in written.items():
+            report.written[key] += value
+
+    async for records in iter_batches(chunks, fmt):
+        report.rows += len(records)
+        valid, errors = validate_batch(kind, records)
+        for number, message in errors:
+            report.error(number, message)
+
+        for number, obj in valid:
+            key = obj.name if kind == "models" else obj.board_number
+            if key in seen:
+                report.error(number, f"повтор {key}: уже есть в строке {seen[key]}")
+                continue
+            if kind == "models":
+                row = obj.model_dump()
+            else:
+                model_id = obj.model_id if obj.model_id is not None else model_ids.get(obj.model_name.lower())
+                if model_id is None or model_id not in known_model_ids:
+                    report.error(number, f"модель не найдена: {obj.model_name or obj.model_id}")
+                    continue
+                # None — вес не указан: у существующего самосвала не меняется
+                row = {"board_number": obj.board_number, "model_id": model_id, "current_weight": obj.current_weight}
+            seen[key] = number
+            pending[key] = (number, row)
+
+            if len(pending) >= chunk_size:
+                await flush()
+
+    await flush()
+
+    result = report.to_dict()
+    logger.info(
+        "Импорт %s (%s): строк %d, записано %d, ошибок %d, %d строк/с",
+        kind, fmt, result["rows"], result["imported"], result["failed"], result["rows_per_second"],
+    )
+    return result
+
+
+# ──── CLI ────
+
+async def _file_chunks(path: str, size: int = 1 << 20) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, size):
+            yield chunk
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=KINDS, help="Что импортировать")
+    parser.add_argument("path", help="Файл CSV или NDJSON")
+    parser.add_argument("--format", choices=FORMATS, help="Формат (по умолчанию — по расширению файла)")
+    parser.add_argument("--chunk-size", type=int, help="Строк в одной транзакции")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    from app.db.migrations import migrate
+    from app.db.session import AsyncSessionLocal, engine
+
+    async def run() -> Dict[str, Any]:
+        await migrate(engine)
+        try:
+            async with AsyncSessionLocal() as session:
+                return await import_stream(session, args.kind, fmt, _file_chunks(args.path), args.chunk_size)
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(run())
+    for error in report["errors"]:
+        print(f"строка {error['line']}: {error['error']}")
+    print(
+        f"Строк: {report['rows']}, записано: {report['imported']}, ошибок: {report['failed']}, "
+        f"{report['seconds']} с ({report['rows_per_second']} строк/с)"
+    )
+
+
+if __name__ == "__main__":
+    main()
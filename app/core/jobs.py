@@ -0,0 +1,480 @@
+"""
+    Фоновые задачи: выгрузка, импорт, пересчет статистики парка, обслуживание индексов,
+    сжатие журнала изменений.
+
+    Задача сохраняется в таблице jobs и выполняется в фоне процесса, принявшего запрос;
+    одновременно выполняется не больше jobs.concurrency задач, остальные ждут в очереди.
+    Вычислительные шаги (агрегация, форматирование выгрузки) уходят в пул процессов
+    (jobs.process_workers; 0 — в поток), чтобы не занимать цикл событий.
+    Результаты пишутся в файлы каталога jobs.results_dir.
+
+    Отмена работает и между процессами: статус в БД меняется на cancelled, а задача
+    замечает это при очередном сообщении о прогрессе. Задачи, выполнявшиеся
+    до перезапуска приложения, при запуске помечаются ошибкой (app.core.startup).
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import multiprocessing
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.anomalies import FLAGS, detect
+from app.core.crud.anomalies import replace_anomalies, weight_samples_stmt
+from app.core.crud.changes import TRUCK, compact_superseded, get_purged_seq, purge_tombstones
+from app.core.crud.jobs import ACTIVE_STATUSES, create_job, delete_expired_jobs, update_job
+from app.core.fleet_stats import format_rows, load_aggregate, merge_aggregates, summarize
+from app.core.seeding import MAX_WEIGHT
+from app.core.singleflight import AFFECTED_READS, read_coalescer
+from app.db.models import DumpTruck, Job, ModelTruck
+from app.db.session import AsyncSessionLocal, Base
+from app.db.writer import write
+from app.utils.dates import utc_now
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ("export", "import", "stats_rebuild", "reindex", "compact_changes", "anomaly_scan")
+
+# Строк в одной порции выгрузки и пересчета статистики
+PAGE_SIZE = 20_000
+
+
+class JobCancelled(Exception):
+    """ Задачу отменили (возможно, из другого процесса) """
+    pass
+
+
+class JobContext:
+    """ Выполняющаяся задача: параметры, прогресс, вычисления в пуле процессов, файл результата """
+
+    def __init__(self, runner: "JobRunner", job_id: str, params: Dict[str, Any]):
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+        self.result_file: Optional[str] = None
+        self._reported_at = 0.0
+
+    async def progress(self, fraction: float, message: Optional[str] = None, force: bool = False) -> None:
+        """ Сообщить о прогрессе (не чаще jobs.progress_interval); JobCancelled — если задачу отменили """
+        now = asyncio.get_running_loop().time()
+        if not force and now - self._reported_at < settings.jobs.progress_interval:
+            return
+        self._reported_at = now
+        if not await self.runner.update(self.job_id, ("running",), progress=min(fraction, 1.0), message=message):
+            raise JobCancelled()
+
+    async def run_cpu(self, function: Callable[..., Any], *args) -> Any:
+        return await self.runner.run_cpu(function, *args)
+
+    def result_path(self, suffix: str) -> Path:
+        """ Путь к файлу результата задачи """
+        self.result_file = f"{self.job_id}{suffix}"
+        return self.runner.results_dir / self.result_file
+
+
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """ Зарегистрировать обработчик задач типа kind """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+class JobRunner:
+    """ Очередь и выполнение фоновых задач в текущем процессе """
+
+    def __init__(self, concurrency: int, process_workers: int):
+        self.process_workers = process_workers
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def results_dir(self) -> Path:
+        path = Path(settings.jobs.results_dir or Path(tempfile.gettempdir()) / "dump_trucks_jobs")
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    async def submit(self, kind: str, params: Dict[str, Any], job_id: Optional[str] = None) -> Job:
+        """ Сохранить задачу и поставить ее в очередь """
+        job_id = job_id or self.new_job_id()
+        async with AsyncSessionLocal() as db:
+            job, expired_files = await write(db, _create_job, job_id=job_id, kind=kind, params=params)
+        for name in expired_files:
+            (self.results_dir / name).unlink(missing_ok=True)
+
+        # Пустой контекст: задача живет дольше запроса, создавшего ее
+        task = asyncio.get_running_loop().create_task(
+            self._run(job_id, kind, params), context=contextvars.Context(),
+        )
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """ Отменить задачу в очереди или в работе; False — задача уже завершена """
+        async with AsyncSessionLocal() as db:
+            cancelled = await write(
+                db, update_job, job_id=job_id, from_statuses=ACTIVE_STATUSES,
+                status="cancelled", finished_at=utc_now(),
+            )
+        task = self._tasks.get(job_id)
+        if cancelled and task is not None:
+            task.cancel()
+        return cancelled
+
+    async def update(self, job_id: str, from_statuses: Tuple[str, ...], **values) -> bool:
+        """ Изменить задачу, если она еще в одном из статусов from_statuses """
+        async with AsyncSessionLocal() as db:
+            return await write(db, update_job, job_id=job_id, from_statuses=from_statuses, **values)
+
+    async def run_cpu(self, function: Callable[..., Any], *args) -> Any:
+        """ Выполнить function(*args) в пуле процессов """
+        if self.process_workers <= 0:
+            return await asyncio.to_thread(function, *args)
+        if self._pool is None:
+            # spawn: дочерний процесс не наследует цикл событий и соединения с БД
+            self._pool = ProcessPoolExecutor(self.process_workers, mp_context=multiprocessing.get_context("spawn"))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(function, *args))
+
+    async def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        context = JobContext(self, job_id, params)
+        try:
+            async with self._semaphore:
+                if not await self.update(job_id, ("queued",), status="running", started_at=utc_now()):
+                    return  # отменена, пока ждала очереди
+                result = await _HANDLERS[kind](context)
+                finished = await self.update(
+                    job_id, ("running",),
+                    status="succeeded", progress=1.0, message=None,
+                    result=result, result_file=context.result_file, finished_at=utc_now(),
+                )
+                if not finished:
+                    self._discard(context)
+
+        except JobCancelled:
+            self._discard(context)
+        except asyncio.CancelledError:
+            # Отмена через cancel() (статус уже cancelled) или остановка приложения
+            self._discard(context)
+            await self.update(
+                job_id, ACTIVE_STATUSES,
+                status="failed", error="Прервано остановкой приложения", finished_at=utc_now(),
+            )
+            raise
+        except Exception as e:
+            logger.exception("Фоновая задача %s (%s) завершилась ошибкой", job_id, kind)
+            self._discard(context)
+            await self.update(job_id, ("running",), status="failed", error=f"{type(e).__name__}: {e}", finished_at=utc_now())
+
+    def _discard(self, context: JobContext) -> None:
+        if context.result_file:
+            (self.results_dir / context.result_file).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local_tasks": len(self._tasks), "process_workers": self.process_workers}
+
+    async def aclose(self) -> None:
+        """ Прервать задачи этого процесса и остановить пул процессов """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+async def _create_job(db: AsyncSession, job_id: str, kind: str, params: Dict[str, Any]) -> Tuple[Job, List[str]]:
+    # Заодно удаляются задачи старше jobs.retention_hours
+    expired_files = await delete_expired_jobs(db)
+    return await create_job(db, job_id, kind, params), expired_files
+
+
+job_runner = JobRunner(concurrency=settings.jobs.concurrency, process_workers=settings.jobs.process_workers)
+
+
+# ──── ЗАДАЧИ ────
+
+_EXPORTS = {
+    "trucks": (DumpTruck, ("id", "board_number", "model_id", "current_weight", "created_at", "updated_at")),
+    "models": (ModelTruck, ("id", "name", "max_capacity", "created_at", "updated_at")),
+}
+
+
+async def _pages(statement, key_column) -> Any:
+    """
+        Порции строк по ключу (keyset): каждая порция — отдельный короткий запрос,
+        поэтому длинная выгрузка не держит транзакцию чтения (в SQLite она мешала бы записи)
+    """
+    last = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(statement.where(key_column > last).order_by(key_column).limit(PAGE_SIZE))).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+@job_handler("export")
+async def export_job(context: JobContext) -> Dict[str, Any]:
+    """ Выгрузка самосвалов или моделей в CSV / NDJSON """
+    entity, fmt = context.params["entity"], context.params["format"]
+    model, columns = _EXPORTS[entity]
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.count()).select_from(model))
+
+    written = 0
+    statement = select(*(getattr(model, column) for column in columns))
+    with open(context.result_path(f".{fmt}"), "w", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            file.write(",".join(columns) + "\n")
+        async for rows in _pages(statement, model.id):
+            chunk = await context.run_cpu(format_rows, fmt, columns, [tuple(row) for row in rows])
+            await asyncio.to_thread(file.write, chunk)
+            written += len(rows)
+            await context.progress(written / total if total else 1.0, f"Выгружено {written} из {total}")
+
+    return {"entity": entity, "format": fmt, "rows": written}
+
+
+@job_handler("import")
+async def import_job(context: JobContext) -> Dict[str, Any]:
+    """ Импорт из загруженного файла (app.core.importer) """
+    from app.core.importer import import_stream
+
+    upload = context.runner.results_dir / context.params["upload"]
+    size = upload.stat().st_size or 1
+    received = 0
+
+    async def chunks():
+        nonlocal received
+        with open(upload, "rb") as file:
+            while chunk := await asyncio.to_thread(file.read, 1 << 20):
+                received += len(chunk)
+                yield chunk
+                await context.progress(received / size, f"Обработано {received // 1024} КБ из {size // 1024} КБ")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await import_stream(
+                db, context.params["entity"], context.params["format"], chunks(), context.params.get("chunk_size"),
+            )
+    finally:
+        upload.unlink(missing_ok=True)
+
+    # Полный отчет с ошибками по строкам — в файл, в задаче — только счетчики
+    with open(context.result_path(".json"), "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    return {key: value for key, value in report.items() if key != "errors"}
+
+
+@job_handler("stats_rebuild")
+async def stats_rebuild_job(context: JobContext) -> Dict[str, Any]:
+    """
+        Пересчет статистики загрузки по моделям: самосвалы, перегруженные, средняя,
+        медианная и 95-я перцентиль загрузки. Порции агрегируются в пуле процессов
+        параллельно с чтением следующих порций.
+    """
+    async with AsyncSessionLocal() as db:
+        models = {
+            row.id: (row.name, row.max_capacity)
+            for row in await db.execute(select(ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity))
+        }
+        total = await db.scalar(select(func.count(DumpTruck.id)))
+
+    aggregate: Dict[int, list] = {}
+    pending = set()
+    processed = 0
+    statement = select(DumpTruck.id, DumpTruck.model_id, DumpTruck.current_weight)
+
+    async def collect(wait_all: bool) -> None:
+        nonlocal pending
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.ALL_COMPLETED if wait_all else asyncio.FIRST_COMPLETED)
+        for future in done:
+            merge_aggregates(aggregate, future.result())
+
+    try:
+        async for rows in _pages(statement, DumpTruck.id):
+            part = [(row.model_id, models[row.model_id][1], row.current_weight) for row in rows]
+            pending.add(asyncio.ensure_future(context.run_cpu(load_aggregate, part)))
+            if len(pending) >= max(1, context.runner.process_workers):
+                await collect(wait_all=False)
+            processed += len(rows)
+            await context.progress(processed / total if total else 1.0, f"Обработано {processed} из {total}")
+        await collect(wait_all=True)
+    finally:
+        for future in pending:
+            future.cancel()
+
+    summary = summarize(aggregate, models)
+    report = {
+        "generated_at": utc_now().isoformat(),
+        "trucks": sum(item["trucks"] for item in summary),
+        "overloaded": sum(item["overloaded"] for item in summary),
+        "models": summary,
+    }
+    with open(context.result_path(".json"), "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    return report
+
+
+def _maintenance_statements(dialect: str, rebuild: bool) -> List[str]:
+    """ ANALYZE (статистика планировщика) и, при rebuild, перестроение индексов """
+    tables = [table.name for table in Base.metadata.sorted_tables]
+    if dialect == "sqlite":
+        return (["REINDEX"] if rebuild else []) + ["ANALYZE", "PRAGMA optimize"]
+    if dialect == "postgresql":
+        return ([f"REINDEX TABLE {table}" for table in tables] if rebuild else []) + [f"ANALYZE {table}" for table in tables]
+    if dialect in ("mysql", "mariadb"):
+        return [f"{'OPTIMIZE' if rebuild else 'ANALYZE'} TABLE {table}" for table in tables]
+    return []
+
+
+async def _execute(db: AsyncSession, statement: str) -> None:
+    await db.execute(text(statement))
+
+
+@job_handler("reindex")
+async def reindex_job(context: JobContext) -> Dict[str, Any]:
+    """ Обслуживание индексов; через писателя — в SQLite не конкурирует с изменяющими запросами """
+    async with AsyncSessionLocal() as db:
+        dialect = db.bind.dialect.name
+    statements = _maintenance_statements(dialect, context.params.get("rebuild", False))
+
+    timings = []
+    for number, statement in enumerate(statements, start=1):
+        started = asyncio.get_running_loop().time()
+        async with AsyncSessionLocal() as db:
+            await write(db, _execute, statement=statement)
+        timings.append({"statement": statement, "seconds": round(asyncio.get_running_loop().time() - started, 3)})
+        await context.progress(number / len(statements), statement, force=True)
+
+    return {"dialect": dialect, "statements": timings}
+
+
+@job_handler("compact_changes")
+async def compact_changes_job(context: JobContext) -> Dict[str, Any]:
+    """ Сжатие журнала изменений (app.core.crud.changes); каждая порция — отдельная транзакция """
+    removed = {"superseded": 0, "tombstones": 0}
+    for step, operation in ((0, compact_superseded), (1, purge_tombstones)):
+        name = operation.__name__.split("_")[-1]
+        while True:
+            async with AsyncSessionLocal() as db:
+                count = await write(db, operation)
+            if not count:
+                break
+            removed[name] += count
+            await context.progress(step / 2, f"Удалено записей: {sum(removed.values())}")
+
+    async with AsyncSessionLocal() as db:
+        purged_seq = await get_purged_seq(db)
+    return {**removed, "purged_seq": purged_seq}
+
+
+@job_handler("anomaly_scan")
+async def anomaly_scan_job(context: JobContext) -> Dict[str, Any]:
+    """
+        Поиск аномалий показаний веса за последние hours часов (app.core.anomalies).
+        Показания читаются порциями по anomalies.batch_trucks самосвалов, порции считаются
+        в пуле процессов параллельно с чтением следующих; итог заменяет прошлый анализ.
+    """
+    config = settings.anomalies
+    hours = context.params.get("hours") or config.hours
+    params = {
+        "window": config.window,
+        "z_threshold": config.z_threshold,
+        "min_std": config.min_std,
+        "max_rate_per_min": config.max_rate_per_min,
+        "flatline_samples": config.flatline_samples,
+        "drift_samples": config.drift_samples,
+        "max_weight": MAX_WEIGHT,
+    }
+    started = asyncio.get_running_loop().time()
+    detected_at = utc_now()
+    since = detected_at - timedelta(hours=hours)
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.count(DumpTruck.id)))
+
+    anomalies: List[Dict[str, Any]] = []
+    pending = set()
+    processed = samples = 0
+
+    async def collect(wait_all: bool) -> None:
+        nonlocal pending
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.ALL_COMPLETED if wait_all else asyncio.FIRST_COMPLETED)
+        for future in done:
+            anomalies.extend(future.result())
+
+    try:
+        async for rows in _pages(select(DumpTruck.id), DumpTruck.id):
+            for start in range(0, len(rows), config.batch_trucks):
+                batch = rows[start:start + config.batch_trucks]
+                async with AsyncSessionLocal() as db:
+                    readings = (await db.execute(weight_samples_stmt(batch[0].id, batch[-1].id, since))).all()
+                if readings:
+                    truck_ids, times, weights = zip(*readings)
+                    minutes = (np.array(times, dtype="datetime64[us]") - np.datetime64(since, "us")) / np.timedelta64(1, "m")
+                    pending.add(asyncio.ensure_future(context.run_cpu(
+                        detect, np.array(truck_ids, dtype=np.int64), minutes, np.array(weights, dtype=np.int64), params,
+                    )))
+                    if len(pending) >= max(1, context.runner.process_workers):
+                        await collect(wait_all=False)
+                samples += len(readings)
+                processed += len(batch)
+                await context.progress(processed / total if total else 1.0, f"Проверено самосвалов: {processed} из {total}")
+        await collect(wait_all=True)
+    finally:
+        for future in pending:
+            future.cancel()
+
+    rows = [
+        {
+            "truck_id": item["truck_id"],
+            "flag": item["flag"],
+            "samples": item["samples"],
+            "last_at": since + timedelta(minutes=item["last_minute"]),
+            "detected_at": detected_at,
+        }
+        for item in anomalies
+    ]
+    async with AsyncSessionLocal() as db:
+        await write(db, replace_anomalies, rows=rows)
+    # Аномалии не попадают в журнал изменений: чтения с прежними флагами отвязываются здесь
+    read_coalescer.invalidate(AFFECTED_READS[TRUCK])
+
+    seconds = asyncio.get_running_loop().time() - started
+    return {
+        "hours": hours,
+        "trucks": processed,
+        "samples": samples,
+        "trucks_flagged": len({row["truck_id"] for row in rows}),
+        "flags": {flag: sum(1 for row in rows if row["flag"] == flag) for flag in FLAGS},
+        "seconds": round(seconds, 2),
+        "samples_per_second": round(samples / seconds) if seconds else samples,
+    }
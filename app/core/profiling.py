@@ -0,0 +1,81 @@
+import io
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProfileStore:
+    """
+        Хранилище профилей запросов в локальном каталоге.
+        Для каждого профиля сохраняются метаданные (.json), статистика cProfile (.pstats)
+        и, если запрошено, разница снимков tracemalloc (.memory.txt).
+        Хранится не больше max_profiles последних профилей.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def pstats_path(self, profile_id: str) -> Path:
+        return self.directory / f"{profile_id}.pstats"
+
+    def memory_path(self, profile_id: str) -> Path:
+        return self.directory / f"{profile_id}.memory.txt"
+
+    def _meta_path(self, profile_id: str) -> Path:
+        return self.directory / f"{profile_id}.json"
+
+    def save(self, profile_id: str, profiler, meta: Dict[str, Any], memory_report: Optional[str] = None) -> None:
+        """ Сохранить профиль (блокирующая операция, вызывать в отдельном потоке) """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.pstats_path(profile_id)))
+        if memory_report is not None:
+            self.memory_path(profile_id).write_text(memory_report, encoding="utf-8")
+
+        meta = {
+            **meta,
+            "id": profile_id,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "has_memory": memory_report is not None,
+        }
+        self._meta_path(profile_id).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        self._prune()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """ Метаданные профилей, новые первыми """
+        if not self.directory.exists():
+            return []
+        paths = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+
+    def exists(self, profile_id: str) -> bool:
+        return bool(_PROFILE_ID.match(profile_id)) and self._meta_path(profile_id).exists()
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> str:
+        """ Текстовая сводка профиля: самые дорогие функции """
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(str(self.pstats_path(profile_id)), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def _prune(self) -> None:
+        """ Удалить самые старые профили сверх лимита """
+        for meta in self.list()[self.max_profiles:]:
+            for path in (self._meta_path(meta["id"]), self.pstats_path(meta["id"]), self.memory_path(meta["id"])):
+                path.unlink(missing_ok=True)
+
+
+profile_store = ProfileStore(settings.profiling.dir, settings.profiling.max_profiles)
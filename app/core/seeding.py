@@ -0,0 +1,355 @@
+"""
+    Генератор синтетического парка самосвалов для нагрузочного тестирования.
+
+    Данные пишутся пакетными вставками Core (executemany) крупными транзакциями,
+    идентификаторы назначаются заранее — без обращения к БД на каждую строку.
+    Содержимое полностью определяется зерном генератора: одинаковые параметры
+    дают одинаковый парк (кроме служебных created_at).
+
+    python -m app.core.seeding --models 24 --trucks 1000000 --overload-ratio 0.1 --seed 42
+    python -m app.core.seeding --trucks 10000 --history 96 --history-end 2025-01-01T00:00
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.db.models import DumpTruck, ModelTruck, WeightSample
+from app.utils.dates import utc_now
+
+# Строк в одном executemany и строк в одной транзакции
+CHUNK_SIZE = 50_000
+COMMIT_ROWS = 500_000
+
+MAX_WEIGHT = 500
+
+# Каталог моделей: (марка, префикс бортового номера, [(серия, грузоподъемность)])
+MODEL_CATALOG: List[Tuple[str, str, List[Tuple[str, int]]]] = [
+    ("БЕЛАЗ", "BL", [("7540", 30), ("7547", 45), ("7555", 60), ("7513", 130), ("75306", 220), ("75710", 450)]),
+    ("Komatsu", "KM", [("HD465", 55), ("HD785", 91), ("830E", 220), ("930E", 290), ("980E", 360)]),
+    ("Caterpillar", "CT", [("770G", 38), ("777G", 90), ("785D", 136), ("793F", 227), ("797F", 363)]),
+    ("Liebherr", "LB", [("T 236", 100), ("T 264", 240), ("T 284", 363)]),
+    ("Hitachi", "HT", [("EH3500", 168), ("EH4000", 221), ("EH5000", 296)]),
+    ("Volvo", "VL", [("A40G", 39), ("A60H", 55)]),
+]
+_CATALOG = [(f"{brand} {series}", prefix, capacity) for brand, prefix, items in MODEL_CATALOG for series, capacity in items]
+
+# Демонстрационный набор, который раньше создавался при первом запуске
+DEMO_MODELS = [
+    {"id": 1, "name": "БЕЛАЗ", "max_capacity": 120},
+    {"id": 2, "name": "Komatsu", "max_capacity": 110},
+]
+DEMO_TRUCKS = [
+    {"id": 1, "board_number": "101", "current_weight": 100, "model_id": 1},  # БЕЛАЗ - норма
+    {"id": 2, "board_number": "102", "current_weight": 125, "model_id": 1},  # БЕЛАЗ - перегруз 4.17%
+    {"id": 3, "board_number": "K103", "current_weight": 120, "model_id": 2},  # Komatsu - перегруз 9.09%
+]
+
+
+# ──── ГЕНЕРАЦИЯ ────
+
+def model_row(index: int) -> Dict[str, Any]:
+    """ Модель с порядковым номером index (с нуля): каталог по кругу, повторы — с номером поколения """
+    name, _, capacity = _CATALOG[index % len(_CATALOG)]
+    generation = index // len(_CATALOG)
+    if generation:
+        name = f"{name} v{generation + 1}"
+    return {"id": index + 1, "name": name, "max_capacity": capacity}
+
+
+def _board_prefix(model_name: str) -> str:
+    for brand, prefix, _ in MODEL_CATALOG:
+        if model_name.startswith(brand):
+            return prefix
+    return "TR"
+
+
+def truck_weight(rng: random.Random, capacity: int, overload_ratio: float, empty_ratio: float = 0.2) -> int:
+    """ Текущий вес: перегруз с вероятностью overload_ratio, иначе порожний рейс или загрузка 60-100% """
+    roll = rng.random()
+    if roll < overload_ratio:
+        return min(max(int(capacity * rng.uniform(1.01, 1.25)), capacity + 1), MAX_WEIGHT)
+    if roll < overload_ratio + empty_ratio:
+        return rng.randint(0, 3)
+    return int(capacity * rng.uniform(0.6, 1.0))
+
+
+def generate_trucks(
+        rng: random.Random,
+        models: List[Tuple[int, str, int]],
+        count: int,
+        first_id: int,
+        overload_ratio: float,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+        Самосвалы пакетами по CHUNK_SIZE.
+        :param models: (id, название, грузоподъемность); популярность моделей случайна, но задана зерном
+    """
+    popularity = list(itertools.accumulate(rng.uniform(0.2, 1.0) for _ in models))
+    prefixes = [_board_prefix(name) for _, name, _ in models]
+
+    for start in range(0, count, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, count - start)
+        picks = rng.choices(range(len(models)), cum_weights=popularity, k=size)
+        chunk = []
+        for offset, pick in enumerate(picks):
+            truck_id = first_id + start + offset
+            model_id, _, capacity = models[pick]
+            chunk.append({
+                "id": truck_id,
+                "model_id": model_id,
+                "board_number": f"{prefixes[pick]}{truck_id:07d}",
+                "current_weight": truck_weight(rng, capacity, overload_ratio),
+            })
+        yield chunk
+
+
+def generate_history(
+        rng: random.Random,
+        trucks: List[Dict[str, Any]],
+        capacities: Dict[int, int],
+        samples: int,
+        end: datetime,
+        interval: timedelta,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+        История веса: чередование рейсов с грузом и порожних, последнее показание равно текущему весу.
+        Длина рейса и фаза у каждого самосвала свои.
+    """
+    times = [end - interval * (samples - 1 - k) for k in range(samples)]
+    chunk: List[Dict[str, Any]] = []
+
+    for truck in trucks:
+        truck_id, weight = truck["id"], truck["current_weight"]
+        capacity = capacities[truck["model_id"]]
+        cycle = rng.randint(4, 8)
+        phase = rng.randrange(cycle)
+        target = max(weight, int(capacity * 0.85))
+        noise = max(capacity // 50, 1)
+
+        for k, recorded_at in enumerate(times[:-1]):
+            loaded = (k + phase) % cycle < cycle // 2
+            value = min(max(target + rng.randint(-noise, noise), 0), MAX_WEIGHT) if loaded else rng.randint(0, 3)
+            chunk.append({"truck_id": truck_id, "recorded_at": recorded_at, "weight": value})
+        chunk.append({"truck_id": truck_id, "recorded_at": times[-1], "weight": weight})
+
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+# ──── ЗАПИСЬ ────
+
+@asynccontextmanager
+async def _bulk_connection(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """
+        Соединение для массовой записи.
+        Для SQLite на время заполнения отключается синхронизация с диском
+        (synchronous=OFF) — при сбое теряется только незавершенное заполнение.
+    """
+    async with engine.connect() as conn:
+        is_sqlite = engine.dialect.name == "sqlite"
+        if is_sqlite:
+            synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+            await conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        try:
+            yield conn
+        finally:
+            if is_sqlite:
+                await conn.rollback()
+                await conn.exec_driver_sql(f"PRAGMA synchronous={int(synchronous)}")
+
+
+class _BulkWriter:
+    """ Пакетная вставка с фиксацией транзакции каждые COMMIT_ROWS строк """
+
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+        self._pending = 0
+
+    async def insert(self, table, chunks: Iterable[List[Dict[str, Any]]]) -> int:
+        total = 0
+        for chunk in chunks:
+            await self.conn.execute(insert(table), chunk)
+            total += len(chunk)
+            self._pending += len(chunk)
+            if self._pending >= COMMIT_ROWS:
+                await self.commit()
+        return total
+
+    async def commit(self) -> None:
+        await self.conn.commit()
+        self._pending = 0
+
+
+async def _sync_sequences(conn: AsyncConnection) -> None:
+    """ Идентификаторы назначены явно — в PostgreSQL сдвигаем последовательности за максимальный id """
+    if conn.dialect.name != "postgresql":
+        return
+    for table in (ModelTruck.__table__, DumpTruck.__table__):
+        await conn.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}), false)"
+        )
+
+
+async def seed_fleet(
+        engine: AsyncEngine,
+        models: int,
+        trucks: int,
+        overload_ratio: float = 0.1,
+        history: int = 0,
+        history_interval: timedelta = timedelta(minutes=15),
+        history_end: Optional[datetime] = None,
+        seed: int = 42,
+) -> Dict[str, Any]:
+    """
+        Дополнить парк до models моделей и добавить trucks самосвалов.
+        Существующие записи не изменяются: новые идентификаторы идут после максимальных.
+        :param history: число показаний веса на самосвал (0 — без истории)
+        :param history_end: время последнего показания, UTC без часового пояса (по умолчанию — сейчас)
+        :return сводка: сколько строк записано и за какое время
+    """
+    rng = random.Random(seed)
+    start = perf_counter()
+    if history_end is None:
+        history_end = utc_now().replace(second=0, microsecond=0)
+
+    async with _bulk_connection(engine) as conn:
+        existing = (await conn.execute(
+            select(ModelTruck.id, ModelTruck.name, ModelTruck.max_capacity).order_by(ModelTruck.id)
+        )).all()
+        model_count = len(existing)
+        first_model = existing[-1].id if existing else 0
+
+        new_models = [
+            {**model_row(model_count + i), "id": first_model + i + 1}
+            for i in range(max(models - model_count, 0))
+        ]
+        writer = _BulkWriter(conn)
+        await writer.insert(ModelTruck, [new_models] if new_models else [])
+
+        fleet = [tuple(row) for row in existing] + [
+            (row["id"], row["name"], row["max_capacity"]) for row in new_models
+        ]
+        if trucks and not fleet:
+            raise ValueError("Нет моделей для самосвалов: задайте models > 0")
+        capacities = {model_id: capacity for model_id, _, capacity in fleet}
+
+        first_truck = (await conn.scalar(select(func.max(DumpTruck.id))) or 0) + 1
+        truck_chunks = generate_trucks(rng, fleet, trucks, first_truck, overload_ratio)
+
+        truck_count = sample_count = 0
+        # История пишется вслед за каждым пакетом самосвалов: весь парк в памяти не держим
+        history_rng = random.Random(seed + 1)
+        for chunk in truck_chunks:
+            truck_count += await writer.insert(DumpTruck, [chunk])
+            if history:
+                sample_count += await writer.insert(WeightSample, generate_history(
+                    history_rng, chunk, capacities, history, history_end, history_interval,
+                ))
+        await _sync_sequences(conn)
+        await writer.commit()
+
+    elapsed = perf_counter() - start
+    rows = len(new_models) + truck_count + sample_count
+    return {
+        "models": len(new_models),
+        "trucks": truck_count,
+        "weight_samples": sample_count,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed) if elapsed else rows,
+    }
+
+
+async def seed_demo(engine: AsyncEngine) -> None:
+    """ Демонстрационные 2 модели и 3 самосвала одной транзакцией """
+    async with engine.begin() as conn:
+        await conn.execute(insert(ModelTruck), DEMO_MODELS)
+        await conn.execute(insert(DumpTruck), DEMO_TRUCKS)
+        await _sync_sequences(conn)
+
+
+async def seed_on_startup(engine: AsyncEngine) -> None:
+    """
+        Заполнение пустой БД при запуске приложения (настройки seed, см. app.core.startup).
+        Если задано seed.trucks — синтетический парк, иначе демонстрационный набор.
+    """
+    async with engine.connect() as conn:
+        if await conn.scalar(select(ModelTruck.id).limit(1)) is not None:
+            return
+
+    if settings.seed.trucks:
+        print("Создание синтетического парка...")
+        report = await seed_fleet(
+            engine,
+            models=settings.seed.models,
+            trucks=settings.seed.trucks,
+            overload_ratio=settings.seed.overload_ratio,
+            history=settings.seed.history,
+            seed=settings.seed.seed,
+        )
+        print(f"Синтетический парк создан: {report}")
+    else:
+        print("Создание тестовых данных...")
+        await seed_demo(engine)
+        print("Тестовые данные успешно созданы!")
+
+
+# ──── CLI ────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=len(_CATALOG), help="Число моделей в парке")
+    parser.add_argument("--trucks", type=int, default=10_000, help="Сколько самосвалов добавить")
+    parser.add_argument("--overload-ratio", type=float, default=0.1, help="Доля перегруженных (0..1)")
+    parser.add_argument("--history", type=int, default=0, help="Показаний веса на самосвал")
+    parser.add_argument("--history-interval", type=int, default=15, help="Интервал показаний, минут")
+    parser.add_argument("--history-end", type=datetime.fromisoformat, help="Время последнего показания (ISO, UTC)")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    args = parser.parse_args()
+
+    # Пакетные вставки заведомо дольше порога медленных запросов — не засоряем вывод
+    logging.getLogger("app.db.slow_queries").setLevel(logging.ERROR)
+
+    from app.db.migrations import migrate
+    from app.db.session import engine
+
+    async def run() -> Dict[str, Any]:
+        await migrate(engine)
+        try:
+            return await seed_fleet(
+                engine,
+                models=args.models,
+                trucks=args.trucks,
+                overload_ratio=args.overload_ratio,
+                history=args.history,
+                history_interval=timedelta(minutes=args.history_interval),
+                history_end=args.history_end,
+                seed=args.seed,
+            )
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(run())
+    print(
+        f"Добавлено: моделей {report['models']}, самосвалов {report['trucks']}, "
+        f"показаний {report['weight_samples']} за {report['seconds']} с "
+        f"({report['rows_per_second']} строк/с)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+    Запуск в рабочем режиме: несколько воркеров uvicorn, uvloop и httptools.
+
+    python -m app.core.server                       # воркеров по числу ядер
+    python -m app.core.server --workers 4 --port 8080
+
+    Подготовка БД выполняется один раз в родительском процессе, воркеры стартуют
+    с run_startup_tasks=false. При остановке (SIGINT/SIGTERM) воркеры перестают
+    принимать соединения и дожидаются выполняющихся запросов не дольше
+    server.graceful_timeout секунд, затем выполняется завершение lifespan.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def default_workers() -> int:
+    """ Число воркеров: server.workers, либо по числу доступных процессу ядер """
+    if settings.server.workers > 0:
+        return settings.server.workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+async def _prepare() -> None:
+    # Импорт здесь: движок БД создается при импорте, а настройки могли быть переопределены
+    from app.core.startup import prepare_database
+    from app.db.session import engine
+
+    await prepare_database()
+    # Соединения родителя воркерам не нужны
+    await engine.dispose()
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    if settings.run_startup_tasks:
+        asyncio.run(_prepare())
+    os.environ["run_startup_tasks"] = "false"
+
+    # uvloop недоступен под Windows — там остается стандартный цикл asyncio
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    uvicorn.run(
+        app="main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.server.backlog,
+        timeout_keep_alive=settings.server.keep_alive,
+        timeout_graceful_shutdown=settings.server.graceful_timeout,
+        access_log=settings.server.access_log,
+        proxy_headers=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.server.host)
+    parser.add_argument("--port", type=int, default=settings.server.port)
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Число воркеров")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
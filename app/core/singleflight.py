@@ -0,0 +1,145 @@
+"""
+    Объединение одинаковых одновременных чтений (single-flight).
+
+    Запись не должна отдавать вызывающему, начавшему чтение уже после нее, результат чтения,
+    начатого до нее. Поэтому после фиксации изменений (подписчик журнала изменений) выполняющиеся
+    чтения затронутых сущностей отвязываются от своих ключей: их результат получат только уже
+    присоединившиеся вызовы, а новые вызовы запускают новое чтение.
+
+    Остающееся окно согласованности: вызов, присоединившийся до фиксации записи, может получить
+    состояние до нее — как и любое чтение, идущее одновременно с записью. Изменения, сделанные
+    другими процессами или экземплярами сервиса, здесь не видны: их чтения, начатые раньше,
+    отдают прежнее состояние не дольше длительности самого чтения.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from app.config import settings
+from app.core.crud.changes import MODEL, TRUCK, subscribe
+from app.db.session import AsyncSessionLocal
+
+
+class _Call:
+    """ Выполняющийся запрос и количество ожидающих его результата """
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+        Объединение одинаковых одновременных запросов (single-flight).
+        Пока запрос с ключом key выполняется, остальные вызовы с тем же ключом
+        не запускают его повторно, а дожидаются общего результата или исключения.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0          # всего вызовов
+        self.executions = 0     # реально выполненных запросов
+        self.coalesced = 0      # вызовов, присоединившихся к уже выполняющемуся запросу
+        self.cancelled = 0      # вызовов, отменённых во время ожидания
+        self.aborted = 0        # запросов, прерванных из-за ухода всех ожидающих
+        self.invalidated = 0    # запросов, отвязанных от ключа после записи
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """ Выполнить func или присоединиться к уже выполняющемуся вызову с тем же ключом """
+        self.calls += 1
+
+        call = self._calls.get(key)
+        if call is None:
+            # Запрос выполняется в отдельной задаче: отмена одного из ожидающих
+            # (например, клиент закрыл соединение) не должна отменять его для остальных
+            call = _Call(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda _, k=key, c=call: self._forget(k, c))
+            self._calls[key] = call
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.cancelled():
+                self.cancelled += 1
+            raise
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Результат больше никому не нужен — прерываем запрос
+                self._forget(key, call)
+                call.task.cancel()
+                self.aborted += 1
+
+    def invalidate(self, prefixes: Tuple[str, ...]) -> int:
+        """
+            Отвязать выполняющиеся запросы, ключи которых начинаются с пространства из prefixes
+            (первый элемент ключа-кортежа, например "trucks.get"): они завершатся для уже
+            ожидающих, а следующий вызов с тем же ключом выполнит запрос заново
+        """
+        stale = [key for key in self._calls if _namespace(key).startswith(prefixes)]
+        for key in stale:
+            del self._calls[key]
+        self.invalidated += len(stale)
+        return len(stale)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """ Убрать завершённый вызов, не затрагивая более новый вызов с тем же ключом """
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        """ Статистика объединения запросов """
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "aborted": self.aborted,
+            "invalidated": self.invalidated,
+            "in_flight": len(self._calls),
+        }
+
+
+def _namespace(key: Hashable) -> str:
+    return str(key[0] if isinstance(key, tuple) and key else key)
+
+
+read_coalescer = SingleFlight()
+
+# Пространства ключей, которые затрагивает изменение сущности: список самосвалов фильтруется
+# по названию модели, сводки парка зависят от грузоподъемности модели
+AFFECTED_READS = {
+    TRUCK: ("trucks.", "fleet."),
+    MODEL: ("models.", "trucks.", "fleet."),
+}
+
+
+def _invalidate_committed(changes: List[Dict[str, Any]]) -> None:
+    """ Подписчик журнала изменений: чтения, начатые до фиксации, не достаются новым вызовам """
+    prefixes = {prefix for change in changes for prefix in AFFECTED_READS.get(change["entity"], ())}
+    if prefixes:
+        read_coalescer.invalidate(tuple(prefixes))
+
+
+subscribe(_invalidate_committed)
+
+
+async def coalesced_read(db, key: Hashable, crud_func: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+    """
+        Выполнить CRUD-чтение через single-flight.
+        Общий запрос выполняется в собственной сессии, а не в сессии запроса-инициатора:
+        сессия инициатора закрывается вместе с его запросом, а результат нужен всем ожидающим.
+    """
+    if not settings.read_coalescing:
+        return await crud_func(db, **kwargs)
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await crud_func(session, **kwargs)
+
+    return await read_coalescer.do(key, run)
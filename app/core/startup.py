@@ -0,0 +1,112 @@
+"""
+    Подготовка БД при запуске: миграции схемы (app.db.migrations), начальные данные
+    и пометка фоновых задач, прерванных перезапуском.
+
+    При запуске через app.core.server это делает только родительский процесс
+    до старта воркеров (воркеры получают run_startup_tasks=false). Если процессы
+    запускает внешний менеджер (gunicorn, несколько uvicorn), одновременную
+    подготовку исключает файловая блокировка: остальные процессы дожидаются
+    первого и находят БД уже готовой.
+
+    Незавершенные фоновые задачи помечаются прерванными, только если других работающих
+    процессов с этой БД нет: каждый процесс держит разделяемую блокировку файла до своего
+    завершения, а пометку делает тот, кто смог взять ее исключительно. Иначе процесс,
+    запущенный позже (несколько воркеров, поочередный перезапуск), пометил бы ошибкой
+    задачи, которые еще выполняют соседние процессы; задачи остановленного штатно процесса
+    помечает он сам. Блокировки файловые — действуют в пределах одного хоста.
+"""
+import asyncio
+import hashlib
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, IO, Optional
+
+from app.config import settings
+from app.core.crud.jobs import fail_interrupted_jobs
+from app.db.migrations import SCHEMA_VERSION, current_version, migrate
+from app.db.session import AsyncSessionLocal, engine
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Открыт до завершения процесса: разделяемая блокировка — признак работающего процесса
+_alive_file: Optional[IO] = None
+
+
+def _lock_path(name: str = "startup") -> Path:
+    """ Файл блокировки, общий для всех процессов с одной и той же БД """
+    digest = hashlib.sha1(settings.db.url.encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"dump_trucks_{name}_{digest}.lock"
+
+
+@asynccontextmanager
+async def startup_lock() -> AsyncIterator[None]:
+    """ Межпроцессная блокировка на время подготовки БД (без fcntl — без блокировки) """
+    if fcntl is None:
+        yield
+        return
+
+    with open(_lock_path(), "w") as file:
+        # Ожидание блокировки — в отдельном потоке, чтобы не останавливать цикл событий
+        await asyncio.to_thread(fcntl.flock, file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def _register_alive() -> bool:
+    """
+        Отметить процесс работающим (вызывается под startup_lock).
+        :return True — других работающих процессов с этой БД нет (без fcntl — всегда)
+    """
+    global _alive_file
+    if fcntl is None:
+        return True
+    if _alive_file is None:
+        _alive_file = open(_lock_path("alive"), "w")
+    try:
+        fcntl.flock(_alive_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        alone = True
+    except BlockingIOError:
+        alone = False
+    fcntl.flock(_alive_file.fileno(), fcntl.LOCK_SH)
+    return alone
+
+
+async def prepare_database() -> None:
+    """
+        Привести схему к текущей версии и заполнить новую БД.
+        Если версия схемы актуальна — без проверки таблиц
+        (чтение версии и пометка прерванных фоновых задач).
+    """
+    if await current_version(engine) != SCHEMA_VERSION:
+        async with startup_lock():
+            # Версию перечитывает migrate: схему мог обновить процесс, державший блокировку
+            previous = await migrate(engine)
+
+            # Тестовые данные — только для БД, в которой не было таблицы версий
+            if previous is None and settings.seed.on_startup:
+                from app.core.seeding import seed_on_startup
+
+                try:
+                    await seed_on_startup(engine)
+                except Exception as e:
+                    print(f"Ошибка при инициализации тестовых данных: {e}")
+
+    async with startup_lock():
+        if _register_alive():
+            await _fail_interrupted_jobs()
+
+
+async def _fail_interrupted_jobs() -> None:
+    """ Фоновые задачи живут в памяти процесса: после сбоя незавершенные уже не выполнятся """
+    async with AsyncSessionLocal() as db:
+        count = await fail_interrupted_jobs(db)
+        await db.commit()
+    if count:
+        print(f"Фоновых задач, прерванных перезапуском: {count}")
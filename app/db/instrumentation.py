@@ -0,0 +1,155 @@
+from itertools import count
+from time import perf_counter
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.config import settings
+from app.db.query_stats import current_query_stats
+from app.db.slow_queries import slow_query_log
+from app.utils.tracing import SPAN_KIND_CLIENT, NOOP_SPAN, STATUS_ERROR, start_span
+from app.utils.metrics import (
+    db_query_duration, db_query_errors_total,
+    db_pool_checkout_wait, db_pool_connections_in_use, db_pool_size,
+)
+
+
+def _operation(statement: str) -> str:
+    """ Тип SQL-запроса (SELECT, INSERT, ...) для метки метрики """
+    return statement.lstrip().split(None, 1)[0].upper() if statement else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = start_span(f"SQL {_operation(statement)}", SPAN_KIND_CLIENT)
+    if span is not NOOP_SPAN:
+        span.set_attribute("db.system", conn.dialect.name)
+        span.set_attribute("db.statement", statement)
+    context._query_span = span
+    context._query_start_time = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - context._query_start_time
+    context._query_span.end()
+    if settings.metrics_enabled:
+        db_query_duration.labels(_operation(statement)).observe(elapsed)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed, executemany)
+
+    if elapsed >= slow_query_log.threshold:
+        slow_query_log.record(statement, parameters, elapsed, conn.dialect.name, executemany)
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_query_span", NOOP_SPAN)
+    if span is not NOOP_SPAN:
+        span.status = STATUS_ERROR
+        span.set_attribute("exception.type", type(exception_context.original_exception).__name__)
+        span.end()
+
+    if settings.metrics_enabled:
+        db_query_errors_total.labels(_operation(exception_context.statement)).inc()
+
+
+class CheckoutWait:
+    """
+        Ожидание соединения из пула для контроля допуска (app.core.admission): скользящее среднее
+        (EWMA) завершенных ожиданий, затухающее со временем, и самое долгое из текущих ожиданий —
+        если пул встал, среднее не обновляется, а текущее ожидание растет.
+    """
+
+    _ALPHA = 0.2
+
+    def __init__(self, half_life: float):
+        self.half_life = half_life
+        self._value = 0.0
+        self._updated = perf_counter()
+        self._pending: Dict[int, float] = {}
+        self._tokens = count()
+
+    def begin(self) -> int:
+        token = next(self._tokens)
+        self._pending[token] = perf_counter()
+        return token
+
+    def end(self, token: int) -> float:
+        now = perf_counter()
+        elapsed = now - self._pending.pop(token, now)
+        self._value = self._decayed(now) * (1 - self._ALPHA) + elapsed * self._ALPHA
+        self._updated = now
+        return elapsed
+
+    def _decayed(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._updated) / self.half_life)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._pending)
+
+    def current(self) -> float:
+        """ Оценка ожидания соединения сейчас, секунды """
+        now = perf_counter()
+        # Словарь хранит порядок добавления: первое значение — самое раннее из текущих ожиданий
+        oldest = next(iter(self._pending.values()), now)
+        return max(self._decayed(now), now - oldest)
+
+
+checkout_wait = CheckoutWait(settings.admission.pool_wait_half_life)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    db_pool_connections_in_use.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    db_pool_connections_in_use.dec()
+
+
+def _instrument_pool(pool: Pool) -> None:
+    """
+        Замер ожидания соединения из пула (checkout_wait — всегда, метрики — если включены).
+        У пула нет события «перед выдачей соединения», поэтому оборачиваем _do_get
+        экземпляра — так замер работает для любого класса пула.
+    """
+    do_get = pool._do_get
+
+    def timed_do_get():
+        token = checkout_wait.begin()
+        try:
+            return do_get()
+        finally:
+            elapsed = checkout_wait.end(token)
+            if settings.metrics_enabled:
+                db_pool_checkout_wait.observe(elapsed)
+
+    pool._do_get = timed_do_get
+
+    if not settings.metrics_enabled:
+        return
+    if isinstance(pool, QueuePool):
+        db_pool_size.set_function(pool.size)
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """ Подключить учет SQL-запросов и метрики пула соединений к движку """
+    sync_engine = engine.sync_engine
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    slow_query_log.engine = engine
+
+    _instrument_pool(sync_engine.pool)
+
+    # engine.dispose() пересоздает пул — инструментируем новый
+    @event.listens_for(sync_engine, "engine_disposed")
+    def _on_dispose(disposed_engine):
+        if settings.metrics_enabled:
+            db_pool_connections_in_use.set(0)
+        _instrument_pool(disposed_engine.pool)
@@ -0,0 +1,116 @@
+"""
+    Версионирование схемы БД.
+
+    Номер версии хранится в таблице schema_version. При запуске читается одна строка;
+    если версия совпадает с SCHEMA_VERSION, схема не проверяется вовсе (без create_all
+    и отражения таблиц). Иначе по порядку применяются недостающие миграции.
+
+    Миграции должны быть идемпотентны (checkfirst): БД, созданные до появления
+    версионирования, начинают с версии 0 и проходят все миграции.
+"""
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Column, Connection, Integer, MetaData, Table, insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.models import ChangeLogEntry, ChangeLogState, DumpTruck, IdempotencyKey, Job, TruckAnomaly
+from app.db.session import Base
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _initial_schema(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+
+
+def _truck_model_index(conn: Connection) -> None:
+    next(index for index in DumpTruck.__table__.indexes if index.name == "ix_dump_trucks_model_id").create(
+        conn, checkfirst=True,
+    )
+
+
+def _idempotency_keys(conn: Connection) -> None:
+    IdempotencyKey.__table__.create(conn, checkfirst=True)
+
+
+def _jobs(conn: Connection) -> None:
+    Job.__table__.create(conn, checkfirst=True)
+
+
+def _change_log(conn: Connection) -> None:
+    ChangeLogEntry.__table__.create(conn, checkfirst=True)
+    ChangeLogState.__table__.create(conn, checkfirst=True)
+
+
+def _truck_anomalies(conn: Connection) -> None:
+    TruckAnomaly.__table__.create(conn, checkfirst=True)
+
+
+def _change_log_state_row(conn: Connection) -> None:
+    # Строка, которую блокирует запись журнала в MySQL / MariaDB (app.core.crud.changes)
+    if conn.scalar(select(ChangeLogState.id).where(ChangeLogState.id == 1)) is None:
+        conn.execute(insert(ChangeLogState.__table__).values(id=1, purged_seq=0))
+
+
+# (версия, описание, функция миграции); новые миграции — только в конец
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Исходная схема", _initial_schema),
+    (2, "Индекс dump_trucks.model_id", _truck_model_index),
+    (3, "Таблица ключей идемпотентности", _idempotency_keys),
+    (4, "Таблица фоновых задач", _jobs),
+    (5, "Журнал изменений", _change_log),
+    (6, "Аномалии показаний веса", _truck_anomalies),
+    (7, "Строка состояния журнала изменений", _change_log_state_row),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def current_version(engine: AsyncEngine) -> Optional[int]:
+    """ Версия схемы БД; None — таблицы версий нет (новая БД или БД до версионирования) """
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(select(schema_version.c.version)) or 0
+    except DBAPIError:
+        return None
+
+
+async def migrate(engine: AsyncEngine) -> Optional[int]:
+    """
+        Применить недостающие миграции.
+        :return версия схемы до миграции (None — таблицы версий не было)
+    """
+    version = await current_version(engine)
+    if version is not None and version >= SCHEMA_VERSION:
+        return version
+
+    async with engine.begin() as conn:
+        await conn.run_sync(_metadata.create_all)
+        for number, description, migration in MIGRATIONS:
+            if number > (version or 0):
+                print(f"Миграция схемы {number}: {description}")
+                await conn.run_sync(migration)
+
+        await conn.execute(schema_version.delete())
+        await conn.execute(schema_version.insert().values(version=SCHEMA_VERSION))
+
+    return version
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    async def main() -> None:
+        before = await migrate(engine)
+        print(f"Версия схемы: {before or 0} -> {SCHEMA_VERSION}")
+        await engine.dispose()
+
+    asyncio.run(main())
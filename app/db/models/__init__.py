@@ -1 +1,5 @@
-from .trucks import DumpTruck, ModelTruck
\ No newline at end of file
+from .trucks import DumpTruck, ModelTruck
+from .telemetry import WeightSample, TruckAnomaly
+from .idempotency import IdempotencyKey
+from .jobs import Job
+from .changes import ChangeLogEntry, ChangeLogState
\ No newline at end of file
@@ -0,0 +1,65 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class ChangeLogEntry(Base):
+    """ Запись журнала изменений самосвалов и моделей (создание, изменение, удаление) """
+    __tablename__ = "change_log"
+
+    seq = Column(
+        Integer,
+        primary_key=True,
+        comment="Номер изменения, возрастает монотонно",
+    )
+    entity = Column(
+        String(16),
+        nullable=False,
+        comment="truck или model",
+    )
+    entity_id = Column(
+        Integer,
+        nullable=False,
+        comment="ID самосвала или модели",
+    )
+    op = Column(
+        String(8),
+        nullable=False,
+        comment="create, update или delete",
+    )
+    data = Column(
+        JSON,
+        comment="Состояние записи после изменения (для delete — ключи удаленной записи)",
+    )
+    changed_at = Column(
+        DateTime(timezone=False),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_change_log_entity", "entity", "entity_id", "seq"),
+        Index("ix_change_log_op_time", "op", "changed_at"),
+        # Без AUTOINCREMENT SQLite может выдать номер удаленной при сжатии последней записи
+        {"sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<Изменение {self.seq}: {self.op} {self.entity} {self.entity_id}>"
+
+
+class ChangeLogState(Base):
+    """ Состояние журнала изменений (одна строка) """
+    __tablename__ = "change_log_state"
+
+    id = Column(
+        Integer,
+        primary_key=True,
+    )
+    purged_seq = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Наибольший номер удаленной при сжатии записи об удалении",
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import JSON, Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """ Сохраненный результат запроса с ключом идемпотентности (Idempotency-Key) """
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(
+        String,
+        primary_key=True,
+        comment="Операция, к которой относится ключ",
+    )
+    key = Column(
+        String,
+        primary_key=True,
+        comment="Ключ идемпотентности клиента",
+    )
+    request_hash = Column(
+        String,
+        nullable=False,
+        comment="Хэш тела запроса",
+    )
+    response = Column(
+        JSON,
+        nullable=False,
+        comment="Результат операции",
+    )
+    created_at = Column(
+        DateTime(timezone=False),
+        server_default=func.now(),
+        index=True,
+    )
+
+    def __repr__(self):
+        return f"<Ключ идемпотентности {self.scope}:{self.key}>"
@@ -0,0 +1,62 @@
+from sqlalchemy import JSON, Column, DateTime, Float, String, Text
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class Job(Base):
+    """ Фоновая задача (экспорт, импорт, пересчет статистики, обслуживание индексов) """
+    __tablename__ = "jobs"
+
+    id = Column(
+        String(32),
+        primary_key=True,
+    )
+    kind = Column(
+        String(32),
+        nullable=False,
+        comment="Тип задачи",
+    )
+    status = Column(
+        String(16),
+        nullable=False,
+        index=True,
+        comment="queued, running, succeeded, failed или cancelled",
+    )
+    params = Column(
+        JSON,
+        nullable=False,
+        comment="Параметры задачи",
+    )
+    progress = Column(
+        Float,
+        nullable=False,
+        default=0.0,
+        comment="Доля выполненной работы (0..1)",
+    )
+    message = Column(
+        String,
+        comment="Текущий этап",
+    )
+    result = Column(
+        JSON,
+        comment="Итог задачи",
+    )
+    result_file = Column(
+        String,
+        comment="Файл результата в каталоге jobs.results_dir",
+    )
+    error = Column(
+        Text,
+        comment="Текст ошибки",
+    )
+    created_at = Column(
+        DateTime(timezone=False),
+        server_default=func.now(),
+        index=True,
+    )
+    started_at = Column(DateTime(timezone=False))
+    finished_at = Column(DateTime(timezone=False))
+
+    def __repr__(self):
+        return f"<Задача {self.kind} {self.id}: {self.status}>"
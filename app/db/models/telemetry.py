@@ -0,0 +1,73 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.db.session import Base
+
+
+class WeightSample(Base):
+    """ Показание веса груза самосвала (история телеметрии) """
+    __tablename__ = "truck_weight_samples"
+
+    id = Column(
+        Integer,
+        primary_key=True,
+    )
+    truck_id = Column(
+        Integer,
+        ForeignKey("dump_trucks.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    recorded_at = Column(
+        DateTime(timezone=False),
+        nullable=False,
+        comment="Время показания",
+    )
+    weight = Column(
+        Integer,
+        nullable=False,
+        comment="Вес груза (тонн)",
+    )
+
+    __table_args__ = (
+        Index("ix_truck_weight_samples_truck_time", "truck_id", "recorded_at"),
+    )
+
+    def __repr__(self):
+        return f"<Показание {self.weight}т самосвала {self.truck_id} в {self.recorded_at}>"
+
+
+class TruckAnomaly(Base):
+    """ Аномалия показаний веса самосвала по последнему анализу телеметрии (app.core.anomalies) """
+    __tablename__ = "truck_anomalies"
+
+    truck_id = Column(
+        Integer,
+        ForeignKey("dump_trucks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    flag = Column(
+        String(32),
+        primary_key=True,
+        comment="Признак: out_of_range, spike, jump, flatline, negative_drift",
+    )
+    samples = Column(
+        Integer,
+        nullable=False,
+        comment="Показаний с признаком",
+    )
+    last_at = Column(
+        DateTime(timezone=False),
+        nullable=False,
+        comment="Время последнего показания с признаком",
+    )
+    detected_at = Column(
+        DateTime(timezone=False),
+        nullable=False,
+        comment="Время анализа",
+    )
+
+    __table_args__ = (
+        Index("ix_truck_anomalies_flag", "flag", "truck_id"),
+    )
+
+    def __repr__(self):
+        return f"<Аномалия {self.flag} самосвала {self.truck_id}>"
@@ -31,11 +31,14 @@ class ModelTruck(BaseModel):
 class DumpTruck(BaseModel):
     """ Параметры конкретного самосвала """
     __tablename__ = "dump_trucks"
+    # updated_at, выставленный БД, возвращается тем же UPDATE (RETURNING), а не отдельным SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     model_id = Column(
         Integer,
         ForeignKey("truck_models.id"),
         nullable=False,
+        index=True,
     )
     board_number = Column(
         String,
@@ -50,6 +53,8 @@ class DumpTruck(BaseModel):
     )
 
     model = relationship(ModelTruck, back_populates="trucks")
+    # Только для чтения: флаги пишет анализ телеметрии, удаляются вместе с самосвалом
+    anomalies = relationship("TruckAnomaly", viewonly=True, order_by="TruckAnomaly.flag")
 
     @property
     def load_percentage(self) -> float:
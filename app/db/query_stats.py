@@ -0,0 +1,57 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+
+class QueryStats:
+    """ Учет SQL-запросов в рамках HTTP-запроса (или другого участка кода) """
+
+    __slots__ = ("count", "total_time", "statements", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+        self.parent = parent
+
+    def record(self, statement: str, elapsed: float, executemany: bool = False) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_time += elapsed
+            # Пакетная запись порциями (executemany) — не N+1
+            if not executemany:
+                stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """ Одинаковые запросы, выполненные не меньше threshold раз (признак N+1) """
+        return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """ Учитывать SQL-запросы, выполненные внутри блока (вложенные блоки учитываются и во внешних) """
+    stats = QueryStats(parent=current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """ Проверить, что внутри блока выполнено не больше max_queries SQL-запросов """
+    with track_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {count} x {statement}" for statement, count in stats.statements.items())
+        raise AssertionError(
+            f"Выполнено {stats.count} SQL-запросов при бюджете {max_queries}:\n{statements}"
+        )
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 from app.config import settings
+from app.db.instrumentation import instrument_engine
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -17,6 +18,8 @@ engine = create_async_engine(
     future=True,
 )
 
+instrument_engine(engine)
+
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -0,0 +1,181 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"(?:%\(\w+\)s|\$\d+|:\w+|%s|\?)")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+}
+
+
+def fingerprint(statement: str) -> str:
+    """ Нормализованный текст запроса: литералы и параметры заменены на ?, списки IN свернуты """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    # Параметры — до чисел: иначе от $1 (PostgreSQL) осталось бы $?
+    normalized = _PLACEHOLDERS.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _IN_LIST.sub("(?)", normalized)
+
+
+def _redact(parameters: Any) -> Any:
+    """ Скрыть значения параметров, оставив только их типы """
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return parameters
+
+
+def _has_table_scan(dialect_name: str, plan: List[str]) -> bool:
+    """ Есть ли в плане полный просмотр таблицы """
+    for line in plan:
+        if dialect_name == "sqlite":
+            # SCAN t — полный просмотр; SCAN t USING (COVERING) INDEX — просмотр индекса
+            if line.startswith("SCAN ") and "INDEX" not in line:
+                return True
+        elif dialect_name == "postgresql":
+            if "Seq Scan" in line:
+                return True
+        elif "'type': 'ALL'" in line or "type=ALL" in line:
+            return True
+    return False
+
+
+class SlowQueryLog:
+    """
+        Журнал медленных запросов, агрегированный по отпечатку запроса.
+        План выполнения снимается один раз на отпечаток в фоновой задаче, через отдельное
+        соединение — запрос пользователя не ждет EXPLAIN.
+    """
+
+    def __init__(self, threshold_ms: float, redact_params: bool, max_entries: int):
+        self.threshold = threshold_ms / 1000
+        self.redact_params = redact_params
+        self.max_entries = max_entries
+        self.engine: Optional[AsyncEngine] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def record(self, statement: str, parameters: Any, elapsed: float, dialect_name: str, executemany: bool) -> None:
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        text = fingerprint(statement)
+        key = hashlib.sha1(text.encode()).hexdigest()[:16]
+        if executemany:
+            # Для пакетной вставки показываем только число наборов параметров
+            shown_params = f"<{len(parameters)} наборов>"
+        else:
+            shown_params = _redact(parameters) if self.redact_params else parameters
+        elapsed_ms = elapsed * 1000
+
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_entries:
+                # Вытесняем отпечаток с наименьшим суммарным временем
+                del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_ms"])]
+            entry = self._entries[key] = {
+                "fingerprint": key,
+                "statement": text,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "plan": None,
+                "table_scan": None,
+            }
+            if not executemany and text.upper().startswith(_EXPLAINABLE):
+                self._schedule_explain(entry, statement, parameters, dialect_name)
+
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["last_params"] = shown_params
+        entry["last_seen"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        logger.warning(
+            "Медленный запрос %.1f мс [%s]: %s; параметры: %s",
+            elapsed_ms, key, _WHITESPACE.sub(" ", statement).strip(), shown_params,
+        )
+
+    def _schedule_explain(self, entry: Dict[str, Any], statement: str, parameters: Any, dialect_name: str) -> None:
+        prefix = _EXPLAIN_PREFIX.get(dialect_name)
+        if self.engine is None or prefix is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        # Пустой контекст: EXPLAIN не должен попадать в учет запросов и трассировку запроса пользователя
+        task = loop.create_task(
+            self._explain(entry, prefix + statement, parameters, dialect_name),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, entry: Dict[str, Any], statement: str, parameters: Any, dialect_name: str) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.exec_driver_sql(statement, parameters or ())
+                rows = result.all()
+        except Exception as e:
+            entry["plan"] = [f"EXPLAIN не выполнен: {e}"]
+            return
+
+        if dialect_name == "sqlite":
+            # (id, parent, notused, detail)
+            plan = [str(row[-1]) for row in rows]
+        elif dialect_name == "postgresql":
+            plan = [str(row[0]) for row in rows]
+        else:
+            plan = [str(dict(row._mapping)) for row in rows]
+
+        entry["plan"] = plan
+        entry["table_scan"] = _has_table_scan(dialect_name, plan)
+        if entry["table_scan"]:
+            logger.warning("Полный просмотр таблицы в запросе [%s]: %s", entry["fingerprint"], "; ".join(plan))
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """ Отпечатки медленных запросов, самые затратные первыми """
+        result = [
+            {**entry, "avg_ms": round(entry["total_ms"] / entry["count"], 3)}
+            for entry in self._entries.values()
+        ]
+        return sorted(result, key=lambda e: e["total_ms"], reverse=True)
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+    async def aclose(self) -> None:
+        """ Дождаться снятия планов перед закрытием движка """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.db.slow_query_ms,
+    redact_params=settings.db.slow_query_redact_params,
+    max_entries=settings.db.slow_query_max_entries,
+)
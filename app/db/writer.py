@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.utils.metrics import db_write_batch_size
+
+WriteOperation = Callable[..., Awaitable[Any]]
+
+
+class _Write:
+    """ Операция в очереди писателя и future ее вызывающего """
+
+    __slots__ = ("operation", "kwargs", "future", "context")
+
+    def __init__(self, operation: WriteOperation, kwargs: Dict[str, Any], future: asyncio.Future):
+        self.operation = operation
+        self.kwargs = kwargs
+        self.future = future
+        # Контекст вызывающего: учет запросов и трассировка относятся к его HTTP-запросу
+        self.context = contextvars.copy_context()
+
+
+class GroupCommitWriter:
+    """
+        Единственный писатель с групповой фиксацией (group commit).
+        Изменяющие операции ставятся в очередь; задача-писатель выполняет накопившиеся
+        операции последовательно в одной транзакции и фиксирует их одним COMMIT.
+        В SQLite это снимает конкуренцию соединений за блокировку файла БД.
+
+        Каждая операция выполняется в своей точке сохранения (SAVEPOINT): ошибка откатывает
+        только ее изменения и передается ее вызывающему, остальные операции пакета остаются.
+        Если не удалась сама фиксация, выполненные операции повторяются каждая в отдельной
+        транзакции — ошибка одной строки не достается чужим запросам.
+        Операции получают сессию писателя и не должны фиксировать транзакцию сами.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.submitted = 0      # всего операций
+        self.batches = 0        # зафиксированных транзакций
+        self.committed = 0      # успешно зафиксированных операций
+        self.failed = 0         # операций, завершившихся ошибкой
+        self.retried = 0        # повторных выполнений после ошибки фиксации пакета
+
+    async def submit(self, operation: WriteOperation, **kwargs) -> Any:
+        """ Выполнить operation(session, **kwargs) в очередной групповой транзакции """
+        self._ensure_started()
+        self.submitted += 1
+        write = _Write(operation, kwargs, asyncio.get_running_loop().create_future())
+        self._queue.put_nowait(write)
+        return await write.future
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            # Пустой контекст: задача живет дольше запроса, запустившего ее
+            self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+
+            # Забираем все, что уже накопилось; при max_delay > 0 — еще и ждем попутчиков
+            deadline = loop.time() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    write = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        write = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if write is None:
+                    stop = True
+                    break
+                batch.append(write)
+
+            await self._execute(batch)
+            if stop:
+                return
+
+    async def _execute(self, batch: List[_Write]) -> None:
+        # Операции, вызывающие которых уже отменены, не выполняем
+        pending = [write for write in batch if not write.future.done()]
+        if not pending:
+            return
+        results = []
+        try:
+            async with AsyncSessionLocal() as session:
+                await _begin(session)
+                for write in pending:
+                    try:
+                        results.append((write, await _apply(session, write)))
+                    except Exception as e:
+                        _resolve(write, exception=e)
+                        self.failed += 1
+                if results:
+                    await session.commit()
+        except Exception:
+            # Ошибка фиксации: пакет не применен ни для кого — каждая еще не завершенная
+            # операция выполняется заново в своей транзакции
+            survivors = [write for write in pending if not write.future.done()]
+            self.retried += len(survivors)
+            for write in survivors:
+                await self._execute_alone(write)
+            return
+
+        for write, result in results:
+            _resolve(write, result=result)
+        if results:
+            self._committed(len(results))
+
+    async def _execute_alone(self, write: _Write) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await _begin(session)
+                result = await _apply(session, write)
+                await session.commit()
+        except Exception as e:
+            _resolve(write, exception=e)
+            self.failed += 1
+            return
+        _resolve(write, result=result)
+        self._committed(1)
+
+    def _committed(self, count: int) -> None:
+        self.batches += 1
+        self.committed += count
+        if settings.metrics_enabled:
+            db_write_batch_size.observe(count)
+
+    async def aclose(self) -> None:
+        """ Выполнить уже поставленные операции и остановить писателя """
+        if self._task is None or self._task.done():
+            return
+        self._queue.put_nowait(None)
+        await self._task
+
+    def stats(self) -> Dict[str, Any]:
+        """ Статистика групповой фиксации """
+        return {
+            "enabled": group_commit_enabled(),
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "committed": self.committed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "avg_batch": round(self.committed / self.batches, 2) if self.batches else 0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+async def _begin(session: AsyncSession) -> None:
+    """
+        Явный BEGIN для SQLite: драйвер sqlite3 открывает транзакцию только перед DML,
+        и без него RELEASE первой точки сохранения сразу фиксирует ее изменения
+    """
+    if session.bind.dialect.name == "sqlite":
+        await (await session.connection()).exec_driver_sql("BEGIN")
+
+
+async def _apply(session: AsyncSession, write: _Write) -> Any:
+    """ Операция в своей точке сохранения: ошибка откатывает только ее изменения """
+    try:
+        async with session.begin_nested():
+            return await asyncio.create_task(write.operation(session, **write.kwargs), context=write.context)
+    finally:
+        # Каждому вызывающему — свои объекты: следующая операция пакета
+        # с той же записью загрузит ее заново, а не изменит чужой результат
+        session.expunge_all()
+
+
+def _resolve(write: _Write, result: Any = None, exception: Optional[BaseException] = None) -> None:
+    if write.future.done():
+        return
+    if exception is not None:
+        write.future.set_exception(exception)
+    else:
+        write.future.set_result(result)
+
+
+def group_commit_enabled() -> bool:
+    """ db.group_commit: on, off или auto (включено для SQLite) """
+    if settings.db.group_commit == "auto":
+        return settings.db.url.startswith("sqlite")
+    return settings.db.group_commit == "on"
+
+
+group_writer = GroupCommitWriter(
+    max_batch=settings.db.group_commit_max_batch,
+    max_delay=settings.db.group_commit_max_delay_ms / 1000,
+)
+
+
+async def write(db: AsyncSession, operation: WriteOperation, **kwargs) -> Any:
+    """
+        Выполнить изменяющую операцию operation(session, **kwargs) и зафиксировать ее.
+        При групповой фиксации операция уходит писателю, иначе выполняется в сессии запроса.
+    """
+    if not group_commit_enabled():
+        result = await operation(db, **kwargs)
+        await db.commit()
+        return result
+
+    return await group_writer.submit(operation, **kwargs)
@@ -1,8 +1,12 @@
-from fastapi import Depends
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.db import get_db
-from app.services import TruckService, TruckModelService
+from app.services import ChangesService, FleetService, ImportService, JobService, TruckService, TruckModelService
 
 
 async def get_truck_service(db: AsyncSession = Depends(get_db)) -> TruckService:
@@ -12,4 +16,40 @@ async def get_truck_service(db: AsyncSession = Depends(get_db)) -> TruckService:
 
 async def get_truck_model_service(db: AsyncSession = Depends(get_db)) -> TruckModelService:
     """ Провайдер для TruckModelService """
-    return TruckModelService(db)
\ No newline at end of file
+    return TruckModelService(db)
+
+
+async def get_fleet_service(db: AsyncSession = Depends(get_db)) -> FleetService:
+    """ Провайдер для FleetService """
+    return FleetService(db)
+
+
+async def get_changes_service(db: AsyncSession = Depends(get_db)) -> ChangesService:
+    """ Провайдер для ChangesService """
+    return ChangesService(db)
+
+
+async def get_import_service(db: AsyncSession = Depends(get_db)) -> ImportService:
+    """ Провайдер для ImportService """
+    return ImportService(db)
+
+
+async def get_job_service(db: AsyncSession = Depends(get_db)) -> JobService:
+    """ Провайдер для JobService """
+    return JobService(db)
+
+
+def has_admin_access(admin_token: Optional[str]) -> bool:
+    """ Доступ к служебным функциям: в режиме отладки или по секретному токену """
+    if settings.debug:
+        return True
+    return bool(
+        settings.admin_token and admin_token
+        and secrets.compare_digest(admin_token, settings.admin_token)
+    )
+
+
+async def verify_admin_access(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """ Доступ к служебным эндпоинтам """
+    if not has_admin_access(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
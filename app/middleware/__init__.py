@@ -0,0 +1,6 @@
+from .admission import AdmissionMiddleware
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware
+from .query_stats import QueryAccountingMiddleware
+from .profiling import ProfilingMiddleware
+from .tracing import TracingMiddleware
\ No newline at end of file
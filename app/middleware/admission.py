@@ -0,0 +1,34 @@
+from starlette import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.response_api import api_response
+from app.core.admission import Rejected, admission, classify
+
+
+class AdmissionMiddleware:
+    """
+        Контроль допуска (app.core.admission): запрос занимает место своего класса
+        на все время обработки, включая отправку потокового ответа; без места — 503 с Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with admission.admit(route_class):
+                await self.app(scope, receive, send)
+        except Rejected as e:
+            response = api_response.error(
+                error="Сервис перегружен",
+                message="Запрос не принят из-за нагрузки, повторите позже",
+                details=f"{route_class}: {e.reason}",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,334 @@
+"""
+    Сжатие ответов по заголовку Accept-Encoding: zstd, brotli или gzip.
+
+    - Сжимаются только текстовые и сериализованные типы (JSON, NDJSON, CSV, MessagePack, текст)
+      не меньше compression__min_size байт: на мелких ответах заголовки дороже выигрыша.
+    - Ответ целиком (ApiResponse) получает ETag по содержимому, если его не задало приложение;
+      If-None-Match с тем же ETag — ответ 304 без тела. Сжатые тела хранятся в LRU-кэше
+      по (ETag, кодирование), поэтому горячие страницы списков не сжимаются повторно.
+    - Потоковый ответ (выгрузки FileResponse) сжимается по частям по мере отправки,
+      без буферизации файла; Content-Length снимается, диапазоны (Range) не сжимаются.
+
+    ETag сжатого представления — ETag исходного с суффиксом кодирования ("…-gzip"),
+    If-None-Match сверяется без суффикса. brotli и zstandard — необязательные пакеты:
+    без них кодирование не предлагается. Большие тела сжимаются в потоке, чтобы не
+    занимать цикл событий.
+"""
+import asyncio
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.metrics import compression_cache_total, compression_ratio
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Сжатие по частям: обработать часть и завершить поток
+Stream = Tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+_COMPRESSIBLE = (
+    "text/", "application/json", "application/x-ndjson", "application/msgpack",
+    "application/javascript", "application/xml", "application/problem+json",
+)
+
+
+def _gzip_stream(level: int) -> Stream:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def _encoders() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[], Stream]]]:
+    """ Доступные кодирования в порядке предпочтения сервера: сжатие одним вызовом и по частям """
+    config = settings.compression
+    encoders = {}
+    if zstandard is not None:
+        zstd = zstandard.ZstdCompressor(level=config.zstd_level)
+
+        def zstd_stream() -> Stream:
+            compressor = zstd.compressobj()
+            return compressor.compress, compressor.flush
+
+        encoders["zstd"] = (zstd.compress, zstd_stream)
+    if brotli is not None:
+        def brotli_stream() -> Stream:
+            compressor = brotli.Compressor(quality=config.brotli_quality)
+            return compressor.process, compressor.finish
+
+        encoders["br"] = (lambda body: brotli.compress(body, quality=config.brotli_quality), brotli_stream)
+    encoders["gzip"] = (
+        lambda body: zlib.compress(body, config.gzip_level, wbits=31),
+        lambda: _gzip_stream(config.gzip_level),
+    )
+    return encoders
+
+
+def choose_encoding(accept_encoding: Optional[str], available: List[str]) -> Optional[str]:
+    """ Кодирование с наибольшим q у клиента, при равных — по предпочтению сервера; None — без сжатия """
+    weights: Dict[str, float] = {}
+    for item in (accept_encoding or "").lower().split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            if param.replace(" ", "").startswith("q="):
+                try:
+                    quality = float(param.split("=", 1)[1])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            weights[name] = quality
+    wildcard = weights.get("*", 0.0)
+    ranked = [
+        (weights.get(name, wildcard), -position, name)
+        for position, name in enumerate(available)
+    ]
+    best = max(ranked, default=(0.0, 0, None))
+    return best[2] if best[0] > 0 else None
+
+
+def _opaque(etag: str) -> str:
+    """ ETag без признака W/, кавычек и суффикса кодирования """
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    base, _, suffix = tag.rpartition("-")
+    return base if base and suffix in ("gzip", "br", "zstd") else tag
+
+
+def _with_encoding(etag: str, encoding: str) -> str:
+    weak = etag.startswith("W/")
+    tag = etag[2:] if weak else etag
+    return f'{"W/" if weak else ""}"{tag.strip(chr(34))}-{encoding}"'
+
+
+class CompressedCache:
+    """ LRU сжатых тел по (ETag, кодирование) с ограничением суммарного размера """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        body = self._items.get(key)
+        if body is not None:
+            self._items.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, str], body: bytes) -> None:
+        # Одно тело не вытесняет больше восьмой части кэша
+        if len(body) > self.max_bytes // 8 or key in self._items:
+            return
+        self._items[key] = body
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= len(evicted)
+
+
+compressed_cache = CompressedCache(settings.compression.cache_bytes)
+
+
+class CompressionMiddleware:
+    """
+        Сжатие ответов и условные запросы по ETag.
+        Чистый ASGI-middleware, как остальные: заголовки ответа задерживаются до первой части тела
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.encoders = _encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), list(self.encoders))
+        responder = _Responder(self, scope, request_headers, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """ Обработка ответа одного запроса """
+
+    def __init__(
+            self,
+            middleware: CompressionMiddleware,
+            scope: Scope,
+            request_headers: Headers,
+            encoding: Optional[str],
+            send: Send,
+    ):
+        self.middleware = middleware
+        self.method = scope["method"]
+        self.request_headers = request_headers
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.mode: Optional[str] = None
+        self.stream: Optional[Stream] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode is None:
+            headers = MutableHeaders(scope=self.start)
+            if more_body:
+                await self._start_stream(headers, body)
+            else:
+                await self._send_whole(headers, body)
+            return
+        if self.mode == "stream":
+            process, finish = self.stream
+            chunk = await self._run(process, body)
+            if not more_body:
+                chunk += finish()
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        elif self.mode == "pass":
+            await self._send(message)
+        # mode == "drop": тело после ответа 304 не отправляется
+
+    # ──── ПРОВЕРКИ ────
+    def _eligible(self, headers: MutableHeaders, size: Optional[int]) -> bool:
+        """ Ответ можно сжать: тип, размер, нет своего кодирования и диапазона """
+        status = self.start["status"]
+        if status in (204, 206) or 300 <= status < 400:
+            return False
+        if size is not None and size < settings.compression.min_size:
+            return False
+        return (
+            headers.get("content-type", "").lower().startswith(_COMPRESSIBLE)
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and "range" not in self.request_headers
+        )
+
+    def _not_modified(self, etag: str) -> bool:
+        if_none_match = self.request_headers.get("if-none-match")
+        if not if_none_match or self.method not in ("GET", "HEAD"):
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    async def _send_not_modified(self, headers: MutableHeaders, etag: str) -> None:
+        kept = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+            if name in ("vary", "cache-control", "expires", "content-location", "date")
+        ]
+        kept.append((b"etag", etag.encode("latin-1")))
+        await self._send({"type": "http.response.start", "status": 304, "headers": kept})
+        await self._send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    def _vary(headers: MutableHeaders) -> None:
+        vary = headers.get("vary")
+        if not vary:
+            headers["vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["vary"] = f"{vary}, Accept-Encoding"
+
+    @staticmethod
+    async def _run(func: Callable[[bytes], bytes], body: bytes) -> bytes:
+        """ Большие тела сжимаются в потоке: zlib, brotli и zstandard отпускают GIL """
+        if len(body) >= settings.compression.thread_min_size:
+            return await asyncio.to_thread(func, body)
+        return func(body)
+
+    # ──── ОТВЕТ ЦЕЛИКОМ ────
+    async def _send_whole(self, headers: MutableHeaders, body: bytes) -> None:
+        self.mode = "done"
+        etag = headers.get("etag")
+        if settings.compression.etag and etag is None and self.method == "GET" and self.start["status"] == 200:
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers["etag"] = etag
+
+        compress = self._eligible(headers, len(body))
+        if compress:
+            self._vary(headers)
+        if etag and self.start["status"] == 200 and self._not_modified(etag):
+            # ETag того представления, которое получил бы клиент с этим Accept-Encoding
+            await self._send_not_modified(headers, _with_encoding(etag, self.encoding) if compress and self.encoding else etag)
+            return
+        if compress and self.encoding:
+            body = await self._compress(headers, body, etag)
+
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body})
+
+    async def _compress(self, headers: MutableHeaders, body: bytes, etag: Optional[str]) -> bytes:
+        key = (etag, self.encoding) if etag else None
+        compressed = compressed_cache.get(key) if key else None
+        if compressed is not None:
+            if settings.metrics_enabled:
+                compression_cache_total.labels("hit").inc()
+        else:
+            compress, _ = self.middleware.encoders[self.encoding]
+            compressed = await self._run(compress, body)
+            if key:
+                if settings.metrics_enabled:
+                    compression_cache_total.labels("miss").inc()
+                compressed_cache.put(key, compressed)
+        if len(compressed) >= len(body):
+            return body
+
+        if settings.metrics_enabled:
+            compression_ratio.labels(self.encoding).observe(len(compressed) / len(body))
+        headers["content-encoding"] = self.encoding
+        headers["content-length"] = str(len(compressed))
+        if etag:
+            headers["etag"] = _with_encoding(etag, self.encoding)
+        return compressed
+
+    # ──── ПОТОК ────
+    async def _start_stream(self, headers: MutableHeaders, body: bytes) -> None:
+        etag = headers.get("etag")
+        length = headers.get("content-length")
+        compress = self._eligible(headers, int(length) if length and length.isdigit() else None)
+        if compress:
+            self._vary(headers)
+        if etag and self.start["status"] == 200 and self._not_modified(etag):
+            self.mode = "drop"
+            await self._send_not_modified(headers, _with_encoding(etag, self.encoding) if compress and self.encoding else etag)
+            return
+
+        if compress:
+            if self.encoding:
+                self.mode = "stream"
+                self.stream = self.middleware.encoders[self.encoding][1]()
+                del headers["content-length"]
+                if "accept-ranges" in headers:
+                    del headers["accept-ranges"]
+                headers["content-encoding"] = self.encoding
+                if etag:
+                    headers["etag"] = _with_encoding(etag, self.encoding)
+                await self._send(self.start)
+                chunk = await self._run(self.stream[0], body)
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+                return
+
+        self.mode = "pass"
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": True})
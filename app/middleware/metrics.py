@@ -0,0 +1,49 @@
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import http_request_duration, http_requests_total, http_requests_in_flight
+
+
+def route_template(scope: Scope) -> str:
+    """ Шаблон пути маршрута (/api/v1/trucks/{truck_id}) вместо фактического пути """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+        Метрики HTTP-запросов: длительность по маршрутам, количество по статусам
+        и число запросов в обработке.
+        Реализован как чистый ASGI-middleware: BaseHTTPMiddleware запускает обработчик
+        в отдельной задаче и заметно дороже на горячем пути.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = http_requests_in_flight.labels(method)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            in_flight.dec()
+            route = route_template(scope)
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_requests_total.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,89 @@
+import asyncio
+from time import perf_counter
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.profiling import profile_store
+from app.dependencies import has_admin_access
+
+
+class ProfilingMiddleware:
+    """
+        Профилирование отдельных запросов по требованию, без передеплоя.
+        Запрос профилируется, если передан заголовок X-Profile: 1 и доступ разрешен
+        (режим отладки или верный X-Admin-Token). Заголовок X-Profile-Memory: 1
+        дополнительно снимает разницу выделений памяти через tracemalloc.
+        Идентификатор сохраненного профиля возвращается в заголовке X-Profile-Id.
+
+        cProfile работает на уровне потока, поэтому в профиль попадают и сопрограммы
+        других запросов, выполнявшихся одновременно; одновременно профилируется
+        только один запрос.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if headers.get("x-profile") != "1" or not has_admin_access(headers.get("x-admin-token")):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send, trace_memory=headers.get("x-profile-memory") == "1")
+        finally:
+            self._busy = False
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, trace_memory: bool) -> None:
+        # Импорт по требованию: профилировщики не нужны при обычном запуске
+        import cProfile
+        import tracemalloc
+
+        profile_id = profile_store.new_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        snapshot_before = tracemalloc.take_snapshot() if trace_memory else None
+
+        profiler = cProfile.Profile()
+        start = perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            duration = perf_counter() - start
+
+            memory_report = None
+            if trace_memory:
+                snapshot_after = tracemalloc.take_snapshot()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                stats = snapshot_after.compare_to(snapshot_before, "lineno")
+                memory_report = "\n".join(str(stat) for stat in stats[:settings.profiling.memory_top])
+
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status_code": status_code,
+                "duration_ms": round(duration * 1000, 2),
+            }
+            await asyncio.to_thread(profile_store.save, profile_id, profiler, meta, memory_report)
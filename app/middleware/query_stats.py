@@ -0,0 +1,53 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.db.query_stats import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryAccountingMiddleware:
+    """
+        Учет SQL-запросов каждого HTTP-запроса.
+        В режиме отладки добавляет заголовки X-DB-Queries и X-DB-Time (мс),
+        логирует превышение бюджета запросов и повторы одинаковых запросов (N+1).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Queries", str(stats.count))
+                    headers.append("X-DB-Time", f"{stats.total_time * 1000:.2f}")
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        self._check(scope, stats)
+
+    @staticmethod
+    def _check(scope: Scope, stats) -> None:
+        """ Проверка бюджета запросов и поиск N+1 """
+        budget = settings.db.query_budget
+        request = f"{scope['method']} {scope['path']}"
+
+        if budget and stats.count > budget:
+            logger.warning(
+                "%s: выполнено %d SQL-запросов (бюджет %d), %.2f мс",
+                request, stats.count, budget, stats.total_time * 1000,
+            )
+
+        for statement, count in stats.repeated(settings.db.n_plus_one_threshold):
+            logger.warning("%s: возможен N+1, запрос выполнен %d раз: %s", request, count, statement)
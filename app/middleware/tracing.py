@@ -0,0 +1,42 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.metrics import route_template
+from app.utils.tracing import NOOP_SPAN, start_trace
+
+
+class TracingMiddleware:
+    """
+        Корневой участок трассировки для каждого HTTP-запроса.
+        Принимает входящий заголовок W3C traceparent и возвращает traceparent
+        корневого участка в ответе, если запрос попал в выборку.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        span = start_trace(f"HTTP {scope['method']}", Headers(scope=scope).get("traceparent"))
+        if span is NOOP_SPAN:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                MutableHeaders(scope=message).append("traceparent", span.traceparent)
+            await send(message)
+
+        span.set_attribute("http.method", scope["method"])
+        span.set_attribute("http.target", scope["path"])
+        with span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
@@ -1,2 +1,5 @@
 from .truck_models import TruckModelSchema, TruckModelCreateSchema
-from .trucks import DumpTruckSchema, DumpTruckCreateSchema
\ No newline at end of file
+from .trucks import DumpTruckSchema, DumpTruckCreateSchema, TruckSyncItemSchema, TruckSyncSchema, TruckImportSchema
+from .jobs import JobSchema, JobCreateSchema, JobStatus
+from .changes import ChangeSchema
+from .dispatch import DispatchLoadSchema, DispatchRequestSchema
\ No newline at end of file
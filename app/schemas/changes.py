@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class ChangeSchema(BaseModel):
+    """ Запись журнала изменений """
+
+    seq: int = Field(default=..., description="Номер изменения")
+    entity: Literal["truck", "model"] = Field(default=..., description="Сущность")
+    entity_id: int = Field(default=..., description="ID самосвала или модели")
+    op: Literal["create", "update", "delete"] = Field(default=..., description="Операция")
+    data: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Состояние после изменения (для delete — ключи удаленной записи)",
+    )
+    changed_at: datetime = Field(default=..., description="Время изменения (UTC)")
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
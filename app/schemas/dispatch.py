@@ -0,0 +1,62 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class DispatchLoadSchema(BaseModel):
+    """ Груз, ожидающий погрузки """
+
+    id: str = Field(
+        default=...,
+        min_length=1,
+        max_length=64,
+        description="ID груза (например, ковш экскаватора)",
+    )
+    weight: int = Field(
+        default=...,
+        ge=1,
+        le=500,
+        description="Вес груза (тонн)",
+    )
+
+
+class DispatchRequestSchema(BaseModel):
+    """ Схема запроса на распределение грузов по самосвалам """
+
+    loads: List[DispatchLoadSchema] = Field(
+        default=...,
+        min_length=1,
+        description="Грузы, ожидающие погрузки (не больше dispatch__max_loads)",
+    )
+    model_id: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Только самосвалы этой модели",
+    )
+    truck_ids: Optional[List[int]] = Field(
+        default=None,
+        min_length=1,
+        max_length=10_000,
+        description="Только эти самосвалы (по умолчанию — весь парк)",
+    )
+    reserve_percentage: float = Field(
+        default=0.0,
+        ge=0,
+        le=50,
+        description="Резерв грузоподъемности на погрешность весов, %",
+    )
+    time_limit: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=30,
+        description="Ограничение времени расчета, с (по умолчанию dispatch__time_limit)",
+    )
+
+    @model_validator(mode="after")
+    def validate_unique_load_ids(self):
+        seen = set()
+        for load in self.loads:
+            if load.id in seen:
+                raise ValueError(f"Груз {load.id} встречается в списке несколько раз")
+            seen.add(load.id)
+        return self
@@ -1,5 +1,9 @@
 from .exceptions_truck import TruckNotFoundError, TruckModelNotFoundError, DuplicateBoardNumberError
 from .exceptions_model import ModelNotFoundError, DuplicateModelNameError
+from .exceptions_idempotency import IdempotencyKeyReusedError, IdempotencyKeyConflictError
+from .exceptions_import import ImportFormatError
+from .exceptions_changes import ChangeFeedGoneError
+from .exceptions_jobs import JobNotFoundError, JobStateError, UploadTooLargeError
 from .response import (
     ResponseSchema, ResponseMetaSchema, ResponseLinksSchema,
     ErrorResponseSchema
@@ -0,0 +1,3 @@
+class ChangeFeedGoneError(Exception):
+    """ Изменения после указанной позиции уже удалены сжатием журнала """
+    pass
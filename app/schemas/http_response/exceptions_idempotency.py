@@ -0,0 +1,8 @@
+class IdempotencyKeyReusedError(Exception):
+    """ Ключ идемпотентности уже использован с другим телом запроса """
+    pass
+
+
+class IdempotencyKeyConflictError(Exception):
+    """ Запрос с тем же ключом идемпотентности выполняется одновременно с этим """
+    pass
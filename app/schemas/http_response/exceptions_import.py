@@ -0,0 +1,3 @@
+class ImportFormatError(Exception):
+    """ Неподдерживаемый формат или тип данных импорта """
+    pass
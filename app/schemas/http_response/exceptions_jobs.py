@@ -0,0 +1,13 @@
+class JobNotFoundError(Exception):
+    """ Фоновая задача не найдена """
+    pass
+
+
+class JobStateError(Exception):
+    """ Действие недоступно в текущем статусе задачи """
+    pass
+
+
+class UploadTooLargeError(Exception):
+    """ Загружаемый файл больше допустимого размера """
+    pass
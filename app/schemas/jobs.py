@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field, ConfigDict
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class JobCreateSchema(BaseModel):
+    """ Схема для постановки фоновой задачи (импорт — через загрузку файла) """
+
+    kind: Literal["export", "stats_rebuild", "reindex", "compact_changes", "anomaly_scan"] = Field(
+        default=...,
+        description=(
+            "Тип задачи: выгрузка, пересчет статистики загрузки, обслуживание индексов, "
+            "сжатие журнала изменений, поиск аномалий показаний веса"
+        ),
+    )
+    entity: Literal["trucks", "models"] = Field(
+        default="trucks",
+        description="Что выгружать (export)",
+    )
+    format: Literal["csv", "ndjson"] = Field(
+        default="csv",
+        description="Формат выгрузки (export)",
+    )
+    rebuild: bool = Field(
+        default=False,
+        description="Перестроить индексы, а не только обновить статистику планировщика (reindex)",
+    )
+    hours: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=24 * 31,
+        description="За сколько последних часов анализировать показания (anomaly_scan, по умолчанию anomalies__hours)",
+    )
+
+    def job_params(self) -> Dict[str, Any]:
+        """ Параметры, относящиеся к типу задачи """
+        if self.kind == "export":
+            return {"entity": self.entity, "format": self.format}
+        if self.kind == "reindex":
+            return {"rebuild": self.rebuild}
+        if self.kind == "anomaly_scan" and self.hours:
+            return {"hours": self.hours}
+        return {}
+
+
+class JobSchema(BaseModel):
+    """ Состояние фоновой задачи """
+
+    id: str = Field(default=..., description="ID задачи")
+    kind: str = Field(default=..., description="Тип задачи")
+    status: JobStatus = Field(default=..., description="Статус")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Параметры задачи")
+    progress: float = Field(default=0.0, description="Доля выполненной работы (0..1)")
+    message: Optional[str] = Field(default=None, description="Текущий этап")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="Итог задачи")
+    result_file: Optional[str] = Field(default=None, description="Файл результата (GET /jobs/{id}/result)")
+    error: Optional[str] = Field(default=None, description="Текст ошибки")
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from .truck_models import TruckModelSchema
 
 
@@ -71,3 +71,61 @@ class DumpTruckSchema(DumpTruckCreateSchema):
         default=...,
         description="Перегружен ли самосвал",
     )
+    anomaly_flags: List[str] = Field(
+        default_factory=list,
+        description="Аномалии показаний веса по последнему анализу телеметрии",
+    )
+
+
+class TruckSyncItemSchema(DumpTruckCreateSchema):
+    """ Самосвал в эталонном списке для синхронизации """
+
+    current_weight: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Текущий вес груза (тонн); если не задан — у существующего не меняется, у нового 0",
+    )
+
+
+class TruckImportSchema(TruckSyncItemSchema):
+    """ Строка файла импорта: модель задается ID или названием """
+
+    model_id: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="ID модели самосвала",
+    )
+    model_name: Optional[str] = Field(
+        default=None,
+        max_length=50,
+        description="Название модели самосвала",
+    )
+
+    @model_validator(mode="after")
+    def validate_model_reference(self):
+        if self.model_id is None and not self.model_name:
+            raise ValueError("Не указана модель: model_id или model_name")
+        return self
+
+
+class TruckSyncSchema(BaseModel):
+    """ Эталонный список самосвалов (например, из учетной системы) """
+
+    trucks: List[TruckSyncItemSchema] = Field(
+        default=...,
+        max_length=100_000,
+        description="Полный список самосвалов",
+    )
+    delete_missing: bool = Field(
+        default=False,
+        description="Удалить самосвалы, которых нет в списке",
+    )
+
+    @model_validator(mode="after")
+    def validate_unique_board_numbers(self):
+        seen = set()
+        for truck in self.trucks:
+            if truck.board_number in seen:
+                raise ValueError(f"Бортовой номер {truck.board_number} встречается в списке несколько раз")
+            seen.add(truck.board_number)
+        return self
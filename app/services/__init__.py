@@ -1,2 +1,6 @@
+from .changes import ChangesService
+from .fleet import FleetService
+from .imports import ImportService
+from .jobs import JobService
 from .truck import TruckService
-from .truck_model import TruckModelService
\ No newline at end of file
+from .truck_model import TruckModelService
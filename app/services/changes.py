@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.crud.changes import get_changes, get_last_seq, get_purged_seq
+from app.services.instrumentation import instrument_service
+from app.schemas.http_response import ChangeFeedGoneError
+
+
+@instrument_service
+class ChangesService:
+    """ Сервисный слой для журнала изменений """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_changes(self, since: int, limit: int, entity: Optional[str] = None) -> Dict[str, Any]:
+        """
+            Страница изменений после позиции since: записи, следующая позиция, есть ли еще и последний номер.
+            ChangeFeedGoneError — позиция удалена сжатием журнала или больше последнего изменения
+        """
+        purged_seq = await get_purged_seq(self.db)
+        last_seq = await get_last_seq(self.db)
+        if since < purged_seq:
+            raise ChangeFeedGoneError(f"Изменения до {purged_seq} удалены сжатием журнала")
+        if since > last_seq:
+            raise ChangeFeedGoneError(f"Позиция {since} больше последнего изменения {last_seq}")
+
+        entries, has_more = await get_changes(self.db, since, limit, entity)
+        return {
+            "changes": entries,
+            "next_since": entries[-1].seq if entries else since,
+            "has_more": has_more,
+            "last_seq": last_seq,
+        }
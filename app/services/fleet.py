@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.crud.fleet import fleet_summary, query_fleet
+from app.core.fleet_state import fleet_state
+from app.core.singleflight import coalesced_read
+from app.services.instrumentation import instrument_service
+
+
+@instrument_service
+class FleetService:
+    """
+        Сервисный слой для сводок по парку. Методы возвращают и источник ответа:
+        состояние парка в памяти ("memory") или запрос к БД ("sql"), пока оно не загружено
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _from_memory() -> bool:
+        return settings.fleet_state.enabled and fleet_state.ready
+
+    async def get_summary(self) -> Tuple[List[Dict[str, Any]], str]:
+        """ Сводка по моделям: самосвалы, перегруженные, суммарный вес, средняя загрузка """
+        if self._from_memory():
+            return fleet_state.summary(), "memory"
+        return await coalesced_read(self.db, ("fleet.summary",), fleet_summary), "sql"
+
+    async def query_trucks(
+            self,
+            model_id: Optional[int] = None,
+            min_load: Optional[float] = None,
+            max_load: Optional[float] = None,
+            overloaded: Optional[bool] = None,
+            board_number: Optional[str] = None,
+            order: str = "id",
+            skip: int = 0,
+            limit: int = 50,
+    ) -> Tuple[Tuple[List[Dict[str, Any]], int], str]:
+        """ Самосвалы с фильтрами по модели, проценту загрузки и перегрузу, их общее число и источник ответа """
+        filters = dict(
+            model_id=model_id, min_load=min_load, max_load=max_load, overloaded=overloaded,
+            board_number=board_number, order=order, skip=skip, limit=limit,
+        )
+        if self._from_memory():
+            return fleet_state.query(**filters), "memory"
+        return await coalesced_read(self.db, ("fleet.trucks", *filters.values()), query_fleet, **filters), "sql"
+
+    async def get_top_loaded(self, n: int, model_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], str]:
+        """ n самосвалов с наибольшей загрузкой и источник ответа """
+        (trucks, _), source = await self.query_trucks(model_id=model_id, order="load_desc", limit=n)
+        return trucks, source
@@ -0,0 +1,32 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.importer import detect_format, import_stream
+from app.services.instrumentation import instrument_service
+from app.schemas.http_response import ImportFormatError
+
+
+@instrument_service
+class ImportService:
+    """ Сервисный слой для потокового импорта самосвалов и моделей """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def import_stream(
+            self,
+            kind: str,
+            chunks: AsyncIterator[bytes],
+            fmt: Optional[str] = None,
+            content_type: Optional[str] = None,
+            chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+            Импорт из потока байтов; формат — fmt или по Content-Type (ImportFormatError, если не определен).
+            :return отчет: счетчики, ошибки по строкам, строк в секунду
+        """
+        fmt = fmt or detect_format(content_type)
+        if fmt is None:
+            raise ImportFormatError("Укажите format=csv|ndjson или Content-Type text/csv / application/x-ndjson")
+        return await import_stream(self.db, kind, fmt, chunks, chunk_size)
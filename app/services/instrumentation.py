@@ -0,0 +1,39 @@
+import functools
+import inspect
+from time import perf_counter
+
+from app.config import settings
+from app.utils.metrics import service_call_duration
+from app.utils.tracing import start_span
+
+
+def _instrument_method(service_name: str, method_name: str, method):
+    histogram = service_call_duration.labels(service_name, method_name)
+    span_name = f"{service_name}.{method_name}"
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            with start_span(span_name):
+                return await method(*args, **kwargs)
+        finally:
+            # Декоратор подключается и ради одной трассировки
+            if settings.metrics_enabled:
+                histogram.observe(perf_counter() - start)
+
+    return wrapper
+
+
+def instrument_service(cls):
+    """
+        Декоратор класса сервиса: замер длительности и участок трассировки
+        для всех публичных асинхронных методов
+    """
+    if not (settings.metrics_enabled or settings.tracing.enabled):
+        return cls
+
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(member):
+            setattr(cls, name, _instrument_method(cls.__name__, name, member))
+    return cls
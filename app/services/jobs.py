@@ -0,0 +1,93 @@
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.crud.jobs import get_job, get_jobs_list
+from app.core.importer import detect_format
+from app.core.jobs import job_runner
+from app.db.models import Job
+from app.services.instrumentation import instrument_service
+from app.schemas.http_response import ImportFormatError, JobNotFoundError, JobStateError, UploadTooLargeError
+
+
+@instrument_service
+class JobService:
+    """ Сервисный слой для фоновых задач (app.core.jobs) """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """ Поставить задачу в очередь """
+        return await job_runner.submit(kind, params)
+
+    async def submit_import(
+            self,
+            entity: str,
+            chunks: AsyncIterator[bytes],
+            fmt: Optional[str] = None,
+            content_type: Optional[str] = None,
+            chunk_size: Optional[int] = None,
+    ) -> Job:
+        """
+            Сохранить загружаемый файл и поставить задачу импорта.
+            ImportFormatError — формат не определен, UploadTooLargeError — файл больше jobs.max_upload_mb
+        """
+        fmt = fmt or detect_format(content_type)
+        if fmt is None:
+            raise ImportFormatError("Укажите format=csv|ndjson или Content-Type text/csv / application/x-ndjson")
+
+        job_id = job_runner.new_job_id()
+        upload = job_runner.results_dir / f"{job_id}.upload"
+        try:
+            # Тело пишется в файл по частям, не накапливаясь в памяти
+            limit = settings.jobs.max_upload_mb * 1024 * 1024
+            size = 0
+            with open(upload, "wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > limit:
+                        raise UploadTooLargeError(f"Файл больше {settings.jobs.max_upload_mb} МБ")
+                    await asyncio.to_thread(file.write, chunk)
+
+            params = {"entity": entity, "format": fmt, "chunk_size": chunk_size, "upload": upload.name, "bytes": size}
+            return await job_runner.submit("import", params, job_id=job_id)
+        except BaseException:
+            upload.unlink(missing_ok=True)
+            raise
+
+    async def get_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """ Последние задачи """
+        return await get_jobs_list(self.db, status, limit)
+
+    async def get_job(self, job_id: str) -> Job:
+        """ Задача по ID (JobNotFoundError, если нет) """
+        job = await get_job(self.db, job_id)
+        if job is None:
+            raise JobNotFoundError(f"Задача {job_id} не найдена")
+        return job
+
+    async def get_result(self, job_id: str) -> Tuple[Job, Path]:
+        """
+            Завершенная задача и путь к файлу ее результата.
+            JobStateError — результата нет, JobNotFoundError — задачи нет или файл удален
+        """
+        job = await self.get_job(job_id)
+        if job.status != "succeeded" or not job.result_file:
+            raise JobStateError(f"Результата нет: задача в статусе {job.status}")
+        path = job_runner.results_dir / job.result_file
+        if not path.is_file():
+            raise JobNotFoundError(f"Файл результата задачи {job_id} удален")
+        return job, path
+
+    async def cancel(self, job_id: str) -> Job:
+        """ Отменить задачу в очереди или в работе (JobStateError — уже завершена) """
+        await self.get_job(job_id)
+        if not await job_runner.cancel(job_id):
+            raise JobStateError(f"Задача {job_id} уже завершена")
+
+        self.db.expire_all()
+        return await self.get_job(job_id)
@@ -1,11 +1,30 @@
-from typing import List, Tuple
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.crud import get_truck_by_id, get_trucks_list, create_truck, update_truck, delete_truck
-from app.schemas import DumpTruckCreateSchema
+from app.core.crud import get_truck_by_id, get_trucks_list, create_truck, update_truck, delete_truck, sync_trucks
+from app.core.board_index import normalize
+from app.core.crud.anomalies import get_anomalies_list
+from app.core.crud.fleet import dispatch_candidates, suggest_board_numbers, top_overloaded
+from app.core.crud.idempotency import get_idempotency_record, save_idempotency_record
+from app.core.dispatch import plan_dispatch
+from app.core.fleet_state import fleet_state
+from app.core.singleflight import coalesced_read
+from app.db.writer import write
+from app.services.instrumentation import instrument_service
+from app.config import settings
+from app.schemas import DispatchRequestSchema, DumpTruckCreateSchema, TruckSyncSchema
+from app.schemas.http_response import IdempotencyKeyConflictError, IdempotencyKeyReusedError
 from app.db.models import DumpTruck
 
 
+SYNC_SCOPE = "trucks.sync"
+
+
+@instrument_service
 class TruckService:
     """ Сервисный слой для работы с самосвалами """
 
@@ -14,7 +33,12 @@ class TruckService:
 
     async def get_truck(self, truck_id: int) -> DumpTruck:
         """ Получить самосвал по ID """
-        return await get_truck_by_id(self.db, truck_id)
+        return await coalesced_read(
+            self.db,
+            ("trucks.get", truck_id),
+            get_truck_by_id,
+            truck_id=truck_id,
+        )
 
     async def get_trucks(
             self,
@@ -24,24 +48,138 @@ class TruckService:
             limit: int = 50
     ) -> Tuple[List[DumpTruck], int]:
         """ Получить список самосвалов с фильтрацией и пагинацией"""
-        return await get_trucks_list(
-            db=self.db,
+
+        # Фильтры регистронезависимые, поэтому нормализуем их для ключа объединения
+        key = (
+            "trucks.list",
+            board_number.lower() if board_number else None,
+            model_name.lower() if model_name else None,
+            skip,
+            limit,
+        )
+        return await coalesced_read(
+            self.db,
+            key,
+            get_trucks_list,
             board_number=board_number,
             model_name=model_name,
             skip=skip,
             limit=limit
         )
 
+    async def get_top_overloaded(self, n: int) -> Tuple[List[Dict[str, Any]], str]:
+        """
+            Самые перегруженные самосвалы и источник ответа: куча состояния парка в памяти
+            (обновляется при каждом изменении веса и грузоподъемности) или запрос к БД, пока оно не загружено
+        """
+        if fleet_state.ready:
+            return fleet_state.top_overloaded(n), "memory"
+        return await coalesced_read(self.db, ("trucks.top_overloaded", n), top_overloaded, n=n), "sql"
+
+    async def get_anomalies(
+            self,
+            flag: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """ Аномалии показаний веса по результатам последнего анализа (задача anomaly_scan) """
+        return await coalesced_read(
+            self.db, ("trucks.anomalies", flag, skip, limit), get_anomalies_list, flag=flag, skip=skip, limit=limit,
+        )
+
+    async def suggest_board_numbers(self, query: str, limit: int) -> Tuple[List[Dict[str, Any]], str]:
+        """ Подсказки бортовых номеров и источник ответа: индекс номеров в памяти или запрос к БД """
+        query = normalize(query)
+        if not query.isalnum():
+            # Номер состоит только из букв и цифр (validate_board_number) — совпадений нет
+            return [], "memory" if fleet_state.ready else "sql"
+        if fleet_state.ready:
+            return fleet_state.suggest(query, limit), "memory"
+        return await coalesced_read(
+            self.db, ("trucks.suggest", query, limit), suggest_board_numbers, query=query, limit=limit,
+        ), "sql"
+
+    async def plan_dispatch(self, request: DispatchRequestSchema) -> Tuple[Dict[str, Any], str]:
+        """
+            Распределить грузы по самосвалам без перегруза (app.core.dispatch) и источник данных
+            о свободной грузоподъемности: состояние парка в памяти или запрос к БД
+        """
+        if fleet_state.ready:
+            source = "memory"
+            trucks = fleet_state.dispatch_candidates(request.model_id, request.truck_ids)
+        else:
+            source = "sql"
+            trucks = await dispatch_candidates(self.db, request.model_id, request.truck_ids)
+
+        load_ids = [load.id for load in request.loads]
+        weights = np.array([load.weight for load in request.loads], dtype=np.int64)
+        # Расчет в потоке: цикл событий продолжает обслуживать запросы
+        plan = await asyncio.to_thread(
+            plan_dispatch, trucks, load_ids, weights,
+            request.reserve_percentage, request.time_limit or settings.dispatch.time_limit,
+        )
+        return plan, source
+
     async def create_truck(self, truck_data: DumpTruckCreateSchema) -> DumpTruck:
         """ Создать новый самосвал """
-        return await create_truck(self.db, truck_data)
+        return await write(self.db, create_truck, payload=truck_data)
 
     async def update_truck(self, truck_id: int, truck_data: DumpTruckCreateSchema) -> DumpTruck:
         """ Обновить самосвал """
-        existing_truck = await self.get_truck(truck_id)
-        return await update_truck(self.db, existing_truck, truck_data)
+        return await write(self.db, self._update, truck_id=truck_id, payload=truck_data)
 
     async def delete_truck(self, truck_id: int) -> None:
         """ Удалить самосвал """
-        existing_truck = await self.get_truck(truck_id)
-        await delete_truck(self.db, existing_truck)
+        await write(self.db, self._delete, truck_id=truck_id)
+
+    async def sync_trucks(
+            self,
+            payload: TruckSyncSchema,
+            idempotency_key: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+            Синхронизировать самосвалы с эталонным списком.
+            :return (сводка изменений, повтор ли это ранее выполненного запроса с тем же ключом)
+        """
+        return await write(self.db, self._sync, payload=payload, idempotency_key=idempotency_key)
+
+    # Чтение и изменение — в одной транзакции, поэтому объект читается без объединения
+    @staticmethod
+    async def _update(db: AsyncSession, truck_id: int, payload: DumpTruckCreateSchema) -> DumpTruck:
+        existing_truck = await get_truck_by_id(db, truck_id)
+        return await update_truck(db, existing_truck, payload)
+
+    @staticmethod
+    async def _delete(db: AsyncSession, truck_id: int) -> None:
+        existing_truck = await get_truck_by_id(db, truck_id)
+        await delete_truck(db, existing_truck)
+
+    @staticmethod
+    async def _sync(
+            db: AsyncSession,
+            payload: TruckSyncSchema,
+            idempotency_key: Optional[str],
+    ) -> Tuple[Dict[str, Any], bool]:
+        # Ключ проверяется и сохраняется в той же транзакции, что и изменения
+        if not idempotency_key:
+            return await sync_trucks(db, payload.trucks, payload.delete_missing), False
+
+        request_hash = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+        record = await get_idempotency_record(db, SYNC_SCOPE, idempotency_key)
+        if record is None:
+            try:
+                # Параллельный запрос с тем же ключом мог пройти проверку одновременно с этим:
+                # тогда его запись ключа зафиксирована первой, а изменения этого запроса откатываются
+                async with db.begin_nested():
+                    summary = await sync_trucks(db, payload.trucks, payload.delete_missing)
+                    await save_idempotency_record(db, SYNC_SCOPE, idempotency_key, request_hash, summary)
+                return summary, False
+            except IdempotencyKeyConflictError:
+                record = await get_idempotency_record(db, SYNC_SCOPE, idempotency_key)
+                if record is None:
+                    # Запись параллельного запроса еще не видна (не зафиксирована) — повторить позже
+                    raise
+
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyReusedError("Ключ идемпотентности уже использован с другим списком")
+        return record.response, True
@@ -6,11 +6,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.crud.truck_model import (
     create_model, get_model_by_id, get_models_list, update_model, delete_model
 )
+from app.core.singleflight import coalesced_read
+from app.db.writer import write
+from app.services.instrumentation import instrument_service
 from app.schemas import TruckModelCreateSchema
 from app.db.models import ModelTruck, DumpTruck
 from app.schemas.services import ModelInUseError
 
 
+@instrument_service
 class TruckModelService:
     """ Сервисный слой для работы с моделями самосвалов """
 
@@ -19,7 +23,12 @@ class TruckModelService:
 
     async def get_model(self, model_id: int) -> ModelTruck:
         """ Получить модель по ID """
-        return await get_model_by_id(self.db, model_id)
+        return await coalesced_read(
+            self.db,
+            ("models.get", model_id),
+            get_model_by_id,
+            model_id=model_id,
+        )
 
     async def get_models(
             self,
@@ -27,31 +36,43 @@ class TruckModelService:
             limit: int = 100
     ) -> Tuple[List[ModelTruck], int]:
         """ Получить список моделей с пагинацией """
-        return await get_models_list(
-            db=self.db,
+        return await coalesced_read(
+            self.db,
+            ("models.list", skip, limit),
+            get_models_list,
             skip=skip,
             limit=limit
         )
 
     async def create_model(self, model_data: TruckModelCreateSchema) -> ModelTruck:
         """ Создать новую модель самосвала """
-        return await create_model(self.db, model_data)
+        return await write(self.db, create_model, payload=model_data)
 
     async def update_model(self, model_id: int, model_data: TruckModelCreateSchema) -> ModelTruck:
         """ Обновить модель самосвала """
-        existing_model = await self.get_model(model_id)
-        return await update_model(self.db, existing_model, model_data)
+        return await write(self.db, self._update, model_id=model_id, payload=model_data)
 
     async def delete_model(self, model_id: int) -> None:
         """ Удалить модель самосвала """
-        existing_model = await self.get_model(model_id)
-        if await self._has_trucks(model_id):
+        await write(self.db, self._delete, model_id=model_id)
+
+    # Чтение и изменение — в одной транзакции, поэтому объект читается без объединения
+    @staticmethod
+    async def _update(db: AsyncSession, model_id: int, payload: TruckModelCreateSchema) -> ModelTruck:
+        existing_model = await get_model_by_id(db, model_id)
+        return await update_model(db, existing_model, payload)
+
+    @classmethod
+    async def _delete(cls, db: AsyncSession, model_id: int) -> None:
+        existing_model = await get_model_by_id(db, model_id)
+        if await cls._has_trucks(db, model_id):
             raise ModelInUseError("Нельзя удалить модель, используемую самосвалами")
 
-        await delete_model(self.db, existing_model)
+        await delete_model(db, existing_model)
 
-    async def _has_trucks(self, model_id: int) -> bool:
+    @staticmethod
+    async def _has_trucks(db: AsyncSession, model_id: int) -> bool:
         """ Проверить, используется ли модель самосвалами """
         stmt = select(DumpTruck.id).where(DumpTruck.model_id == model_id).limit(1)
-        result = await self.db.execute(stmt)
+        result = await db.execute(stmt)
         return result.scalar_one_or_none() is not None
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    # Время хранится без часового пояса, в UTC (как CURRENT_TIMESTAMP БД)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,102 @@
+"""
+    Двоичная min-куча с индексом элементов: изменение ключа и удаление по элементу за O(log N).
+    heapq так не умеет — у него нет позиции элемента, поэтому обновление пришлось бы делать
+    ленивыми дублями, а куча при частых изменениях разрасталась бы.
+"""
+import heapq
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+
+class IndexedHeap:
+    """ Куча пар (ключ, элемент); у каждого элемента — не больше одной записи """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[Any, Hashable]] = []
+        self._index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._index
+
+    def build(self, entries: Iterable[Tuple[Any, Hashable]]) -> None:
+        """ Заменить содержимое за O(N) """
+        self._heap = list(entries)
+        heapq.heapify(self._heap)
+        self._index = {item: pos for pos, (_, item) in enumerate(self._heap)}
+
+    def set(self, item: Hashable, key: Any) -> None:
+        """ Добавить элемент или изменить его ключ """
+        pos = self._index.get(item)
+        if pos is None:
+            self._heap.append((key, item))
+            self._index[item] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        old = self._heap[pos][0]
+        self._heap[pos] = (key, item)
+        if key < old:
+            self._sift_up(pos)
+        elif key > old:
+            self._sift_down(pos)
+
+    def discard(self, item: Hashable) -> None:
+        """ Удалить элемент, если он есть """
+        pos = self._index.pop(item, None)
+        if pos is None:
+            return
+        last = self._heap.pop()
+        if pos == len(self._heap):
+            return
+        self._heap[pos] = last
+        self._index[last[1]] = pos
+        self._sift_up(pos)
+        self._sift_down(self._index[last[1]])
+
+    def smallest(self, n: int) -> List[Tuple[Any, Hashable]]:
+        """
+            n наименьших пар по возрастанию за O(n log n) независимо от размера кучи:
+            обход начинается с корня, в границу обхода попадают только потомки выданных узлов
+        """
+        heap = self._heap
+        result: List[Tuple[Any, Hashable]] = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < n:
+            entry, pos = heapq.heappop(frontier)
+            result.append(entry)
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def _sift_up(self, pos: int) -> None:
+        heap, index = self._heap, self._index
+        entry = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[pos] = heap[parent]
+            index[heap[pos][1]] = pos
+            pos = parent
+        heap[pos] = entry
+        index[entry[1]] = pos
+
+    def _sift_down(self, pos: int) -> None:
+        heap, index = self._heap, self._index
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[pos] = heap[child]
+            index[heap[pos][1]] = pos
+            pos = child
+        heap[pos] = entry
+        index[entry[1]] = pos
@@ -0,0 +1,284 @@
+"""
+    Легковесные метрики в формате Prometheus без внешних зависимостей.
+    Все обновления выполняются в потоке цикла событий, поэтому блокировки не нужны:
+    наблюдение значения — это поиск корзины через bisect и пара сложений.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """ Метки в формате {name="value",...} """
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    """ Базовый класс метрики с набором меток """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str):
+        """ Дочерняя метрика для конкретных значений меток """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[Tuple[Tuple[str, ...], "_Metric"]]:
+        if not self.labelnames:
+            return [((), self)]
+        return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in self._samples():
+            lines.extend(child._render_child(self.name, self.labelnames, values))
+        return lines
+
+
+class Counter(_Metric):
+    """ Монотонно растущий счетчик """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _new_child(self):
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def _render_child(self, name, labelnames, values) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """ Значение, которое может расти и уменьшаться """
+
+    type_name = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            callback: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._callback = callback
+
+    def _new_child(self):
+        return Gauge(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        """ Вычислять значение в момент выгрузки метрик """
+        self._callback = callback
+
+    def _render_child(self, name, labelnames, values) -> List[str]:
+        value = self._callback() if self._callback is not None else self.value
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """ Гистограмма распределения значений по корзинам """
+
+    type_name = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self):
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def _render_child(self, name, labelnames, values) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """ Реестр метрик приложения """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """ Выгрузка в текстовом формате Prometheus (version 0.0.4) """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ──── HTTP ────
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    ("method", "route"),
+)
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "Количество HTTP-запросов по статусу ответа",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "Количество HTTP-запросов в обработке",
+    ("method",),
+)
+
+compression_cache_total = registry.counter(
+    "http_compression_cache_total",
+    "Обращения к кэшу сжатых ответов: hit — тело взято из кэша, miss — сжато заново",
+    ("result",),
+)
+compression_ratio = registry.histogram(
+    "http_compression_ratio",
+    "Отношение размера сжатого тела ответа к исходному",
+    ("encoding",),
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.7, 0.9, 1.0),
+)
+
+admission_rejected_total = registry.counter(
+    "http_admission_rejected_total",
+    "Запросы, отклоненные контролем допуска (503), по классу и причине",
+    ("route_class", "reason"),
+)
+admission_queue_wait = registry.histogram(
+    "http_admission_queue_wait_seconds",
+    "Ожидание места в очереди контроля допуска",
+    ("route_class",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
+)
+
+# ──── СЕРВИСНЫЙ СЛОЙ ────
+service_call_duration = registry.histogram(
+    "service_call_duration_seconds",
+    "Длительность вызова метода сервисного слоя",
+    ("service", "method"),
+)
+
+# ──── СЕРИАЛИЗАЦИЯ ────
+response_serialize_duration = registry.histogram(
+    "api_response_serialize_seconds",
+    "Время подготовки и кодирования ответа ApiResponse",
+    ("kind",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+# ──── БАЗА ДАННЫХ ────
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Длительность выполнения SQL-запроса",
+    ("operation",),
+)
+db_query_errors_total = registry.counter(
+    "db_query_errors_total",
+    "Количество SQL-запросов, завершившихся ошибкой",
+    ("operation",),
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Время ожидания соединения из пула",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_connections_in_use = registry.gauge(
+    "db_pool_connections_in_use",
+    "Количество соединений, выданных из пула",
+)
+db_pool_size = registry.gauge(
+    "db_pool_size",
+    "Размер пула соединений",
+)
+db_write_batch_size = registry.histogram(
+    "db_write_batch_size",
+    "Количество операций в одной транзакции групповой фиксации",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
@@ -0,0 +1,17 @@
+"""
+    Pytest-плагин с фикстурой бюджета SQL-запросов.
+    Подключение: pytest -p app.utils.pytest_plugin или pytest_plugins = ["app.utils.pytest_plugin"]
+
+    async def test_list_trucks(client, query_budget):
+        with query_budget(3):
+            await client.get("/api/v1/trucks/")
+"""
+import pytest
+
+from app.db.query_stats import assert_query_budget
+
+
+@pytest.fixture
+def query_budget():
+    """ Контекстный менеджер, проверяющий количество SQL-запросов внутри блока """
+    return assert_query_budget
@@ -0,0 +1,239 @@
+"""
+    Легковесная внутрипроцессная трассировка с распространением W3C traceparent.
+    Если текущий запрос не попал в выборку, start_span возвращает общий пустой
+    объект — стоимость вызова сводится к чтению contextvar.
+"""
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Коды SpanKind и StatusCode из спецификации OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """ Участок трассировки """
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "status", "_token",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_OK
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        exporter.export(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.attributes["exception.type"] = exc_type.__name__
+        self.end()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.status == STATUS_ERROR else "ok",
+        }
+
+
+class _NoopSpan:
+    """ Пустой участок для запросов вне выборки """
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL):
+    """ Дочерний участок текущей трассировки (пустой, если трассировка не ведется) """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind)
+
+
+def start_trace(name: str, traceparent: Optional[str] = None):
+    """
+        Корневой участок запроса.
+        Решение о выборке берется из входящего traceparent, если он есть,
+        иначе — случайно с вероятностью tracing.sample_ratio.
+    """
+    if not settings.tracing.enabled:
+        return NOOP_SPAN
+
+    match = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        if not int(flags, 16) & 1:
+            return NOOP_SPAN
+    else:
+        if random.random() >= settings.tracing.sample_ratio:
+            return NOOP_SPAN
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+
+    return Span(name, trace_id, parent_id, SPAN_KIND_SERVER)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    result = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+        "status": {"code": span.status},
+    }
+    if span.parent_id:
+        result["parentSpanId"] = span.parent_id
+    return result
+
+
+class TraceExporter:
+    """
+        Локальный экспорт завершенных участков:
+        кольцевой буфер в памяти (для отладочного эндпоинта) и, если задан путь,
+        файл в формате OTLP JSON (одна ExportTraceServiceRequest на строку).
+    """
+
+    def __init__(self, buffer_size: int, otlp_file: str, batch_size: int):
+        self.spans: Deque[Span] = deque(maxlen=buffer_size)
+        self.otlp_file = otlp_file
+        self.batch_size = batch_size
+        self._pending: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+        if self.otlp_file:
+            self._pending.append(span)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """ Дописать накопленные участки в OTLP-файл """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        request = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": settings.tracing.service_name}},
+                        {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                    ],
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "app.utils.tracing"},
+                    "spans": [_otlp_span(span) for span in pending],
+                }],
+            }],
+        }
+        with open(self.otlp_file, "a", encoding="utf-8") as file:
+            file.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+    def traces(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """ Последние трассировки из буфера: корневой участок, длительность, число участков """
+        grouped: Dict[str, List[Span]] = {}
+        for span in self.spans:
+            grouped.setdefault(span.trace_id, []).append(span)
+
+        result = []
+        for trace_id, spans in reversed(list(grouped.items())):
+            root = min(spans, key=lambda s: s.start_ns)
+            result.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "start_ns": root.start_ns,
+                "duration_ms": round((max(s.end_ns for s in spans) - root.start_ns) / 1e6, 3),
+                "spans": len(spans),
+            })
+            if len(result) >= limit:
+                break
+        return result
+
+    def trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """ Участки одной трассировки в порядке начала """
+        spans = sorted((s for s in self.spans if s.trace_id == trace_id), key=lambda s: s.start_ns)
+        return [span.to_dict() for span in spans]
+
+
+exporter = TraceExporter(
+    buffer_size=settings.tracing.buffer_size,
+    otlp_file=settings.tracing.otlp_file,
+    batch_size=settings.tracing.batch_size,
+)
@@ -0,0 +1,74 @@
+"""
+    Набор бенчмарков CRUD, сериализации и эндпоинтов.
+
+    python -m benchmarks                                 # все замеры
+    python -m benchmarks --suite micro                   # только микробенчмарки
+    python -m benchmarks --sizes 1k,100k                 # размеры парка для эндпоинтов
+    python -m benchmarks --save-baseline baseline.json   # сохранить базовый прогон
+    python -m benchmarks --baseline baseline.json        # сравнить; код 1 при регрессии
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+# Временная БД должна быть задана до импорта приложения: движок создается при импорте
+_tmp_dir = tempfile.mkdtemp(prefix="bench_")
+os.environ.setdefault("db__url", f"sqlite+aiosqlite:///{_tmp_dir}/bench.sqlite3")
+
+from benchmarks.harness import compare_with_baseline, print_report, save_results  # noqa: E402
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def _parse_size(value: str) -> int:
+    value = value.strip().lower()
+    if value[-1] in _SUFFIXES:
+        return int(float(value[:-1]) * _SUFFIXES[value[-1]])
+    return int(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=("micro", "endpoints", "all"), default="all")
+    parser.add_argument("--sizes", default="1k,100k,1m", help="Размеры парка через запятую")
+    parser.add_argument("--iterations", type=int, default=200, help="Итераций на микробенчмарк")
+    parser.add_argument("--endpoint-iterations", type=int, default=50, help="Итераций на эндпоинт")
+    parser.add_argument("--baseline", help="Файл базового прогона для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить результаты как базовый прогон")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост p50/p99 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = []
+    if args.suite in ("micro", "all"):
+        from benchmarks import micro
+        results += micro.run(args.iterations)
+    if args.suite in ("endpoints", "all"):
+        from benchmarks import endpoints
+        sizes = sorted(_parse_size(size) for size in args.sizes.split(","))
+        results += asyncio.run(endpoints.run(sizes, args.endpoint_iterations))
+
+    print_report(results)
+
+    if args.save_baseline:
+        save_results(results, args.save_baseline)
+        print(f"Базовый прогон сохранен: {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\nРегрессии больше {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nРегрессий нет")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+    Распределение грузов по самосвалам (POST /dispatch/optimize).
+
+    1. Алгоритм: --trucks самосвалов со случайной загрузкой и --loads грузов; «лучший подходящий
+       по убыванию» (app.core.dispatch) против ручного порядка — первый самосвал по ID,
+       куда груз помещается: время расчета, назначенный вес, задействованные самосвалы и их недогруз.
+    2. Эндпоинт: тот же объем на временной БД SQLite, данные из памяти и запросом к БД.
+
+    python -m benchmarks.dispatch --trucks 5000 --loads 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+# Временная БД должна быть задана до импорта приложения: движок создается при импорте
+_tmp_dir = tempfile.mkdtemp(prefix="bench_dispatch_")
+os.environ.setdefault("db__url", f"sqlite+aiosqlite:///{_tmp_dir}/bench.sqlite3")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from benchmarks.harness import measure  # noqa: E402
+
+
+def _first_fit(free: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """ Ручной порядок: грузы как пришли, каждый — в первый по списку самосвал, где есть место """
+    space = free.copy()
+    bins = np.full(len(weights), -1, dtype=np.int64)
+    for load, weight in enumerate(weights.tolist()):
+        truck = int(np.argmax(space >= weight))
+        if space[truck] >= weight:
+            space[truck] -= weight
+            bins[load] = truck
+    return bins
+
+
+def _quality(free: np.ndarray, weights: np.ndarray, bins: np.ndarray) -> str:
+    assigned = bins >= 0
+    used = np.unique(bins[assigned])
+    unused = int(free[used].sum() - weights[assigned].sum())
+    return f"{int(weights[assigned].sum()):>12}{len(used):>12}{unused:>14}"
+
+
+def _algorithm(trucks: int, loads: int) -> None:
+    from app.core.dispatch import best_fit_decreasing
+
+    rng = np.random.default_rng(1)
+    capacity = rng.choice((45, 90, 110, 120, 220), trucks)
+    free = capacity - (capacity * rng.uniform(0, 0.9, trucks)).astype(np.int64)
+    weights = rng.integers(5, 41, loads)
+
+    print(f"Самосвалов {trucks}, свободно {int(free.sum())} т; грузов {loads}, {int(weights.sum())} т")
+    print(f"{'порядок':<30}{'p50, мс':>10}{'назначено, т':>14}{'самосвалов':>12}{'недогруз, т':>14}")
+    for name, func, iterations in (
+        ("лучший подходящий по убыванию", lambda: best_fit_decreasing(free, weights, perf_counter() + 60)["bins"], 20),
+        ("первый подходящий по ID", lambda: _first_fit(free, weights), 3),
+    ):
+        result = measure(name, func, iterations, warmup=1)
+        print(f"{name:<30}{result.percentile(50) * 1000:>10.1f}{_quality(free, weights, func())}")
+
+
+async def _endpoint(args: argparse.Namespace) -> None:
+    from app.core.fleet_state import fleet_state
+    from main import app
+
+    rng = random.Random(1)
+    body = {"loads": [{"id": f"L{i}", "weight": rng.randint(5, 40)} for i in range(args.loads)]}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            print(f"{'источник':<10}{'запрос, мс':>12}{'расчет, мс':>12}{'назначено':>12}{'самосвалов':>12}")
+            for source in ("memory", "sql"):
+                fleet_state.ready = source == "memory"
+                elapsed = []
+                for _ in range(args.repeat):
+                    start = perf_counter()
+                    response = await client.post("/api/v1/dispatch/optimize", json=body)
+                    elapsed.append(perf_counter() - start)
+                summary = response.json()["data"]["summary"]
+                print(
+                    f"{source:<10}{min(elapsed) * 1000:>12.0f}{summary['seconds'] * 1000:>12.1f}"
+                    f"{summary['assigned']:>12}{summary['trucks_used']:>12}"
+                )
+            await fleet_state.load()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trucks", type=int, default=5000, help="Размер парка")
+    parser.add_argument("--loads", type=int, default=20_000, help="Грузов в запросе")
+    parser.add_argument("--repeat", type=int, default=5, help="Запросов к эндпоинту на источник")
+    args = parser.parse_args()
+
+    os.environ.setdefault("seed__trucks", str(args.trucks))
+    _algorithm(args.trucks, args.loads)
+    asyncio.run(_endpoint(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
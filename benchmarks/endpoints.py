@@ -0,0 +1,83 @@
+"""
+    Бенчмарки эндпоинтов через ASGI-клиент внутри процесса на временной БД SQLite.
+    Для каждого размера парка (1k/100k/1M) БД дозаполняется до нужного числа самосвалов.
+"""
+import random
+from typing import List
+
+import httpx
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.core.seeding import seed_fleet
+from app.db.models import DumpTruck
+from app.db.session import engine
+from benchmarks.harness import BenchResult, measure_async
+
+
+async def _seed_trucks(target: int, seed: int) -> None:
+    """ Дозаполнить таблицу самосвалов до target записей генератором парка """
+    async with engine.connect() as conn:
+        count = await conn.scalar(select(func.count(DumpTruck.id)))
+    if count < target:
+        await seed_fleet(engine, models=settings.seed.models, trucks=target - count, seed=seed)
+
+
+async def run(sizes: List[int], iterations: int) -> List[BenchResult]:
+    # Импорт приложения здесь: настройки БД должны быть заданы до него (см. __main__)
+    from main import app
+
+    rng = random.Random(42)
+    results = []
+    created = 0
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in sizes:
+                await _seed_trucks(size, seed=size)
+                label = f"{size:,}".replace(",", "_")
+
+                async def get(url: str):
+                    response = await client.get(url)
+                    assert response.status_code == 200, response.text
+
+                async def detail():
+                    await get(f"/api/v1/trucks/{rng.randint(1, size)}")
+
+                async def create():
+                    nonlocal created
+                    created += 1
+                    response = await client.post(
+                        "/api/v1/trucks/",
+                        json={"model_id": 1, "board_number": f"N{created:07d}", "current_weight": 90},
+                    )
+                    assert response.status_code == 201, response.text
+
+                truck = (await client.get("/api/v1/trucks/1")).json()["data"]
+
+                async def update():
+                    response = await client.put(
+                        "/api/v1/trucks/1",
+                        json={
+                            "model_id": truck["model_id"],
+                            "board_number": truck["board_number"],
+                            "current_weight": rng.randint(60, 130),
+                        },
+                    )
+                    assert response.status_code == 200, response.text
+
+                middle_page = max(size // 50 // 2, 1)
+                cases = {
+                    "список, стр. 1": lambda: get("/api/v1/trucks/?page=1"),
+                    "список, средняя стр.": lambda: get(f"/api/v1/trucks/?page={middle_page}"),
+                    "фильтр по номеру": lambda: get("/api/v1/trucks/?board_number=00012"),
+                    "фильтр по модели": lambda: get("/api/v1/trucks/?model_name=Komatsu"),
+                    "самосвал по ID": detail,
+                    "создание": create,
+                    "обновление": update,
+                }
+                for name, case in cases.items():
+                    results.append(await measure_async(f"endpoint[{label}]: {name}", case, iterations))
+
+    return results
@@ -0,0 +1,85 @@
+"""
+    JSON против MessagePack (Accept: application/msgpack): размер ответа и время кодирования
+    ApiResponse.success, размер и время декодирования на клиенте, разбор тела запроса.
+
+    python -m benchmarks.formats --iterations 200
+"""
+import argparse
+import json
+import sys
+from typing import Any, Callable
+
+from app.api.negotiation import msgpack, packb, response_format, unpackb
+from app.api.response_api import ApiResponse
+from benchmarks.harness import measure
+from benchmarks.micro import _make_trucks
+
+
+def _fleet_rows(count: int):
+    """ Строки состояния парка (GET /fleet/trucks) — словари без ORM """
+    return [
+        {
+            "id": i + 1, "board_number": f"B{i:06d}", "model_id": i % 24 + 1, "current_weight": 80 + i % 50,
+            "max_capacity": 120, "load_percentage": round((80 + i % 50) / 1.2, 2), "is_overloaded": i % 50 > 40,
+        }
+        for i in range(count)
+    ]
+
+
+def _encode(fmt: str, data: Any) -> Callable[[], bytes]:
+    def encode() -> bytes:
+        token = response_format.set(fmt)
+        try:
+            return ApiResponse.success(data=data, total=len(data), page=1, per_page=len(data)).body
+        finally:
+            response_format.reset(token)
+    return encode
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="Итераций на замер")
+    args = parser.parse_args()
+    if msgpack is None:
+        print("Пакет msgpack не установлен")
+        return 1
+
+    cases = [
+        ("самосвал (ORM)", _make_trucks(1)),
+        ("50 самосвалов (ORM)", _make_trucks(50)),
+        ("1000 самосвалов (ORM)", _make_trucks(1000)),
+        ("1000 строк парка", _fleet_rows(1000)),
+    ]
+    print("Ответ: кодирование ApiResponse.success на сервере и декодирование на клиенте")
+    print(f"{'данные':<24}{'формат':<10}{'байт':>10}{'кодирование, мкс':>18}{'декодирование, мкс':>20}")
+    for name, data in cases:
+        for fmt, decode in (("json", json.loads), ("msgpack", unpackb)):
+            encode = _encode(fmt, data)
+            body = encode()
+            encoded = measure(f"{name} {fmt}", encode, args.iterations)
+            decoded = measure(f"{name} {fmt}", lambda: decode(body), args.iterations)
+            print(
+                f"{name:<24}{fmt:<10}{len(body):>10}"
+                f"{encoded.percentile(50) * 1e6:>18.1f}{decoded.percentile(50) * 1e6:>20.1f}"
+            )
+
+    print("\nТело запроса: разбор на сервере")
+    bodies = [
+        ("показание веса", {"model_id": 1, "board_number": "K103", "current_weight": 120}),
+        ("синхронизация, 1000", {"trucks": [
+            {"model_id": i % 24 + 1, "board_number": f"B{i:06d}", "current_weight": i % 200} for i in range(1000)
+        ], "delete_missing": False}),
+    ]
+    print(f"{'тело':<24}{'формат':<10}{'байт':>10}{'разбор, мкс':>18}")
+    for name, payload in bodies:
+        for fmt, body, decode in (
+            ("json", json.dumps(payload, ensure_ascii=False).encode(), json.loads),
+            ("msgpack", packb(payload), unpackb),
+        ):
+            result = measure(f"{name} {fmt}", lambda: decode(body), args.iterations)
+            print(f"{name:<24}{fmt:<10}{len(body):>10}{result.percentile(50) * 1e6:>18.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
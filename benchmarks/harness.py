@@ -0,0 +1,129 @@
+"""
+    Общие средства замеров: перцентили задержек, выделения памяти и сравнение
+    с сохраненным базовым прогоном.
+"""
+import json
+import math
+import statistics
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class BenchResult:
+    """ Результат одного замера """
+
+    def __init__(self, name: str, samples: List[float], alloc_bytes: float):
+        self.name = name
+        self.samples = sorted(samples)
+        self.alloc_bytes = alloc_bytes
+
+    def percentile(self, q: float) -> float:
+        """ Перцентиль q (0..100) в секундах, методом ближайшего ранга """
+        rank = math.ceil(q / 100 * len(self.samples))
+        return self.samples[min(max(rank, 1), len(self.samples)) - 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": len(self.samples),
+            "p50_us": round(self.percentile(50) * 1e6, 2),
+            "p99_us": round(self.percentile(99) * 1e6, 2),
+            "mean_us": round(statistics.fmean(self.samples) * 1e6, 2),
+            "alloc_kib": round(self.alloc_bytes / 1024, 2),
+        }
+
+
+def measure(name: str, func: Callable[[], Any], iterations: int, warmup: int = 10) -> BenchResult:
+    """ Замер синхронной функции """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        samples.append(perf_counter() - start)
+
+    return BenchResult(name, samples, _allocations(func))
+
+
+async def measure_async(
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        iterations: int,
+        warmup: int = 5,
+) -> BenchResult:
+    """ Замер асинхронной функции """
+    for _ in range(warmup):
+        await func()
+
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter()
+        await func()
+        samples.append(perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(3):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            await func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(name, samples, statistics.median(peaks))
+
+
+def _allocations(func: Callable[[], Any], repeat: int = 3) -> float:
+    """ Пиковый прирост памяти за один вызов (медиана из нескольких) """
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return statistics.median(peaks)
+
+
+def print_report(results: List[BenchResult]) -> None:
+    print(f"{'замер':<48}{'p50, мкс':>12}{'p99, мкс':>12}{'память, КиБ':>14}")
+    for result in results:
+        data = result.to_dict()
+        print(f"{result.name:<48}{data['p50_us']:>12.1f}{data['p99_us']:>12.1f}{data['alloc_kib']:>14.1f}")
+
+
+def save_results(results: List[BenchResult], path: str) -> None:
+    data = {result.name: result.to_dict() for result in results}
+    Path(path).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def compare_with_baseline(results: List[BenchResult], path: str, tolerance: float) -> List[str]:
+    """
+        Сравнение с базовым прогоном.
+        Регрессия — рост p50 или p99 больше чем на tolerance (доля, 0.2 = 20%).
+        :return список описаний регрессий
+    """
+    baseline: Dict[str, Dict[str, Any]] = json.loads(Path(path).read_text(encoding="utf-8"))
+    regressions = []
+
+    for result in results:
+        base: Optional[Dict[str, Any]] = baseline.get(result.name)
+        if not base:
+            continue
+        current = result.to_dict()
+        for metric in ("p50_us", "p99_us"):
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                change = (current[metric] / base[metric] - 1) * 100
+                regressions.append(
+                    f"{result.name}: {metric} {base[metric]} -> {current[metric]} (+{change:.0f}%)"
+                )
+
+    return regressions
@@ -0,0 +1,156 @@
+"""
+    Самые перегруженные самосвалы при высокой частоте обновлений веса.
+
+    1. Структура: парк --trucks самосвалов в состоянии парка в памяти; применение
+       обновлений веса с поддержкой кучи перегруженных (обновлений в секунду) и выборка
+       top-N из кучи против частичной (argpartition) и полной сортировки всего парка.
+    2. Эндпоинт: на временной БД SQLite --writers клиентов обновляют вес (PUT /trucks/{id}),
+       --readers клиентов запрашивают GET /trucks/top-overloaded; задержки чтения и записи
+       из памяти и запросом к БД.
+
+    python -m benchmarks.leaderboard --trucks 200000 --top 20 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+# Временная БД должна быть задана до импорта приложения: движок создается при импорте
+_tmp_dir = tempfile.mkdtemp(prefix="bench_leaderboard_")
+os.environ.setdefault("db__url", f"sqlite+aiosqlite:///{_tmp_dir}/bench.sqlite3")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from benchmarks.harness import BenchResult, measure  # noqa: E402
+
+
+def _structure(trucks: int, top: int, updates: int) -> None:
+    from app.core.fleet_state import FleetState, load_percentages
+
+    rng = random.Random(1)
+    capacities = {model_id: rng.choice((45, 90, 110, 120, 220)) for model_id in range(1, 25)}
+    state = FleetState()
+    state.apply(
+        {"entity": "model", "op": "create", "entity_id": model_id,
+         "data": {"id": model_id, "name": f"M{model_id}", "max_capacity": capacity}}
+        for model_id, capacity in capacities.items()
+    )
+    fleet = [(truck_id, rng.randint(1, 24)) for truck_id in range(1, trucks + 1)]
+
+    def change(truck_id: int, model_id: int) -> dict:
+        weight = int(capacities[model_id] * rng.uniform(0.5, 1.15))
+        return {"entity": "truck", "op": "update", "entity_id": truck_id, "data": {
+            "id": truck_id, "board_number": f"L{truck_id:07d}", "model_id": model_id, "current_weight": weight,
+        }}
+
+    state.apply(change(truck_id, model_id) for truck_id, model_id in fleet)
+    batch = [change(*rng.choice(fleet)) for _ in range(updates)]
+    start = perf_counter()
+    state.apply(batch)
+    elapsed = perf_counter() - start
+
+    size = state._size
+    ids = state._ids[:size]
+
+    def partition() -> np.ndarray:
+        ratios = state._weights[:size] / state._capacity_of(state._model_ids[:size])
+        first = np.argpartition(-ratios, top)[:top]
+        return ids[first[np.lexsort((ids[first], -ratios[first]))]]
+
+    def full_sort() -> np.ndarray:
+        loads = load_percentages(state._weights[:size], state._capacity_of(state._model_ids[:size]))
+        return ids[np.lexsort((ids, -loads))][:top]
+
+    iterations = 200
+    results = [
+        measure(f"куча, top-{top}", lambda: state.top_overloaded(top), iterations),
+        measure(f"argpartition по парку, top-{top}", partition, iterations // 4),
+        measure(f"полная сортировка парка, top-{top}", full_sort, iterations // 10),
+    ]
+
+    print(f"Парк {size} самосвалов, перегружено {len(state._overloaded)}")
+    print(f"Обновления веса с поддержкой кучи: {updates / elapsed:,.0f} в секунду")
+    print(f"{'выборка':<40}{'p50, мкс':>12}{'p99, мкс':>12}")
+    for result in results:
+        print(f"{result.name:<40}{result.percentile(50) * 1e6:>12.1f}{result.percentile(99) * 1e6:>12.1f}")
+
+
+async def _endpoint(args: argparse.Namespace) -> None:
+    from sqlalchemy import select
+
+    from app.core.fleet_state import fleet_state
+    from app.db.models import DumpTruck, ModelTruck
+    from app.db.session import AsyncSessionLocal
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        async with AsyncSessionLocal() as db:
+            fleet = (await db.execute(
+                select(DumpTruck.id, DumpTruck.board_number, DumpTruck.model_id, ModelTruck.max_capacity)
+                .join(ModelTruck, DumpTruck.model_id == ModelTruck.id)
+            )).all()
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            print(f"{'источник':<10}{'чтений/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'записей/с':>11}{'p99, мс':>10}")
+            for source in ("memory", "sql"):
+                reads, writes = [], []
+                deadline = perf_counter() + args.duration
+
+                async def writer(rng: random.Random) -> None:
+                    while perf_counter() < deadline:
+                        truck_id, board, model_id, capacity = rng.choice(fleet)
+                        start = perf_counter()
+                        response = await client.put(f"/api/v1/trucks/{truck_id}", json={
+                            "model_id": model_id, "board_number": board,
+                            "current_weight": min(int(capacity * rng.uniform(0.5, 1.2)), 500),
+                        })
+                        if response.status_code < 400:
+                            writes.append(perf_counter() - start)
+
+                async def reader() -> None:
+                    while perf_counter() < deadline:
+                        start = perf_counter()
+                        response = await client.get(f"/api/v1/trucks/top-overloaded?n={args.top}")
+                        if response.headers.get("X-Data-Source") == source:
+                            reads.append(perf_counter() - start)
+
+                # Ответ запросом к БД — как до загрузки состояния; обновления кучи при этом не применяются
+                fleet_state.ready = source == "memory"
+                await asyncio.gather(
+                    *(writer(random.Random(i)) for i in range(args.writers)),
+                    *(reader() for _ in range(args.readers)),
+                )
+                if source == "sql":
+                    await fleet_state.load()
+
+                read, write = BenchResult(source, reads, 0), BenchResult(source, writes, 0)
+                print(
+                    f"{source:<10}{len(reads) / args.duration:>10.0f}{read.percentile(50) * 1000:>10.1f}"
+                    f"{read.percentile(99) * 1000:>10.1f}{len(writes) / args.duration:>11.0f}"
+                    f"{write.percentile(99) * 1000:>10.1f}"
+                )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trucks", type=int, default=200_000, help="Размер парка")
+    parser.add_argument("--top", type=int, default=20, help="Сколько самосвалов в выборке")
+    parser.add_argument("--updates", type=int, default=200_000, help="Обновлений веса в замере структуры")
+    parser.add_argument("--writers", type=int, default=16, help="Клиентов, обновляющих вес")
+    parser.add_argument("--readers", type=int, default=4, help="Клиентов, читающих top-N")
+    parser.add_argument("--duration", type=float, default=10, help="Длительность замера эндпоинта для источника, с")
+    args = parser.parse_args()
+
+    os.environ.setdefault("seed__trucks", str(args.trucks))
+    _structure(args.trucks, args.top, args.updates)
+    asyncio.run(_endpoint(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
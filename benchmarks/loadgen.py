@@ -0,0 +1,293 @@
+"""
+    Генератор смешанной нагрузки на запущенный экземпляр сервиса.
+
+    Самосвалы присылают показания веса (PUT /trucks/{id}), диспетчерские консоли
+    просматривают список, фильтруют, открывают карточки и справочник моделей.
+    Поступление запросов — пуассоновский поток с заданной интенсивностью (открытая модель):
+    генератор не ждет ответа перед следующим запросом, а задержка считается от
+    запланированного момента отправки, поэтому перегрузка сервера не маскируется.
+
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --trucks 2000 --dispatchers 200
+    python -m benchmarks.loadgen --ramp --slo-p99-ms 300           # поиск точки насыщения
+"""
+import argparse
+import asyncio
+import random
+import sys
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.harness import BenchResult
+
+DISPATCHER_MIX = "list=0.35,filter_board=0.2,filter_model=0.15,detail=0.2,models=0.1"
+
+
+class OperationStats:
+    """ Задержки и ошибки одной операции """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.errors.values()) / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"operation": self.name, "requests": self.count, "error_rate": round(self.error_rate, 4)}
+        if self.latencies:
+            bench = BenchResult(self.name, self.latencies, 0)
+            for q in (50, 90, 99, 99.9):
+                result[f"p{q:g}_ms"] = round(bench.percentile(q) * 1000, 2)
+            result["max_ms"] = round(bench.samples[-1] * 1000, 2)
+        if self.errors:
+            result["errors"] = dict(self.errors)
+        return result
+
+
+class Fleet:
+    """ Снимок парка, с которым работают виртуальные клиенты """
+
+    def __init__(self, trucks: List[Dict[str, Any]], models: List[Dict[str, Any]]):
+        self.trucks = trucks
+        self.models = models
+        self.capacities = {model["id"]: model["max_capacity"] for model in models}
+
+
+async def load_fleet(client: httpx.AsyncClient, prefix: str, trucks: int) -> Fleet:
+    """ Загрузить до trucks самосвалов и все модели через API """
+    truck_rows: List[Dict[str, Any]] = []
+    page = 1
+    while len(truck_rows) < trucks:
+        response = await client.get(f"{prefix}/trucks/", params={"page": page, "per_page": 100})
+        response.raise_for_status()
+        data = response.json()["data"]
+        if not data:
+            break
+        truck_rows += data
+        page += 1
+
+    model_rows: List[Dict[str, Any]] = []
+    page = 1
+    while True:
+        response = await client.get(f"{prefix}/models/", params={"page": page, "per_page": 100})
+        response.raise_for_status()
+        data = response.json()["data"]
+        if not data:
+            break
+        model_rows += data
+        page += 1
+
+    if not truck_rows or not model_rows:
+        raise RuntimeError("В сервисе нет самосвалов или моделей: заполните БД (python -m app.core.seeding)")
+    return Fleet(truck_rows[:trucks], model_rows)
+
+
+def _parse_mix(value: str) -> List[Tuple[str, float]]:
+    mix = []
+    for item in value.split(","):
+        name, weight = item.split("=")
+        mix.append((name.strip(), float(weight)))
+    return mix
+
+
+class LoadGenerator:
+    """ Один уровень нагрузки: два пуассоновских потока (самосвалы и диспетчеры) заданной длительности """
+
+    def __init__(
+            self,
+            client: httpx.AsyncClient,
+            prefix: str,
+            fleet: Fleet,
+            dispatcher_mix: List[Tuple[str, float]],
+            rng: random.Random,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.fleet = fleet
+        self.rng = rng
+        self.mix_names = [name for name, _ in dispatcher_mix]
+        self.mix_weights = [weight for _, weight in dispatcher_mix]
+        self.stats: Dict[str, OperationStats] = {}
+        self._tasks: set = set()
+
+    def _request_args(self, operation: str) -> Tuple[str, str, Dict[str, Any]]:
+        rng = self.rng
+        truck = rng.choice(self.fleet.trucks)
+        if operation == "weight_update":
+            capacity = self.fleet.capacities.get(truck["model_id"], 100)
+            body = {
+                "model_id": truck["model_id"],
+                "board_number": truck["board_number"],
+                "current_weight": min(rng.randint(0, int(capacity * 1.15)), 500),
+            }
+            return "PUT", f"{self.prefix}/trucks/{truck['id']}", {"json": body}
+        if operation == "list":
+            return "GET", f"{self.prefix}/trucks/", {"params": {"page": rng.randint(1, 20)}}
+        if operation == "filter_board":
+            board = truck["board_number"]
+            start = rng.randrange(max(len(board) - 3, 1))
+            return "GET", f"{self.prefix}/trucks/", {"params": {"board_number": board[start:start + 4]}}
+        if operation == "filter_model":
+            model = rng.choice(self.fleet.models)
+            return "GET", f"{self.prefix}/trucks/", {"params": {"model_name": model["name"]}}
+        if operation == "detail":
+            return "GET", f"{self.prefix}/trucks/{truck['id']}", {}
+        if operation == "models":
+            return "GET", f"{self.prefix}/models/", {}
+        raise ValueError(f"Неизвестная операция: {operation}")
+
+    async def _send(self, operation: str, scheduled: float) -> None:
+        method, url, kwargs = self._request_args(operation)
+        stats = self.stats.setdefault(operation, OperationStats(operation))
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            stats.errors["timeout"] += 1
+            return
+        except httpx.HTTPError as e:
+            stats.errors[type(e).__name__] += 1
+            return
+
+        if response.status_code >= 400:
+            stats.errors[str(response.status_code)] += 1
+        else:
+            # От запланированного момента: учитывается и ожидание свободного соединения
+            stats.latencies.append(perf_counter() - scheduled)
+
+    async def _arrivals(self, rate: float, duration: float, pick_operation) -> None:
+        """ Пуассоновский поток интенсивности rate (запросов/с) """
+        if rate <= 0:
+            return
+        start = perf_counter()
+        next_at = start
+        while True:
+            next_at += self.rng.expovariate(rate)
+            if next_at - start >= duration:
+                break
+            delay = next_at - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._send(pick_operation(), next_at))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def run(self, truck_rate: float, dispatcher_rate: float, duration: float) -> Dict[str, OperationStats]:
+        self.stats = {}
+        await asyncio.gather(
+            self._arrivals(truck_rate, duration, lambda: "weight_update"),
+            self._arrivals(
+                dispatcher_rate, duration,
+                lambda: self.rng.choices(self.mix_names, weights=self.mix_weights)[0],
+            ),
+        )
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return self.stats
+
+
+def _total(stats: Dict[str, OperationStats]) -> OperationStats:
+    total = OperationStats("всего")
+    for item in stats.values():
+        total.latencies += item.latencies
+        total.errors.update(item.errors)
+    return total
+
+
+def print_level(label: str, stats: Dict[str, OperationStats], duration: float) -> None:
+    print(f"\n{label}")
+    print(f"{'операция':<16}{'запросов':>10}{'rps':>9}{'ошибки':>9}{'p50, мс':>10}{'p99, мс':>10}{'p99.9, мс':>11}")
+    for item in [*sorted(stats.values(), key=lambda s: s.name), _total(stats)]:
+        data = item.summary()
+        print(
+            f"{item.name:<16}{item.count:>10}{item.count / duration:>9.1f}{item.error_rate:>9.2%}"
+            f"{data.get('p50_ms', 0):>10.1f}{data.get('p99_ms', 0):>10.1f}{data.get('p99.9_ms', 0):>11.1f}"
+        )
+
+
+def within_slo(stats: Dict[str, OperationStats], slo_p99_ms: float, max_error_rate: float) -> Optional[str]:
+    """ None, если уровень нагрузки выдержан, иначе причина """
+    total = _total(stats).summary()
+    if total["error_rate"] > max_error_rate:
+        return f"доля ошибок {total['error_rate']:.2%} > {max_error_rate:.2%}"
+    if total.get("p99_ms", 0) > slo_p99_ms:
+        return f"p99 {total['p99_ms']} мс > {slo_p99_ms} мс"
+    return None
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    timeout = httpx.Timeout(args.timeout)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+        fleet = await load_fleet(client, args.prefix, args.trucks)
+        generator = LoadGenerator(client, args.prefix, fleet, _parse_mix(args.mix), rng)
+
+        # Интенсивность потоков: каждый самосвал и каждая консоль — в среднем раз в interval секунд
+        truck_rate = len(fleet.trucks) / args.truck_interval
+        dispatcher_rate = args.dispatchers / args.dispatcher_interval
+
+        if not args.ramp:
+            stats = await generator.run(truck_rate, dispatcher_rate, args.duration)
+            print_level(
+                f"Нагрузка: {truck_rate:.0f} + {dispatcher_rate:.0f} запросов/с, {args.duration:g} с", stats, args.duration,
+            )
+            return 0
+
+        factor, passed = 1.0, None
+        for step in range(args.ramp_steps):
+            offered = (truck_rate + dispatcher_rate) * factor
+            stats = await generator.run(truck_rate * factor, dispatcher_rate * factor, args.duration)
+            print_level(f"Шаг {step + 1}: x{factor:.2f}, {offered:.0f} запросов/с", stats, args.duration)
+
+            achieved = sum(len(item.latencies) for item in stats.values()) / args.duration
+            reason = within_slo(stats, args.slo_p99_ms, args.max_error_rate)
+            if reason is None and achieved < offered * 0.9:
+                reason = f"обработано {achieved:.0f} из {offered:.0f} запросов/с"
+            if reason:
+                print(f"\nНасыщение на x{factor:.2f} ({offered:.0f} запросов/с): {reason}")
+                break
+            passed = (factor, offered)
+            factor *= args.ramp_factor
+        else:
+            print("\nНасыщение не достигнуто: увеличьте --ramp-steps или --ramp-factor")
+
+        if passed:
+            print(f"Максимальная выдержанная нагрузка: x{passed[0]:.2f}, {passed[1]:.0f} запросов/с")
+        else:
+            print("Начальная нагрузка уже превышает SLO")
+        return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервиса")
+    parser.add_argument("--prefix", default="/api/v1", help="Префикс API")
+    parser.add_argument("--trucks", type=int, default=2000, help="Самосвалов, присылающих показания")
+    parser.add_argument("--truck-interval", type=float, default=10, help="Средний интервал показаний самосвала, с")
+    parser.add_argument("--dispatchers", type=int, default=200, help="Диспетчерских консолей")
+    parser.add_argument("--dispatcher-interval", type=float, default=2, help="Средний интервал действий консоли, с")
+    parser.add_argument("--mix", default=DISPATCHER_MIX, help="Доли операций диспетчера")
+    parser.add_argument("--duration", type=float, default=30, help="Длительность уровня нагрузки, с")
+    parser.add_argument("--connections", type=int, default=256, help="Максимум одновременных соединений")
+    parser.add_argument("--timeout", type=float, default=10, help="Таймаут запроса, с")
+    parser.add_argument("--ramp", action="store_true", help="Наращивать нагрузку до насыщения")
+    parser.add_argument("--ramp-factor", type=float, default=1.5, help="Множитель нагрузки на шаге")
+    parser.add_argument("--ramp-steps", type=int, default=10, help="Максимум шагов")
+    parser.add_argument("--slo-p99-ms", type=float, default=500, help="Допустимый p99 по всем операциям, мс")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Допустимая доля ошибок")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+    Микробенчмарки: построение запросов, подготовка данных ответа,
+    JSON-кодирование и валидация входной схемы.
+"""
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.response_api import ApiResponse
+from app.db.models import DumpTruck, ModelTruck
+from app.schemas import DumpTruckCreateSchema
+from benchmarks.harness import BenchResult, measure
+from benchmarks.statements import build_cached, build_legacy
+
+
+def _make_trucks(count: int) -> List[DumpTruck]:
+    """ Загруженные ORM-объекты самосвалов с моделями, без обращения к БД """
+    now = datetime.now()
+    models = [
+        ModelTruck(id=1, name="БЕЛАЗ", max_capacity=120, created_at=now, updated_at=None),
+        ModelTruck(id=2, name="Komatsu", max_capacity=110, created_at=now, updated_at=None),
+    ]
+    trucks = []
+    for i in range(count):
+        model = models[i % 2]
+        trucks.append(DumpTruck(
+            id=i + 1,
+            model_id=model.id,
+            model=model,
+            board_number=f"B{i:06d}",
+            current_weight=80 + i % 50,
+            created_at=now,
+            updated_at=None,
+        ))
+    return trucks
+
+
+def run(iterations: int) -> List[BenchResult]:
+    args = ("10", "bel", 0, 50)
+    trucks = _make_trucks(50)
+    prepared = ApiResponse._prepare_data(trucks)
+    payload = {"model_id": 1, "board_number": "k103", "current_weight": 120}
+
+    return [
+        measure("micro: построение запросов списка (прежнее)", lambda: build_legacy(*args), iterations),
+        measure("micro: построение запросов списка (кэш)", lambda: build_cached(*args), iterations),
+        measure("micro: _prepare_data, 50 самосвалов", lambda: ApiResponse._prepare_data(trucks), iterations),
+        measure(
+            "micro: jsonable_encoder + JSONResponse, 50",
+            lambda: JSONResponse(content=jsonable_encoder({"data": prepared})),
+            iterations,
+        ),
+        measure("micro: ApiResponse.success, 50 самосвалов", lambda: ApiResponse.success(data=trucks), iterations),
+        measure(
+            "micro: DumpTruckCreateSchema.model_validate",
+            lambda: DumpTruckCreateSchema.model_validate(payload),
+            iterations,
+        ),
+    ]
@@ -0,0 +1,108 @@
+"""
+    Время холодного запуска: импорт приложения и выполнение lifespan до готовности.
+
+    Каждый замер — отдельный процесс интерпретатора. Сначала первый запуск на новой БД
+    (миграции и тестовые данные), затем повторные запуски на готовой БД — именно так
+    стартуют новые экземпляры при автомасштабировании.
+
+    Базовая линия — импорт одних зависимостей (FastAPI, SQLAlchemy, NumPy) в таком же процессе:
+    отношение к ней почти не зависит от скорости машины, поэтому порог --max-ratio
+    годится и для CI, а --max-ms — для конкретного сервера.
+
+    python -m benchmarks.startup --runs 5 --max-ms 2500 --max-ratio 2    # код 1, если медиана выше порога
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict
+
+_PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def probe():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        print(json.dumps({"import_ms": (imported - start) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+
+asyncio.run(probe())
+"""
+
+_BASELINE_PROBE = """
+import json, time
+start = time.perf_counter()
+import fastapi, numpy, pydantic_settings, sqlalchemy.ext.asyncio
+print(json.dumps({"import_ms": (time.perf_counter() - start) * 1000}))
+"""
+
+# Пороги по умолчанию с запасом: запуск на готовой БД — около 1,2 с, в 1,4 раза дольше базовой линии
+MAX_MS = 2500
+MAX_RATIO = 2.0
+
+
+def _probe(env: dict, code: str = _PROBE) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    # Кроме замера в выводе сообщения lifespan
+    return next(json.loads(line) for line in output.splitlines() if line.startswith("{"))
+
+
+def measure(runs: int = 5) -> Dict[str, Any]:
+    """
+        Замер запуска на новой БД во временном каталоге и медианы runs повторных запусков
+        на готовой; ratio — отношение медианы к базовой линии (импорт зависимостей)
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = {**os.environ, "db__url": f"sqlite+aiosqlite:///{tmp_dir}/startup.sqlite3"}
+
+    first = _probe(env)
+    samples = [_probe(env) for _ in range(runs)]
+    baseline_ms = statistics.median(_probe(env, _BASELINE_PROBE)["import_ms"] for _ in range(runs))
+    total_ms = statistics.median(run["import_ms"] + run["lifespan_ms"] for run in samples)
+    return {
+        "first": first,
+        "import_ms": statistics.median(run["import_ms"] for run in samples),
+        "lifespan_ms": statistics.median(run["lifespan_ms"] for run in samples),
+        "total_ms": total_ms,
+        "baseline_ms": baseline_ms,
+        "ratio": total_ms / baseline_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Повторных запусков на готовой БД")
+    parser.add_argument("--max-ms", type=float, default=MAX_MS, help="Порог медианы времени до готовности, мс")
+    parser.add_argument("--max-ratio", type=float, default=MAX_RATIO, help="Порог отношения медианы к базовой линии")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    first = result["first"]
+
+    print(f"{'запуск':<22}{'импорт, мс':>12}{'lifespan, мс':>14}{'всего, мс':>12}")
+    print(f"{'новая БД':<22}{first['import_ms']:>12.0f}{first['lifespan_ms']:>14.1f}"
+          f"{first['import_ms'] + first['lifespan_ms']:>12.0f}")
+    print(f"{'готовая БД (медиана)':<22}{result['import_ms']:>12.0f}{result['lifespan_ms']:>14.1f}"
+          f"{result['total_ms']:>12.0f}")
+    print(f"{'базовая линия':<22}{result['baseline_ms']:>12.0f}{'':>14}{result['baseline_ms']:>12.0f}")
+    print(f"\nОтношение к базовой линии: {result['ratio']:.2f}")
+
+    failed = False
+    if result["total_ms"] > args.max_ms:
+        print(f"Запуск дольше порога: {result['total_ms']:.0f} мс > {args.max_ms:.0f} мс")
+        failed = True
+    if result["ratio"] > args.max_ratio:
+        print(f"Запуск дольше базовой линии больше чем в {args.max_ratio:g} раза: {result['ratio']:.2f}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
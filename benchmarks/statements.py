@@ -0,0 +1,76 @@
+"""
+    Накладные расходы на построение и компиляцию запросов списка самосвалов.
+    Сравнивается построение запросов заново на каждый запрос (как было раньше)
+    и заранее построенные запросы из app.core.crud.queries.
+
+    Запуск: python -m benchmarks.statements [--number 20000]
+"""
+import argparse
+import timeit
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import selectinload
+
+from app.core.crud.queries import truck_filter_params, trucks_page_stmt, trucks_count_stmt
+from app.db.models import DumpTruck, ModelTruck
+
+
+def build_legacy(board_number, model_name, skip, limit):
+    """ Построение запросов страницы и подсчета заново, как в прежнем get_trucks_list """
+    stmt = select(DumpTruck).options(selectinload(DumpTruck.model)).order_by(DumpTruck.id)
+    count_stmt = select(func.count(DumpTruck.id))
+    if board_number:
+        stmt = stmt.where(DumpTruck.board_number.ilike(f"%{board_number}%"))
+        count_stmt = count_stmt.where(DumpTruck.board_number.ilike(f"%{board_number}%"))
+    if model_name:
+        stmt = stmt.where(DumpTruck.model.has(ModelTruck.name.ilike(f"%{model_name}%")))
+        count_stmt = count_stmt.where(DumpTruck.model.has(ModelTruck.name.ilike(f"%{model_name}%")))
+    return stmt.offset(skip).limit(limit), count_stmt
+
+
+def build_cached(board_number, model_name, skip, limit):
+    """ Выбор заранее построенных запросов и параметров привязки """
+    filters, params = truck_filter_params(board_number, model_name)
+    return trucks_page_stmt(*filters), trucks_count_stmt(*filters), {**params, "skip": skip, "limit": limit}
+
+
+def run(number: int) -> None:
+    dialect = sqlite.dialect()
+    args = ("10", "bel", 0, 50)
+
+    def legacy_request():
+        # На каждый запрос SQLAlchemy вычисляет ключ кэша компиляции
+        page, count = build_legacy(*args)
+        page._generate_cache_key()
+        count._generate_cache_key()
+
+    def cached_request():
+        page, count, _ = build_cached(*args)
+        page._generate_cache_key()
+        count._generate_cache_key()
+
+    def legacy_compile():
+        page, count = build_legacy(*args)
+        page.compile(dialect=dialect)
+        count.compile(dialect=dialect)
+
+    cases = {
+        "построение (прежнее)": lambda: build_legacy(*args),
+        "построение (кэш)": lambda: build_cached(*args),
+        "построение + ключ кэша (прежнее)": legacy_request,
+        "построение + ключ кэша (кэш)": cached_request,
+        "компиляция без кэша": legacy_compile,
+    }
+
+    print(f"{'операция':<36}{'мкс/запрос':>12}")
+    for name, case in cases.items():
+        n = number if "компиляция" not in name else max(number // 10, 1)
+        seconds = min(timeit.repeat(case, number=n, repeat=3))
+        print(f"{name:<36}{seconds / n * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="Количество итераций")
+    run(parser.parse_args().number)
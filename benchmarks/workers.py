@@ -0,0 +1,124 @@
+"""
+    Масштабирование пропускной способности по числу воркеров.
+
+    Для каждого числа воркеров запускается app.core.server на временной БД SQLite
+    (парк создается один раз генератором), затем закрытый цикл из --concurrency
+    клиентов в течение --duration секунд выполняет чтения: карточки и страницы списка.
+
+    python -m benchmarks.workers --workers 1,2,4 --trucks 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import List
+
+import httpx
+
+from benchmarks.harness import BenchResult
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 60) -> None:
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        try:
+            if (await client.get("/api/v1/models/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Сервер не запустился")
+
+
+async def _closed_loop(client: httpx.AsyncClient, trucks: int, concurrency: int, duration: float) -> BenchResult:
+    samples: List[float] = []
+    errors = 0
+    deadline = perf_counter() + duration
+
+    async def worker(rng: random.Random) -> None:
+        nonlocal errors
+        while perf_counter() < deadline:
+            if rng.random() < 0.7:
+                url = f"/api/v1/trucks/{rng.randint(1, trucks)}"
+            else:
+                url = f"/api/v1/trucks/?page={rng.randint(1, 20)}"
+            start = perf_counter()
+            response = await client.get(url)
+            if response.status_code == 200:
+                samples.append(perf_counter() - start)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker(random.Random(i)) for i in range(concurrency)))
+    if errors:
+        print(f"  ошибок: {errors}")
+    return BenchResult("workers", samples, 0)
+
+
+async def measure_workers(workers: int, env: dict, args: argparse.Namespace) -> BenchResult:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.core.server", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            await _wait_ready(client)
+            await _closed_loop(client, args.trucks, args.concurrency, 1)  # прогрев
+            return await _closed_loop(client, args.trucks, args.concurrency, args.duration)
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run(args: argparse.Namespace) -> None:
+    tmp_dir = tempfile.mkdtemp(prefix="bench_workers_")
+    env = {
+        **os.environ,
+        "db__url": f"sqlite+aiosqlite:///{tmp_dir}/bench.sqlite3",
+        "seed__trucks": str(args.trucks),
+        "debug": "false",
+        "tracing__enabled": "false",
+    }
+
+    print(f"{'воркеров':<10}{'запросов/с':>12}{'ускорение':>11}{'p50, мс':>10}{'p99, мс':>10}")
+    base_rps = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        result = await measure_workers(workers, env, args)
+        rps = len(result.samples) / args.duration
+        base_rps = base_rps or rps
+        print(
+            f"{workers:<10}{rps:>12.0f}{rps / base_rps:>10.2f}x"
+            f"{result.percentile(50) * 1000:>10.1f}{result.percentile(99) * 1000:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Числа воркеров через запятую")
+    parser.add_argument("--trucks", type=int, default=100_000, help="Размер парка")
+    parser.add_argument("--concurrency", type=int, default=64, help="Одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=10, help="Длительность замера, с")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+    Пропускная способность изменяющих запросов с групповой фиксацией и без нее.
+
+    Внутри процесса, через ASGI-клиент, на временной БД SQLite: --concurrency клиентов
+    в течение --duration секунд обновляют вес случайных самосвалов (PUT /trucks/{id})
+    и добавляют новые (POST /trucks/).
+
+    python -m benchmarks.writes --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from time import perf_counter
+
+# Временная БД должна быть задана до импорта приложения: движок создается при импорте
+_tmp_dir = tempfile.mkdtemp(prefix="bench_writes_")
+os.environ.setdefault("db__url", f"sqlite+aiosqlite:///{_tmp_dir}/bench.sqlite3")
+os.environ.setdefault("seed__trucks", "10000")
+
+import httpx  # noqa: E402
+
+from benchmarks.harness import BenchResult  # noqa: E402
+
+
+async def _load(client: httpx.AsyncClient, trucks: int, concurrency: int, duration: float, tag: str):
+    samples = []
+    errors: Counter = Counter()
+    created = 0
+    deadline = perf_counter() + duration
+
+    async def worker(rng: random.Random) -> None:
+        nonlocal created
+        while perf_counter() < deadline:
+            start = perf_counter()
+            if rng.random() < 0.8:
+                truck_id = rng.randint(1, trucks)
+                response = await client.put(
+                    f"/api/v1/trucks/{truck_id}",
+                    json={"model_id": 1, "board_number": f"W{truck_id:07d}", "current_weight": rng.randint(0, 40)},
+                )
+            else:
+                created += 1
+                response = await client.post(
+                    "/api/v1/trucks/",
+                    json={"model_id": 1, "board_number": f"{tag}{created:07d}", "current_weight": 10},
+                )
+            if response.status_code < 400:
+                samples.append(perf_counter() - start)
+            else:
+                errors[response.status_code] += 1
+
+    await asyncio.gather(*(worker(random.Random(i)) for i in range(concurrency)))
+    return BenchResult(tag, samples, 0), errors
+
+
+async def run(args: argparse.Namespace) -> None:
+    from app.config import settings
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            print(f"{'режим':<20}{'записей/с':>11}{'p50, мс':>10}{'p99, мс':>10}{'ошибки':>10}")
+            for mode in ("off", "on"):
+                settings.db.group_commit = mode
+                result, errors = await _load(
+                    client, settings.seed.trucks, args.concurrency, args.duration, tag=f"G{mode[:2].upper()}",
+                )
+                rps = len(result.samples) / args.duration
+                print(
+                    f"{'group commit ' + mode:<20}{rps:>11.0f}{result.percentile(50) * 1000:>10.1f}"
+                    f"{result.percentile(99) * 1000:>10.1f}{sum(errors.values()):>10}"
+                )
+                if errors:
+                    print(f"  {dict(errors)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=10, help="Длительность замера для режима, с")
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
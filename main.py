@@ -4,38 +4,41 @@ from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from starlette.responses import JSONResponse
 
-from app.core.init_test_data import init_test_data
-from app.db.session import engine, Base, get_db, AsyncSessionLocal
+from app.core.fleet_state import fleet_state
+from app.core.jobs import job_runner
+from app.core.startup import prepare_database
+from app.db.session import engine
+from app.db.slow_queries import slow_query_log
+from app.db.writer import group_writer
 
 from app.db.models import DumpTruck, ModelTruck
-from app.api import trucks_router, truck_models_router
+from app.api import trucks_router, truck_models_router, import_router, jobs_router, changes_router, fleet_router, dispatch_router, admin_router, metrics_router
+from app.middleware import (
+    AdmissionMiddleware, CompressionMiddleware, MetricsMiddleware, QueryAccountingMiddleware, ProfilingMiddleware, TracingMiddleware
+)
 from app.config import settings
-
-import uvicorn
-
-
-async def initialize_test_data():
-    """ Инициализация тестовых данных """
-    try:
-        async with AsyncSessionLocal() as session:
-            await init_test_data(session)
-    except Exception as e:
-        print(f"Ошибка при инициализации тестовых данных: {e}")
+from app.utils.tracing import exporter as trace_exporter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
     print("Запуск приложения")
-    # Создаём таблицы, если их ещё нет
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    # Инициализация тестовых данных
-    await initialize_test_data()
+    # Схема и тестовые данные (в воркерах app.core.server уже подготовлены родителем)
+    if settings.run_startup_tasks:
+        await prepare_database()
+    # Состояние парка в памяти — в каждом процессе свое
+    await fleet_state.start()
 
     yield
+    # К этому моменту uvicorn уже дождался выполняющихся запросов
     print("Остановка приложения")
+    # Задачи этого процесса прерываются; их статусы записывает еще работающий писатель
+    await job_runner.aclose()
+    await fleet_state.aclose()
+    await group_writer.aclose()
+    await slow_query_log.aclose()
+    trace_exporter.flush()
     await engine.dispose()
 
 
@@ -69,9 +72,37 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 app.include_router(trucks_router, prefix=settings.api_prefix)
 app.include_router(truck_models_router, prefix=settings.api_prefix)
+app.include_router(import_router, prefix=settings.api_prefix)
+app.include_router(jobs_router, prefix=settings.api_prefix)
+app.include_router(changes_router, prefix=settings.api_prefix)
+app.include_router(fleet_router, prefix=settings.api_prefix)
+app.include_router(dispatch_router, prefix=settings.api_prefix)
+app.include_router(admin_router, prefix=settings.api_prefix)
+
+app.add_middleware(QueryAccountingMiddleware)
+
+# Снаружи учета запросов: сжатие и ETag видят ответ целиком, метрики и трассировка учитывают время сжатия
+if settings.compression.enabled:
+    app.add_middleware(CompressionMiddleware)
+
+# Отказ по перегрузке — до всей остальной обработки, но внутри метрик и трассировки
+if settings.admission.enabled:
+    app.add_middleware(AdmissionMiddleware)
+
+if settings.tracing.enabled:
+    app.add_middleware(TracingMiddleware)
+
+if settings.profiling.enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         app="main:app",
         host="0.0.0.0",
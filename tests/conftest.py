@@ -0,0 +1,56 @@
+"""
+    Фикстуры тестов: приложение на временной БД SQLite с небольшим синтетическим парком
+    и клиент httpx поверх ASGI (без сервера).
+
+    Настройки и движок БД создаются при импорте приложения, поэтому окружение
+    задается до импорта main.
+
+    pip install -r requirements.txt -r tests/requirements.txt
+    python -m pytest
+"""
+import itertools
+import os
+import tempfile
+
+import httpx
+import pytest
+
+_tmp_dir = tempfile.mkdtemp(prefix="dump_trucks_tests_")
+os.environ["db__url"] = f"sqlite+aiosqlite:///{_tmp_dir}/test.sqlite3"
+os.environ["seed__trucks"] = "200"
+# Результаты задач — во временный каталог, счетные части — в потоке, без пула процессов
+os.environ["jobs__results_dir"] = _tmp_dir
+os.environ["jobs__process_workers"] = "0"
+os.environ["profiling__dir"] = f"{_tmp_dir}/profiles"
+
+pytest_plugins = ["app.utils.pytest_plugin"]
+
+_board_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def app():
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    # Без сжатия: тела ответов читаются как есть
+    headers = {"Accept-Encoding": "identity"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+        yield client
+
+
+@pytest.fixture
+def board_number():
+    """ Новый бортовой номер, которого еще нет в БД """
+    return f"TST{next(_board_numbers):05d}"
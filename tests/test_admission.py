@@ -0,0 +1,129 @@
+"""
+    Контроль допуска (app.core.admission): классы запросов, приоритет очереди, сброс нагрузки.
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core import admission as admission_module
+from app.core.admission import AdmissionController, Rejected, classify
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def config(monkeypatch):
+    """ Малые пределы, чтобы очередь возникала на нескольких запросах """
+    for name, value in {
+        "max_concurrency": 1, "telemetry_concurrency": 1, "list_concurrency": 1, "bulk_concurrency": 1,
+        "queue_size": 8, "queue_timeout": 5.0, "pool_wait_ms": 100.0,
+    }.items():
+        monkeypatch.setattr(settings.admission, name, value)
+    monkeypatch.setattr(admission_module.checkout_wait, "current", lambda: 0.0)
+    return settings.admission
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/api/v1/trucks/", "telemetry"),
+    ("PUT", "/api/v1/trucks/12", "telemetry"),
+    ("GET", "/api/v1/trucks/12", "detail"),
+    ("GET", "/api/v1/trucks/suggest", "detail"),
+    ("GET", "/api/v1/trucks/", "list"),
+    ("DELETE", "/api/v1/trucks/12", "other"),
+    ("POST", "/api/v1/trucks/sync", "bulk"),
+    ("POST", "/api/v1/import/trucks", "bulk"),
+    ("GET", "/api/v1/jobs/abc/result", "bulk"),
+    ("GET", "/api/v1/admin/admission", None),
+    ("GET", "/docs", None),
+])
+async def test_classify(method, path, expected):
+    assert classify(method, path) == expected
+
+
+async def test_queue_serves_higher_priority_first(config):
+    controller = AdmissionController()
+    order = []
+    release = asyncio.Event()
+
+    async def request(route_class):
+        async with controller.admit(route_class):
+            order.append(route_class)
+            await release.wait()
+
+    holder = asyncio.create_task(request("bulk"))
+    await asyncio.sleep(0)
+    waiting = []
+    for route_class in ("list", "telemetry", "list", "telemetry"):
+        waiting.append(asyncio.create_task(request(route_class)))
+        await asyncio.sleep(0)
+    assert controller.queued == 4
+
+    release.set()
+    await asyncio.gather(holder, *waiting)
+
+    assert order == ["bulk", "telemetry", "telemetry", "list", "list"]
+    assert controller.status()["active"] == 0
+
+
+async def test_queue_full_rejects_lower_class_first(config):
+    controller = AdmissionController()
+    release = asyncio.Event()
+
+    async def request(route_class):
+        async with controller.admit(route_class):
+            await release.wait()
+
+    tasks = [asyncio.create_task(request("telemetry")) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    # Очередь занята на 2 из 8 — это доля bulk (0.25), но не telemetry
+    with pytest.raises(Rejected) as rejected:
+        await controller._acquire("bulk")
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_queue_timeout(config, monkeypatch):
+    monkeypatch.setattr(config, "queue_timeout", 0.05)
+    controller = AdmissionController()
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit("list"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(Rejected) as rejected:
+        await controller._acquire("list")
+    assert rejected.value.reason == "queue_timeout"
+    assert controller.queued == 0
+
+    release.set()
+    await holder
+
+
+async def test_pool_wait_sheds_bulk_before_telemetry(config, monkeypatch):
+    # Ожидание пула 150 мс: выше порога bulk (50 мс) и list (100 мс), ниже telemetry (800 мс)
+    monkeypatch.setattr(admission_module.checkout_wait, "current", lambda: 0.15)
+    controller = AdmissionController()
+
+    for route_class in ("bulk", "list"):
+        with pytest.raises(Rejected) as rejected:
+            await controller._acquire(route_class)
+        assert rejected.value.reason == "pool_wait"
+    async with controller.admit("telemetry"):
+        pass
+
+
+async def test_pool_wait_returns_503(client, config, monkeypatch):
+    monkeypatch.setattr(admission_module.checkout_wait, "current", lambda: 10.0)
+
+    response = await client.get("/api/v1/trucks/")
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
@@ -0,0 +1,72 @@
+"""
+    Поиск аномалий показаний веса (app.core.anomalies.detect) на синтетических рядах.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from app.core.anomalies import detect
+
+PARAMS = {
+    "window": 12, "z_threshold": 4.0, "min_std": 2.0, "max_rate_per_min": 100.0,
+    "flatline_samples": 8, "drift_samples": 10, "max_weight": 500,
+}
+
+# Обычный ряд: вес меняется без повторов и без долгих снижений
+NORMAL = [20 + (i * 7) % 15 for i in range(40)]
+
+
+def _detect(series: Dict[int, List[int]], step: float = 5.0) -> Dict[int, Dict[str, Tuple[int, float]]]:
+    """ Аномалии рядов {truck_id: веса} с показаниями через step минут: {truck_id: {флаг: (показаний, минута)}} """
+    truck_ids = np.concatenate([np.full(len(weights), truck_id) for truck_id, weights in series.items()])
+    minutes = np.concatenate([np.arange(len(weights)) * step for weights in series.values()])
+    weights = np.concatenate([np.array(weights) for weights in series.values()])
+    found: Dict[int, Dict[str, Tuple[int, float]]] = {}
+    for item in detect(truck_ids, minutes, weights, PARAMS):
+        found.setdefault(item["truck_id"], {})[item["flag"]] = (item["samples"], item["last_minute"])
+    return found
+
+
+def test_empty():
+    empty = np.zeros(0, dtype=np.int64)
+    assert detect(empty, empty.astype(float), empty, PARAMS) == []
+
+
+def test_normal_series_has_no_flags():
+    assert _detect({1: NORMAL, 2: NORMAL[::-1]}) == {}
+
+
+def test_out_of_range():
+    weights = NORMAL[:20] + [-1] + NORMAL[20:]
+    assert _detect({1: weights})[1]["out_of_range"] == (1, 100.0)
+
+
+def test_spike():
+    weights = NORMAL[:30] + [100] + NORMAL[30:]
+    assert _detect({1: weights}) == {1: {"spike": (1, 150.0)}}
+
+
+def test_jump_by_rate():
+    assert _detect({1: [10, 30]}, step=0.1) == {1: {"jump": (1, 0.1)}}
+    assert _detect({1: [10, 30]}, step=1.0) == {}
+
+
+@pytest.mark.parametrize("repeats, expected", [(7, {}), (8, {1: {"flatline": (1, 40.0)}})])
+def test_flatline(repeats, expected):
+    assert _detect({1: [10] + [30] * repeats}) == expected
+
+
+def test_flatline_ignores_zero_weight():
+    assert _detect({1: [0] * 20}) == {}
+
+
+@pytest.mark.parametrize("drops, expected", [(9, {}), (10, {1: {"negative_drift": (1, 50.0)}})])
+def test_negative_drift(drops, expected):
+    assert _detect({1: list(range(100, 100 - drops - 1, -1))}) == expected
+
+
+def test_series_boundaries():
+    # Переход между самосвалами — не скачок и не продолжение серии
+    assert _detect({1: [400] * 7, 2: [400, 10]}, step=0.1) == {2: {"jump": (1, 0.1)}}
+    assert _detect({1: [30] * 7, 2: [30] * 7}) == {}
@@ -0,0 +1,59 @@
+"""
+    Средства замеров (benchmarks.harness): перцентили, сохранение и сравнение с базовым прогоном.
+"""
+import pytest
+
+from benchmarks import startup
+from benchmarks.harness import BenchResult, compare_with_baseline, measure, measure_async, save_results
+
+
+def _result(name: str, micros) -> BenchResult:
+    return BenchResult(name, [value / 1e6 for value in micros], alloc_bytes=2048)
+
+
+def test_percentile_nearest_rank():
+    result = _result("r", range(100, 0, -1))
+
+    assert result.percentile(50) == pytest.approx(50e-6)
+    assert result.percentile(99) == pytest.approx(99e-6)
+    assert result.percentile(0) == pytest.approx(1e-6)
+    assert result.to_dict()["alloc_kib"] == 2.0
+
+
+def test_regression_beyond_tolerance(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_results([_result("stable", [10] * 100), _result("slower", [10] * 100)], str(path))
+
+    regressions = compare_with_baseline(
+        [_result("stable", [11] * 100), _result("slower", [13] * 100), _result("new", [99] * 100)],
+        str(path), tolerance=0.2,
+    )
+
+    assert len(regressions) == 2
+    assert all(line.startswith("slower: ") for line in regressions)
+    assert "+30%" in regressions[0]
+
+
+def test_measure_counts_iterations_and_allocations():
+    result = measure("alloc", lambda: bytearray(64 * 1024), iterations=20, warmup=1)
+
+    assert len(result.samples) == 20
+    assert result.alloc_bytes >= 64 * 1024
+
+
+@pytest.mark.anyio
+async def test_measure_async():
+    async def noop():
+        return None
+
+    result = await measure_async("noop", noop, iterations=10, warmup=1)
+
+    assert len(result.samples) == 10
+    assert result.samples == sorted(result.samples)
+
+
+def test_startup_within_baseline_ratio():
+    """ Запуск приложения на готовой БД не дольше порога относительно импорта одних зависимостей """
+    result = startup.measure(runs=2)
+
+    assert result["ratio"] <= startup.MAX_RATIO, result
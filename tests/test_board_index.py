@@ -0,0 +1,71 @@
+"""
+    Индекс бортовых номеров для подсказок (app.core.board_index) и GET /trucks/suggest.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.core.board_index import BoardIndex
+
+
+def _expected(boards, query, limit):
+    """ Подсказки перебором: префиксные, затем с подстрокой (от 3 символов) """
+    prefix = sorted((board, truck_id) for truck_id, board in boards.items() if board.startswith(query))
+    substring = sorted(
+        (board, truck_id) for truck_id, board in boards.items()
+        if len(query) >= 3 and query in board and not board.startswith(query)
+    )
+    return [{"id": truck_id, "board_number": board} for board, truck_id in (prefix[:limit] + substring)[:limit]]
+
+
+@pytest.fixture
+def fleet():
+    rng = random.Random(5)
+    return {
+        truck_id: f"{rng.choice(['BL', 'KM', 'CT'])}{rng.randint(0, 9999):04d}"
+        for truck_id in range(1, 3001)
+    }
+
+
+def _build(boards):
+    index = BoardIndex()
+    index.build(np.array(list(boards), dtype=np.int64), np.array(list(boards.values())))
+    return index
+
+
+@pytest.mark.parametrize("query", ["B", "bl0", "KM12", " ct99 ", "123", "0000", "XYZ"])
+def test_matches_brute_force(fleet, query):
+    index = _build(fleet)
+    assert index.suggest(query, 10) == _expected(fleet, query.strip().upper(), 10)
+
+
+def test_updates_in_delta(fleet):
+    index = _build(fleet)
+    boards = dict(fleet)
+
+    index.update(3001, None, "ZZ1234")
+    boards[3001] = "ZZ1234"
+    index.update(1, boards[1], "BL12345")
+    boards[1] = "BL12345"
+    index.update(2, boards.pop(2), None)
+    # Номер из добавочной части меняется повторно
+    index.update(3001, "ZZ1234", "ZZ1235")
+    boards[3001] = "ZZ1235"
+
+    for query in ("ZZ", "ZZ1234", "123", "BL1", fleet[2], fleet[2][2:]):
+        assert index.suggest(query, 20) == _expected(boards, query, 20)
+
+
+def test_empty_query():
+    assert _build({1: "BL0001"}).suggest("  ", 5) == []
+
+
+@pytest.mark.anyio
+async def test_suggest_sees_new_truck(client, board_number):
+    await client.post("/api/v1/trucks/", json={"model_id": 1, "board_number": board_number, "current_weight": 1})
+
+    response = await client.get("/api/v1/trucks/suggest", params={"q": board_number.lower()})
+
+    assert response.status_code == 200
+    assert [item["board_number"] for item in response.json()["data"]] == [board_number]
@@ -0,0 +1,95 @@
+"""
+    Журнал изменений для инкрементальной синхронизации (GET /changes, app.core.crud.changes).
+"""
+import pytest
+
+from app.config import settings
+from app.core.crud import changes
+from app.core.crud.changes import compact_superseded
+from app.core.crud.truck import create_truck
+from app.db.session import AsyncSessionLocal
+from app.db.writer import group_writer
+from app.schemas import DumpTruckCreateSchema
+
+pytestmark = pytest.mark.anyio
+
+CHANGES = "/api/v1/changes"
+TRUCKS = "/api/v1/trucks"
+
+
+async def _feed(client, **params) -> dict:
+    response = await client.get(CHANGES, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+async def _truck_changes(client, since: int, truck_id: int) -> list:
+    feed = await _feed(client, since=since, entity="truck")
+    return [change for change in feed["changes"] if change["entity_id"] == truck_id]
+
+
+async def test_create_update_delete(client, board_number):
+    since = (await _feed(client, limit=1))["last_seq"]
+
+    created = await client.post(f"{TRUCKS}/", json={"model_id": 1, "board_number": board_number, "current_weight": 5})
+    truck_id = created.json()["data"]["id"]
+    await client.put(f"{TRUCKS}/{truck_id}", json={"model_id": 2, "board_number": board_number, "current_weight": 9})
+    await client.delete(f"{TRUCKS}/{truck_id}")
+
+    entries = await _truck_changes(client, since, truck_id)
+    assert [entry["op"] for entry in entries] == ["create", "update", "delete"]
+    assert [entry["seq"] for entry in entries] == sorted(entry["seq"] for entry in entries)
+    assert (entries[1]["data"]["model_id"], entries[1]["data"]["current_weight"]) == (2, 9)
+    assert entries[2]["data"] == {"id": truck_id, "board_number": board_number}
+
+
+async def test_paging(client):
+    first = await _feed(client, since=0, limit=2)
+    assert len(first["changes"]) == 2
+    assert first["has_more"]
+
+    second = await _feed(client, since=first["next_since"], limit=2)
+    assert second["changes"][0]["seq"] > first["changes"][-1]["seq"]
+
+
+async def test_since_after_last_seq_is_gone(client):
+    last_seq = (await _feed(client, limit=1))["last_seq"]
+
+    response = await client.get(CHANGES, params={"since": last_seq + 1000})
+
+    assert response.status_code == 410
+
+
+async def _create_and_fail(db, board_number: str) -> None:
+    await create_truck(db, DumpTruckCreateSchema(model_id=1, board_number=board_number, current_weight=1))
+    raise RuntimeError("сбой операции")
+
+
+async def test_compaction_counts_only_committed(app, monkeypatch, board_number):
+    monkeypatch.setattr(settings.changes, "compact_every", 10 ** 9)
+    before = changes._changes_since_compaction
+
+    with pytest.raises(RuntimeError):
+        await group_writer.submit(_create_and_fail, board_number=board_number)
+    assert changes._changes_since_compaction == before
+
+    await group_writer.submit(
+        create_truck, payload=DumpTruckCreateSchema(model_id=1, board_number=board_number, current_weight=1),
+    )
+    assert changes._changes_since_compaction == before + 1
+
+
+async def test_compaction_keeps_latest_change(client, board_number):
+    since = (await _feed(client, limit=1))["last_seq"]
+    created = await client.post(f"{TRUCKS}/", json={"model_id": 1, "board_number": board_number, "current_weight": 5})
+    truck_id = created.json()["data"]["id"]
+    for weight in (6, 7):
+        await client.put(f"{TRUCKS}/{truck_id}", json={"model_id": 1, "board_number": board_number, "current_weight": weight})
+
+    async with AsyncSessionLocal() as db:
+        while await compact_superseded(db):
+            pass
+        await db.commit()
+
+    entries = await _truck_changes(client, since, truck_id)
+    assert [(entry["op"], entry["data"]["current_weight"]) for entry in entries] == [("update", 7)]
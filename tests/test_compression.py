@@ -0,0 +1,87 @@
+"""
+    Сжатие ответов и условные запросы по ETag (app.middleware.compression).
+"""
+import pytest
+
+from app.middleware.compression import CompressedCache, _opaque, _with_encoding, choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+TRUCKS = "/api/v1/trucks/"
+LARGE = {"per_page": 100}
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+    (None, None),
+])
+async def test_choose_encoding(accept, expected):
+    # Порядок доступных — предпочтение сервера
+    assert choose_encoding(accept, ["br", "gzip"]) == expected
+
+
+async def test_etag_with_encoding():
+    assert _with_encoding('"abc"', "gzip") == '"abc-gzip"'
+    assert _with_encoding('W/"abc"', "br") == 'W/"abc-br"'
+    assert _opaque('W/"abc-gzip"') == _opaque('"abc"') == "abc"
+
+
+async def test_cache_evicts_least_recent():
+    cache = CompressedCache(max_bytes=80)
+    cache.put(("a", "gzip"), b"x" * 10)
+    cache.put(("b", "gzip"), b"x" * 10)
+    # Тело больше восьмой части кэша не хранится
+    cache.put(("big", "gzip"), b"x" * 11)
+    assert cache.get(("big", "gzip")) is None
+
+    cache.get(("a", "gzip"))
+    for key in "cdefghi":
+        cache.put((key, "gzip"), b"x" * 10)
+    assert cache.get(("a", "gzip")) is not None
+    assert cache.get(("b", "gzip")) is None
+
+
+async def test_gzip_round_trip(client):
+    plain = await client.get(TRUCKS, params=LARGE)
+    compressed = await client.get(TRUCKS, params=LARGE, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in compressed.headers["vary"].lower()
+    assert compressed.headers["etag"] == _with_encoding(plain.headers["etag"], "gzip")
+    # httpx распаковывает тело сам
+    assert compressed.content == plain.content
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+
+
+async def test_small_response_not_compressed(client):
+    response = await client.get(TRUCKS, params={"per_page": 1}, headers={"Accept-Encoding": "gzip"})
+
+    assert len(response.content) < 1024
+    assert "content-encoding" not in response.headers
+
+
+async def test_if_none_match_returns_304(client):
+    first = await client.get(TRUCKS, params=LARGE, headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+
+    # ETag сжатого представления подходит и для несжатого запроса
+    for encoding in ("gzip", "identity"):
+        response = await client.get(
+            TRUCKS, params=LARGE, headers={"Accept-Encoding": encoding, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+async def test_stale_etag_returns_body(client):
+    response = await client.get(TRUCKS, params=LARGE, headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json()["data"]
+
@@ -0,0 +1,84 @@
+"""
+    Распределение грузов по самосвалам (app.core.dispatch и POST /dispatch/optimize).
+"""
+from time import perf_counter
+
+import numpy as np
+import pytest
+
+from app.core.dispatch import best_fit_decreasing, free_capacity, plan_dispatch
+
+
+def _trucks(capacity, weight):
+    count = len(capacity)
+    return {
+        "id": np.arange(1, count + 1, dtype=np.int64),
+        "board_number": np.array([f"B{i}" for i in range(count)], dtype=object),
+        "model_id": np.ones(count, dtype=np.int64),
+        "max_capacity": np.array(capacity, dtype=np.int64),
+        "current_weight": np.array(weight, dtype=np.int64),
+    }
+
+
+def test_free_capacity_reserve_and_overload():
+    free = free_capacity(_trucks([100, 100, 50], [10, 0, 60]), reserve_percentage=10)
+    assert free.tolist() == [80, 90, -15]
+
+
+def test_best_fit_picks_tightest_truck():
+    free = np.array([50, 30, 100], dtype=np.int64)
+    weights = np.array([30, 45, 10], dtype=np.int64)
+
+    result = best_fit_decreasing(free, weights, perf_counter() + 10)
+
+    # 45 -> самосвал с 50 (остается 5), 30 -> с 30, 10 -> в оставшийся со 100
+    assert result["bins"].tolist() == [1, 0, 2]
+    assert len(result["timed_out"]) == 0
+
+
+def test_best_fit_never_overloads():
+    rng = np.random.default_rng(7)
+    free = rng.integers(-20, 200, 300)
+    weights = rng.integers(1, 120, 1000)
+
+    bins = best_fit_decreasing(free, weights, perf_counter() + 10)["bins"]
+
+    assigned = bins >= 0
+    load = np.bincount(bins[assigned], weights=weights[assigned], minlength=len(free))
+    assert np.all(load <= np.maximum(free, 0))
+    # Неназначенный груз не поместился бы ни в один самосвал с оставшимся местом
+    left = np.maximum(free, 0) - load
+    assert all(weight > left.max() for weight in weights[~assigned])
+
+
+def test_best_fit_deadline_returns_remaining_loads():
+    weights = np.array([5, 3, 8], dtype=np.int64)
+
+    result = best_fit_decreasing(np.array([100]), weights, deadline=0)
+
+    assert result["bins"].tolist() == [-1, -1, -1]
+    assert sorted(result["timed_out"].tolist()) == [0, 1, 2]
+
+
+def test_plan_dispatch_summary():
+    plan = plan_dispatch(
+        _trucks([100, 40], [60, 0]), ["a", "b", "c"], np.array([40, 35, 50], dtype=np.int64),
+        reserve_percentage=0, time_limit=10,
+    )
+
+    assert {truck["board_number"]: truck["loads"] for truck in plan["trucks"]} == {"B0": ["a"], "B1": ["b"]}
+    assert plan["unassigned"] == [{"id": "c", "weight": 50, "reason": "no_capacity"}]
+    assert plan["summary"]["assigned_weight"] == 75
+    assert all(truck["weight_after"] <= truck["max_capacity"] for truck in plan["trucks"])
+
+
+@pytest.mark.anyio
+async def test_optimize_endpoint(client):
+    loads = [{"id": f"L{i}", "weight": 5 + i % 20} for i in range(50)]
+    response = await client.post("/api/v1/dispatch/optimize", json={"loads": loads, "reserve_percentage": 5})
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert data["summary"]["assigned"] + data["summary"]["unassigned"] == len(loads)
+    for truck in data["trucks"]:
+        assert truck["weight_after"] <= truck["max_capacity"]
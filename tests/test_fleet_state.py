@@ -0,0 +1,55 @@
+"""
+    Состояние парка в памяти (app.core.fleet_state): те же ответы, что у запросов к БД
+    (app.core.crud.fleet), и сверка с БД после изменений через API.
+"""
+import pytest
+
+from app.core.crud.fleet import fleet_summary, query_fleet
+from app.core.fleet_state import fleet_state
+from app.db.session import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"model_id": 3},
+    {"min_load": 50, "max_load": 90},
+    {"overloaded": True, "order": "load_desc"},
+    {"overloaded": False, "order": "load_asc", "skip": 10, "limit": 20},
+    {"board_number": "km", "order": "load_desc"},
+])
+async def test_query_matches_sql(app, filters):
+    assert fleet_state.ready
+    async with AsyncSessionLocal() as db:
+        expected = await query_fleet(db, **filters)
+
+    trucks, total = fleet_state.query(**filters)
+
+    assert total == expected[1]
+    # При равной загрузке порядок может отличаться — сравниваем загрузку по позициям и состав
+    key = "id" if filters.get("order", "id") == "id" else "load_percentage"
+    assert [truck[key] for truck in trucks] == [truck[key] for truck in expected[0]]
+    if key == "id":
+        assert trucks == expected[0]
+
+
+async def test_summary_matches_sql(app):
+    async with AsyncSessionLocal() as db:
+        expected = await fleet_summary(db)
+
+    assert fleet_state.summary() == expected
+
+
+async def test_consistent_after_changes(client, board_number):
+    created = await client.post("/api/v1/trucks/", json={"model_id": 1, "board_number": board_number, "current_weight": 500})
+    truck_id = created.json()["data"]["id"]
+    await client.put(f"/api/v1/trucks/{truck_id}", json={"model_id": 2, "board_number": board_number, "current_weight": 300})
+
+    response = await client.get("/api/v1/fleet/trucks", params={"board_number": board_number})
+    assert response.headers["x-data-source"] == "memory"
+    assert [(truck["model_id"], truck["current_weight"]) for truck in response.json()["data"]] == [(2, 300)]
+
+    await client.delete(f"/api/v1/trucks/{truck_id}")
+    report = await fleet_state.verify()
+    assert report["consistent"], report
@@ -0,0 +1,70 @@
+"""
+    Потоковый импорт (POST /import/{kind}): отчет по строкам, повторы ключей, вес без колонки.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+IMPORT = "/api/v1/import"
+
+
+async def _import(client, kind: str, body: str, fmt: str = "csv") -> dict:
+    response = await client.post(f"{IMPORT}/{kind}", params={"format": fmt}, content=body.encode())
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+async def _truck(client, board_number: str) -> dict:
+    response = await client.get("/api/v1/trucks/", params={"board_number": board_number})
+    trucks = [truck for truck in response.json()["data"] if truck["board_number"] == board_number]
+    assert len(trucks) == 1
+    return trucks[0]
+
+
+async def test_import_reports_line_errors(client):
+    body = "\n".join([
+        "board_number,model_id,current_weight",
+        "IMP001,1,10",
+        "IMP002,1,-5",
+        "IMP003,999999,10",
+        "IMP004,2,20",
+    ])
+    report = await _import(client, "trucks", body)
+
+    assert (report["rows"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert report["inserted"] == 2
+
+
+async def test_import_duplicate_key_keeps_first(client):
+    body = "\n".join([
+        "board_number,model_id,current_weight",
+        "IMP010,1,11",
+        "IMP011,1,12",
+        "IMP010,2,99",
+    ])
+    report = await _import(client, "trucks", body)
+
+    assert (report["imported"], report["failed"]) == (2, 1)
+    assert report["errors"][0]["line"] == 4
+    assert "строке 2" in report["errors"][0]["error"]
+    truck = await _truck(client, "IMP010")
+    assert (truck["model"]["id"], truck["current_weight"]) == (1, 11)
+
+
+async def test_import_without_weight_keeps_current(client):
+    await _import(client, "trucks", "board_number,model_id,current_weight\nIMP020,1,32")
+
+    report = await _import(client, "trucks", "board_number,model_id\nIMP020,2\nIMP021,2")
+
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    assert (await _truck(client, "IMP020"))["current_weight"] == 32
+    assert (await _truck(client, "IMP021"))["current_weight"] == 0
+
+
+async def test_import_ndjson_models(client):
+    body = '{"name": "ImpModel", "max_capacity": 70}\nnot json\n{"name": "ImpModel", "max_capacity": 80}\n'
+    report = await _import(client, "models", body, fmt="ndjson")
+
+    assert (report["rows"], report["imported"], report["failed"]) == (3, 1, 2)
+    assert [error["line"] for error in report["errors"]] == [2, 3]
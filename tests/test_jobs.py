@@ -0,0 +1,93 @@
+"""
+    Фоновые задачи (POST /jobs/, GET /jobs/{id}, GET /jobs/{id}/result).
+"""
+import asyncio
+import csv
+import io
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import DumpTruck
+from app.db.session import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+JOBS = "/api/v1/jobs"
+
+
+async def _wait(client, job_id: str, timeout: float = 10.0) -> dict:
+    """ Дождаться завершения задачи """
+    async with asyncio.timeout(timeout):
+        while True:
+            job = (await client.get(f"{JOBS}/{job_id}")).json()["data"]
+            if job["status"] not in ("queued", "running"):
+                return job
+            await asyncio.sleep(0.02)
+
+
+async def _submit(client, **body) -> dict:
+    response = await client.post(f"{JOBS}/", json=body)
+    assert response.status_code == 202, response.text
+    job = response.json()["data"]
+    assert response.headers["location"].endswith(f"/jobs/{job['id']}")
+    return job
+
+
+async def test_export_csv(client):
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(select(func.count()).select_from(DumpTruck))
+
+    job = await _wait(client, (await _submit(client, kind="export", entity="trucks", format="csv"))["id"])
+
+    assert job["status"] == "succeeded", job
+    assert (job["progress"], job["result"]["rows"]) == (1.0, total)
+    response = await client.get(f"{JOBS}/{job['id']}/result")
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == total
+    assert {"id", "board_number", "model_id", "current_weight"} <= set(rows[0])
+
+
+async def test_import_upload(client):
+    body = "board_number,model_id,current_weight\nJOB001,1,10\nJOB002,1,x\n"
+    response = await client.post(f"{JOBS}/import/trucks", params={"format": "csv"}, content=body.encode())
+    assert response.status_code == 202, response.text
+
+    job = await _wait(client, response.json()["data"]["id"])
+
+    assert job["status"] == "succeeded", job
+    assert (job["result"]["imported"], job["result"]["failed"]) == (1, 1)
+
+
+async def test_import_upload_needs_format(client):
+    response = await client.post(f"{JOBS}/import/trucks", content=b"board_number\n")
+
+    assert response.status_code == 415
+
+
+async def test_unknown_job(client):
+    assert (await client.get(f"{JOBS}/missing")).status_code == 404
+    assert (await client.get(f"{JOBS}/missing/result")).status_code == 404
+
+
+async def test_result_without_file(client):
+    job = await _wait(client, (await _submit(client, kind="compact_changes"))["id"])
+
+    assert job["status"] == "succeeded", job
+    assert (await client.get(f"{JOBS}/{job['id']}/result")).status_code == 409
+
+
+async def test_anomaly_scan_flags_repeated_readings(client, board_number):
+    """ Повторы одного веса через API (PUT и синхронизация) попадают в историю и дают flatline """
+    truck = {"model_id": 1, "board_number": board_number, "current_weight": 30}
+    truck_id = (await client.post("/api/v1/trucks/", json=truck)).json()["data"]["id"]
+    for _ in range(4):
+        assert (await client.put(f"/api/v1/trucks/{truck_id}", json=truck)).status_code == 200
+        assert (await client.put("/api/v1/trucks/sync", json={"trucks": [truck]})).status_code == 200
+
+    job = await _wait(client, (await _submit(client, kind="anomaly_scan"))["id"])
+
+    assert job["status"] == "succeeded", job
+    anomalies = (await client.get("/api/v1/trucks/anomalies", params={"flag": "flatline"})).json()["data"]
+    assert board_number in {anomaly["board_number"] for anomaly in anomalies}
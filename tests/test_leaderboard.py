@@ -0,0 +1,79 @@
+"""
+    Самые перегруженные самосвалы: индексированная куча (app.utils.indexed_heap)
+    и GET /trucks/top-overloaded из состояния парка в памяти.
+"""
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.db.models import DumpTruck, ModelTruck
+from app.db.session import AsyncSessionLocal
+from app.utils.indexed_heap import IndexedHeap
+
+TOP = "/api/v1/trucks/top-overloaded"
+
+
+def test_heap_matches_sorted():
+    rng = random.Random(3)
+    heap = IndexedHeap()
+    heap.build((rng.random(), item) for item in range(200))
+    keys = {item: key for key, item in heap.smallest(200)}
+
+    for _ in range(2000):
+        item = rng.randrange(300)
+        if rng.random() < 0.25:
+            heap.discard(item)
+            keys.pop(item, None)
+        else:
+            key = rng.random()
+            heap.set(item, key)
+            keys[item] = key
+        assert len(heap) == len(keys)
+
+    expected = sorted((key, item) for item, key in keys.items())
+    assert heap.smallest(len(keys) + 10) == expected
+    assert heap.smallest(15) == expected[:15]
+    assert all(item in heap for item in keys)
+
+
+async def _overloaded_from_db():
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(DumpTruck.id, DumpTruck.current_weight, ModelTruck.max_capacity)
+            .join(ModelTruck, DumpTruck.model_id == ModelTruck.id)
+            .where(DumpTruck.current_weight > ModelTruck.max_capacity)
+        )
+        return {row.id: row.current_weight / row.max_capacity for row in rows}
+
+
+async def _top(client, n: int = 100):
+    response = await client.get(TOP, params={"n": n})
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+@pytest.mark.anyio
+async def test_top_overloaded_matches_db(client):
+    expected = await _overloaded_from_db()
+    top = await _top(client)
+
+    assert all(truck["is_overloaded"] for truck in top)
+    ratios = [expected[truck["id"]] for truck in top]
+    assert ratios == sorted(ratios, reverse=True)
+    assert len(top) == min(len(expected), 100)
+    # Ни один самосвал за пределами ответа не перегружен сильнее последнего в нем
+    outside = [ratio for truck_id, ratio in expected.items() if truck_id not in {truck["id"] for truck in top}]
+    assert not outside or max(outside) <= ratios[-1]
+
+
+@pytest.mark.anyio
+async def test_top_overloaded_follows_updates(client):
+    leader = (await _top(client, 1))[0]
+    body = {"model_id": leader["model_id"], "board_number": leader["board_number"]}
+
+    await client.put(f"/api/v1/trucks/{leader['id']}", json={**body, "current_weight": 0})
+    assert leader["id"] not in {truck["id"] for truck in await _top(client)}
+
+    await client.put(f"/api/v1/trucks/{leader['id']}", json={**body, "current_weight": leader["current_weight"]})
+    assert (await _top(client, 1))[0]["id"] == leader["id"]
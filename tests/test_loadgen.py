@@ -0,0 +1,56 @@
+"""
+    Генератор смешанной нагрузки (benchmarks.loadgen): статистика операций, проверка SLO
+    и короткий прогон против приложения через ASGI.
+"""
+import random
+
+import pytest
+
+from benchmarks.loadgen import DISPATCHER_MIX, LoadGenerator, OperationStats, _parse_mix, load_fleet, within_slo
+
+
+def _stats(name: str, latencies_ms, errors=None) -> OperationStats:
+    stats = OperationStats(name)
+    stats.latencies = [value / 1000 for value in latencies_ms]
+    stats.errors.update(errors or {})
+    return stats
+
+
+def test_parse_mix():
+    mix = _parse_mix(DISPATCHER_MIX)
+
+    assert [name for name, _ in mix] == ["list", "filter_board", "filter_model", "detail", "models"]
+    assert sum(weight for _, weight in mix) == pytest.approx(1.0)
+
+
+def test_operation_summary():
+    summary = _stats("detail", range(1, 101), {"503": 25}).summary()
+
+    assert (summary["requests"], summary["error_rate"]) == (125, 0.2)
+    assert (summary["p50_ms"], summary["p99_ms"], summary["max_ms"]) == (50, 99, 100)
+    assert summary["errors"] == {"503": 25}
+
+
+@pytest.mark.parametrize("latencies, errors, reason", [
+    ([10] * 100, {}, None),
+    ([10] * 98 + [500, 500], {}, "p99"),
+    ([10] * 100, {"timeout": 5}, "доля ошибок"),
+])
+def test_within_slo(latencies, errors, reason):
+    stats = {"list": _stats("list", latencies), "detail": _stats("detail", [], errors)}
+
+    result = within_slo(stats, slo_p99_ms=300, max_error_rate=0.01)
+
+    assert result is None if reason is None else result.startswith(reason)
+
+
+@pytest.mark.anyio
+async def test_short_run(client):
+    fleet = await load_fleet(client, "/api/v1", trucks=50)
+    generator = LoadGenerator(client, "/api/v1", fleet, _parse_mix(DISPATCHER_MIX), random.Random(1))
+
+    stats = await generator.run(truck_rate=100, dispatcher_rate=100, duration=0.3)
+
+    assert "weight_update" in stats
+    assert all(not item.errors for item in stats.values()), {name: item.errors for name, item in stats.items()}
+    assert sum(item.count for item in stats.values()) > 20
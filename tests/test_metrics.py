@@ -0,0 +1,65 @@
+"""
+    Метрики Prometheus (app.utils.metrics, GET /metrics) и их отключение (metrics_enabled).
+"""
+import pytest
+
+from app.config import settings
+from app.utils.metrics import (
+    MetricsRegistry, db_query_duration, response_serialize_duration, service_call_duration,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def _total(histogram) -> int:
+    return sum(child.count for child in histogram._children.values())
+
+
+async def test_render_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Задачи", ("kind",))
+    histogram = registry.histogram("wait_seconds", "Ожидание", buckets=(0.1, 1.0))
+    counter.labels('exp"ort').inc(2)
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="exp\\"ort"} 2' in lines
+    assert [line for line in lines if line.startswith("wait_seconds_")] == [
+        'wait_seconds_bucket{le="0.1"} 1',
+        'wait_seconds_bucket{le="1"} 3',
+        'wait_seconds_bucket{le="+Inf"} 4',
+        "wait_seconds_sum 4.05",
+        "wait_seconds_count 4",
+    ]
+
+
+async def test_duplicate_metric_rejected():
+    registry = MetricsRegistry()
+    registry.gauge("size", "Размер")
+    with pytest.raises(ValueError):
+        registry.counter("size", "Размер")
+
+
+async def test_endpoint_uses_route_template(client):
+    await client.get("/api/v1/trucks/1")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/api/v1/trucks/{truck_id}",status="200"}' in response.text
+    assert 'route="/api/v1/trucks/1"' not in response.text
+
+
+async def test_disabled_metrics_not_updated(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    histograms = (db_query_duration, service_call_duration, response_serialize_duration)
+    before = [_total(histogram) for histogram in histograms]
+
+    response = await client.get("/api/v1/trucks/", params={"per_page": 5})
+
+    assert response.status_code == 200
+    assert [_total(histogram) for histogram in histograms] == before
@@ -0,0 +1,56 @@
+"""
+    Версионирование схемы (app.db.migrations): новая БД, повторный запуск, БД до версионирования.
+"""
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import SCHEMA_VERSION, current_version, migrate, schema_version
+from app.db.models import ChangeLogState
+from app.db.session import Base
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/migrations.sqlite3")
+    yield engine
+    await engine.dispose()
+
+
+async def _tables(engine):
+    async with engine.connect() as conn:
+        return set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+
+
+async def test_new_database(engine):
+    assert await current_version(engine) is None
+
+    assert await migrate(engine) is None
+
+    assert await current_version(engine) == SCHEMA_VERSION
+    assert set(Base.metadata.tables) <= await _tables(engine)
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(ChangeLogState.purged_seq).where(ChangeLogState.id == 1)) == 0
+
+
+async def test_warm_start_skips_migrations(engine, capsys):
+    await migrate(engine)
+    capsys.readouterr()
+
+    assert await migrate(engine) == SCHEMA_VERSION
+    assert capsys.readouterr().out == ""
+    async with engine.connect() as conn:
+        assert (await conn.execute(select(schema_version.c.version))).scalars().all() == [SCHEMA_VERSION]
+
+
+async def test_database_before_versioning(engine):
+    # Схема, созданная create_all до появления schema_version: миграции идемпотентны
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    assert await migrate(engine) is None
+    assert await current_version(engine) == SCHEMA_VERSION
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(ChangeLogState.id).where(ChangeLogState.id == 1)) == 1
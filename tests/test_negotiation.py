@@ -0,0 +1,60 @@
+"""
+    Согласование формата ответа и тела запроса: MessagePack и JSON (app.api.negotiation).
+"""
+import msgpack
+import pytest
+
+from app.api.negotiation import negotiate
+
+pytestmark = pytest.mark.anyio
+
+TRUCKS = "/api/v1/trucks"
+MSGPACK = "application/msgpack"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", "msgpack"),
+    ("application/json, application/x-msgpack;q=0.5", "json"),
+    ("application/json;q=0.5, application/x-msgpack", "msgpack"),
+    ("application/msgpack, application/json", "json"),
+    ("application/msgpack;q=0.9, */*;q=0.1", "msgpack"),
+    ("application/msgpack;q=0", "json"),
+    ("*/*", "json"),
+    (None, "json"),
+])
+async def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+async def test_list_same_content_as_json(client):
+    params = {"per_page": 5}
+    as_json = await client.get(f"{TRUCKS}/", params=params)
+    as_msgpack = await client.get(f"{TRUCKS}/", params=params, headers={"Accept": MSGPACK})
+
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+
+
+async def test_create_from_msgpack_body(client, board_number):
+    body = msgpack.packb({"model_id": 1, "board_number": board_number, "current_weight": 7})
+    response = await client.post(
+        f"{TRUCKS}/", content=body, headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+    )
+
+    assert response.status_code == 201
+    data = msgpack.unpackb(response.content)["data"]
+    assert (data["board_number"], data["current_weight"]) == (board_number, 7)
+
+
+async def test_error_in_msgpack(client):
+    response = await client.get(f"{TRUCKS}/999999999", headers={"Accept": MSGPACK})
+
+    assert response.status_code == 404
+    assert response.headers["content-type"] == MSGPACK
+    assert "error" in msgpack.unpackb(response.content)
+
+
+async def test_invalid_msgpack_body(client):
+    response = await client.post(f"{TRUCKS}/", content=b"\xc1", headers={"Content-Type": MSGPACK})
+
+    assert 400 <= response.status_code < 500
@@ -0,0 +1,49 @@
+"""
+    Профилирование запросов по требованию (ProfilingMiddleware, /admin/profiles).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+
+pytestmark = pytest.mark.anyio
+
+PROFILES = "/api/v1/admin/profiles"
+
+
+async def test_profile_saved(client):
+    response = await client.get("/api/v1/trucks/1", headers={"X-Profile": "1", "X-Profile-Memory": "1"})
+
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    listed = {profile["id"]: profile for profile in (await client.get(PROFILES)).json()["data"]}
+    assert datetime.fromisoformat(listed[profile_id]["created_at"]).utcoffset() == timedelta(0)
+
+    summary = await client.get(f"{PROFILES}/{profile_id}/summary", params={"sort": "tottime", "limit": 5})
+    assert summary.status_code == 200
+    assert "function calls" in summary.text
+    assert (await client.get(f"{PROFILES}/{profile_id}/memory")).status_code == 200
+    assert (await client.get(f"{PROFILES}/{profile_id}")).content
+
+
+async def test_not_profiled_without_header(client):
+    response = await client.get("/api/v1/trucks/1")
+
+    assert "x-profile-id" not in response.headers
+
+
+async def test_profiling_requires_admin_access(client, monkeypatch):
+    monkeypatch.setattr(settings, "debug", False)
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+    denied = await client.get("/api/v1/trucks/1", headers={"X-Profile": "1", "X-Admin-Token": "wrong"})
+    allowed = await client.get("/api/v1/trucks/1", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+
+    assert "x-profile-id" not in denied.headers
+    assert "x-profile-id" in allowed.headers
+    assert (await client.get(PROFILES)).status_code == 403
+
+
+async def test_unknown_profile(client):
+    assert (await client.get(f"{PROFILES}/missing/summary")).status_code == 404
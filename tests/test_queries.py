@@ -0,0 +1,51 @@
+"""
+    Заранее построенные запросы (app.core.crud.queries): один объект на набор фильтров
+    и повторное использование скомпилированной формы при других значениях параметров.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from app.core.crud.queries import trucks_count_stmt, trucks_page_stmt, truck_filter_params
+from app.core.crud.truck import get_trucks_list
+from app.db.session import AsyncSessionLocal, engine
+
+pytestmark = pytest.mark.anyio
+
+
+@contextmanager
+def cache_hits():
+    """ Попадания в кэш компиляции SQLAlchemy для каждого выполненного запроса """
+    hits = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        hits.append(context.cache_hit == CACHE_HIT)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", listener)
+    try:
+        yield hits
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", listener)
+
+
+async def test_statement_built_once_per_filter_set():
+    flags, params = truck_filter_params("bl", None)
+
+    assert flags == (True, False)
+    assert params == {"board_pattern": "%bl%"}
+    assert trucks_page_stmt(*flags) is trucks_page_stmt(True, False)
+    assert trucks_count_stmt(*flags) is not trucks_count_stmt(False, False)
+
+
+async def test_compiled_form_reused(app):
+    async with AsyncSessionLocal() as db:
+        await get_trucks_list(db, board_number="BL", skip=0, limit=5)
+        with cache_hits() as hits:
+            trucks, total = await get_trucks_list(db, board_number="km", skip=5, limit=10)
+
+    assert hits and all(hits)
+    # ILIKE: фильтр не зависит от регистра
+    assert trucks and all("KM" in truck.board_number for truck in trucks)
+    assert total >= len(trucks)
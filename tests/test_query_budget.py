@@ -0,0 +1,84 @@
+"""
+    Бюджет SQL-запросов основных эндпоинтов самосвалов (фикстура query_budget).
+
+    Лишний запрос — повторный refresh после вставки, перевыборка после изменения,
+    N+1 при чтении списка — роняет тест со списком выполненных запросов.
+    Бюджеты — для SQLite с групповой фиксацией: операция писателя открывает SAVEPOINT.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+TRUCKS = "/api/v1/trucks"
+
+
+async def _create(client, board_number: str, model_id: int = 1, weight: int = 10) -> dict:
+    response = await client.post(f"{TRUCKS}/", json={
+        "model_id": model_id, "board_number": board_number, "current_weight": weight,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+
+@pytest.mark.parametrize("per_page", [10, 100])
+async def test_list_trucks(client, query_budget, per_page):
+    # Счетчик, страница и по запросу на связи — независимо от размера страницы
+    with query_budget(4):
+        response = await client.get(f"{TRUCKS}/", params={"per_page": per_page})
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == per_page
+
+
+async def test_list_trucks_filtered(client, query_budget):
+    with query_budget(4):
+        response = await client.get(f"{TRUCKS}/", params={"board_number": "VL", "per_page": 20})
+
+    assert response.status_code == 200
+
+
+async def test_get_truck(client, query_budget, board_number):
+    truck = await _create(client, board_number)
+
+    with query_budget(3):
+        response = await client.get(f"{TRUCKS}/{truck['id']}")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["board_number"] == board_number
+
+
+async def test_create_truck(client, query_budget, board_number):
+    # Модель, уникальность номера, INSERT ... RETURNING, журнал изменений — без refresh
+    with query_budget(5):
+        truck = await _create(client, board_number)
+
+    assert truck["model"]["id"] == 1
+    assert truck["anomaly_flags"] == []
+    assert "created_at" in truck and "updated_at" in truck
+
+
+async def test_update_truck(client, query_budget, board_number):
+    truck = await _create(client, board_number)
+
+    # Смена модели и веса: выборка самосвала, новая модель, показание веса, UPDATE ... RETURNING,
+    # журнал — без перевыборки самосвала со связями
+    with query_budget(8):
+        response = await client.put(f"{TRUCKS}/{truck['id']}", json={
+            "model_id": 2, "board_number": board_number, "current_weight": 12,
+        })
+
+    assert response.status_code == 200
+    updated = response.json()["data"]
+    assert updated["model_id"] == updated["model"]["id"] == 2
+    assert updated["current_weight"] == 12
+    assert updated["updated_at"] is not None
+
+
+async def test_delete_truck(client, query_budget, board_number):
+    truck = await _create(client, board_number)
+
+    with query_budget(8):
+        response = await client.delete(f"{TRUCKS}/{truck['id']}")
+
+    assert response.status_code == 200
+    assert (await client.get(f"{TRUCKS}/{truck['id']}")).status_code == 404
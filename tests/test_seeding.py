@@ -0,0 +1,96 @@
+"""
+    Генератор синтетического парка (app.core.seeding): детерминизм по зерну, доля перегруза,
+    дополнение существующего парка и история веса.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.seeding import seed_fleet
+from app.db.migrations import migrate
+from app.db.models import DumpTruck, ModelTruck, WeightSample
+
+pytestmark = pytest.mark.anyio
+
+HISTORY_END = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+async def new_engine(tmp_path):
+    engines = []
+
+    async def create(name: str = "seed"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/{name}.sqlite3")
+        engines.append(engine)
+        await migrate(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _trucks(engine):
+    async with engine.connect() as conn:
+        return (await conn.execute(
+            select(DumpTruck.id, DumpTruck.model_id, DumpTruck.board_number, DumpTruck.current_weight)
+            .order_by(DumpTruck.id)
+        )).all()
+
+
+async def test_same_seed_same_fleet(new_engine):
+    fleets = []
+    for name in ("first", "second"):
+        engine = await new_engine(name)
+        report = await seed_fleet(engine, models=10, trucks=500, seed=7)
+        assert (report["models"], report["trucks"]) == (10, 500)
+        fleets.append(await _trucks(engine))
+
+    assert fleets[0] == fleets[1]
+    other = await new_engine("other")
+    await seed_fleet(other, models=10, trucks=500, seed=8)
+    assert await _trucks(other) != fleets[0]
+
+
+async def test_overload_ratio(new_engine):
+    engine = await new_engine()
+    await seed_fleet(engine, models=20, trucks=4000, overload_ratio=0.25)
+
+    async with engine.connect() as conn:
+        overloaded = await conn.scalar(
+            select(func.count()).select_from(DumpTruck)
+            .join(ModelTruck, DumpTruck.model_id == ModelTruck.id)
+            .where(DumpTruck.current_weight > ModelTruck.max_capacity)
+        )
+    # Перегруз не задевает только модели, у которых предел веса меньше грузоподъемности
+    assert 0.2 < overloaded / 4000 <= 0.26
+
+
+async def test_extends_existing_fleet(new_engine):
+    engine = await new_engine()
+    await seed_fleet(engine, models=5, trucks=100)
+
+    report = await seed_fleet(engine, models=8, trucks=50, seed=1)
+
+    assert (report["models"], report["trucks"]) == (3, 50)
+    trucks = await _trucks(engine)
+    assert [row.id for row in trucks] == list(range(1, 151))
+    assert len({row.board_number for row in trucks}) == 150
+
+
+async def test_history_ends_with_current_weight(new_engine):
+    engine = await new_engine()
+    report = await seed_fleet(
+        engine, models=4, trucks=30, history=12, history_interval=timedelta(minutes=10), history_end=HISTORY_END,
+    )
+
+    assert report["weight_samples"] == 30 * 12
+    async with engine.connect() as conn:
+        last = dict((await conn.execute(
+            select(WeightSample.truck_id, WeightSample.weight).where(WeightSample.recorded_at == HISTORY_END)
+        )).all())
+        first = await conn.scalar(select(func.min(WeightSample.recorded_at)))
+    assert last == {row.id: row.current_weight for row in await _trucks(engine)}
+    assert first == HISTORY_END - timedelta(minutes=110)
@@ -0,0 +1,151 @@
+"""
+    Объединение одинаковых одновременных чтений (app.core.singleflight).
+"""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight, read_coalescer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def read():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return object()
+
+    callers = [asyncio.create_task(flight.do("key", read)) for _ in range(5)]
+    other = asyncio.create_task(flight.do("other", read))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*callers)
+    assert all(result is results[0] for result in results)
+    assert await other is not results[0]
+    assert started == 2
+    assert flight.stats() == {
+        "calls": 6, "executions": 2, "coalesced": 4, "cancelled": 0, "aborted": 0, "invalidated": 0,
+        "in_flight": 0,
+    }
+
+
+async def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("ошибка чтения")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["executions"] == 1
+
+
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def read():
+        await release.wait()
+        return "ok"
+
+    leaving = asyncio.create_task(flight.do("key", read))
+    staying = asyncio.create_task(flight.do("key", read))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == "ok"
+    assert leaving.cancelled()
+    assert flight.stats()["cancelled"] == 1
+
+
+async def test_query_aborted_when_all_callers_leave():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def read():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(flight.do("key", read))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    stats = flight.stats()
+    assert (stats["aborted"], stats["in_flight"]) == (1, 0)
+
+
+async def test_next_call_after_completion_runs_again():
+    flight = SingleFlight()
+    runs = 0
+
+    async def read():
+        nonlocal runs
+        runs += 1
+        return runs
+
+    assert await flight.do("key", read) == 1
+    assert await flight.do("key", read) == 2
+
+
+async def test_invalidated_call_not_joined():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+
+    async def read():
+        nonlocal runs
+        runs += 1
+        version = runs
+        await release.wait()
+        return version
+
+    before = asyncio.create_task(flight.do(("trucks.get", 1), read))
+    other = asyncio.create_task(flight.do(("models.get", 1), read))
+    await asyncio.sleep(0)
+    assert flight.invalidate(("trucks.", "fleet.")) == 1
+    after = asyncio.create_task(flight.do(("trucks.get", 1), read))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await before, await other, await after) == (1, 2, 3)
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_committed_write_detaches_older_read(client, board_number):
+    """ Чтение, начатое после фиксации записи, не присоединяется к чтению, начатому до нее """
+    truck = {"model_id": 1, "board_number": board_number, "current_weight": 10}
+    truck_id = (await client.post("/api/v1/trucks/", json=truck)).json()["data"]["id"]
+    release = asyncio.Event()
+    runs = 0
+
+    async def read():
+        nonlocal runs
+        runs += 1
+        version = runs
+        await release.wait()
+        return version
+
+    key = ("trucks.get", truck_id)
+    before = asyncio.create_task(read_coalescer.do(key, read))
+    await asyncio.sleep(0)
+    assert (await client.put(f"/api/v1/trucks/{truck_id}", json={**truck, "current_weight": 20})).status_code == 200
+    after = asyncio.create_task(read_coalescer.do(key, read))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await before, await after) == (1, 2)
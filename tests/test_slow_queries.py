@@ -0,0 +1,61 @@
+"""
+    Журнал медленных запросов (app.db.slow_queries): отпечатки, скрытие параметров, EXPLAIN.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal
+from app.db.slow_queries import fingerprint, slow_query_log
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT *\n  FROM t WHERE id = 15", "SELECT * FROM t WHERE id = ?"),
+    ("SELECT * FROM t WHERE name = 'O''Brien' AND w > 1.5", "SELECT * FROM t WHERE name = ? AND w > ?"),
+    ("SELECT * FROM t WHERE id IN (?, ?, ?)", "SELECT * FROM t WHERE id IN (?)"),
+    ("SELECT * FROM t WHERE id = :truck_id OR id = %(other)s OR id = $1", "SELECT * FROM t WHERE id = ? OR id = ? OR id = ?"),
+])
+async def test_fingerprint(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+@pytest.fixture
+def log_everything(monkeypatch):
+    """ Каждый запрос — медленный """
+    monkeypatch.setattr(slow_query_log, "threshold", 0.0)
+    slow_query_log.reset()
+    yield slow_query_log
+    slow_query_log.reset()
+
+
+async def _entry(log, marker: str) -> dict:
+    await log.aclose()
+    entries = [entry for entry in log.entries() if marker in entry["statement"]]
+    assert len(entries) == 1
+    return entries[0]
+
+
+async def test_table_scan_flagged(app, log_everything, monkeypatch):
+    monkeypatch.setattr(log_everything, "redact_params", True)
+    async with AsyncSessionLocal() as db:
+        for weight in (100, 200):
+            await db.execute(text("SELECT id FROM dump_trucks WHERE current_weight > :w /* scan */"), {"w": weight})
+
+    entry = await _entry(log_everything, "/* scan */")
+    assert entry["count"] == 2
+    assert entry["table_scan"] is True
+    # Значения параметров скрыты
+    assert entry["last_params"] == ["<int>"]
+
+
+async def test_index_lookup_not_flagged(app, log_everything):
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT board_number FROM dump_trucks WHERE id = :id /* pk */"), {"id": 1})
+
+    entry = await _entry(log_everything, "/* pk */")
+    assert entry["table_scan"] is False
+    assert entry["plan"]
+    assert datetime.fromisoformat(entry["last_seen"]).utcoffset() == timedelta(0)
@@ -0,0 +1,66 @@
+"""
+    Пометка прерванных фоновых задач при запуске (app.core.startup): процесс, запущенный
+    рядом с работающим, не трогает его задачи; после остановки всех процессов — помечает.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.core import startup
+from app.db.models import Job
+from app.db.session import AsyncSessionLocal
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(startup.fcntl is None, reason="файловые блокировки только с fcntl"),
+]
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _running_job() -> str:
+    async with AsyncSessionLocal() as db:
+        job = Job(id=uuid.uuid4().hex, kind="export", status="running", params={})
+        db.add(job)
+        await db.commit()
+        return job.id
+
+
+async def _status(job_id: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return (await db.get(Job, job_id)).status
+
+
+async def _start_process() -> None:
+    """ Подготовка БД в отдельном процессе — как запуск соседнего воркера """
+    code = "import asyncio; from app.core.startup import prepare_database; asyncio.run(prepare_database())"
+    result = await asyncio.to_thread(
+        subprocess.run, [sys.executable, "-c", code], cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+async def test_live_process_jobs_are_kept(app):
+    # Процесс тестов работает: его разделяемая блокировка взята при запуске приложения
+    assert startup._alive_file is not None
+    job_id = await _running_job()
+
+    await _start_process()
+
+    assert await _status(job_id) == "running"
+
+
+async def test_jobs_failed_when_no_process_alive(app):
+    job_id = await _running_job()
+    startup.fcntl.flock(startup._alive_file.fileno(), startup.fcntl.LOCK_UN)
+    try:
+        await _start_process()
+    finally:
+        startup.fcntl.flock(startup._alive_file.fileno(), startup.fcntl.LOCK_SH)
+
+    assert await _status(job_id) == "failed"
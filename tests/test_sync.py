@@ -0,0 +1,102 @@
+"""
+    Синхронизация самосвалов с эталонным списком (PUT /trucks/sync, app.core.crud.truck.sync_trucks).
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.crud.idempotency import get_idempotency_record
+from app.core.crud.truck import sync_trucks
+from app.db.models import DumpTruck
+from app.db.session import AsyncSessionLocal
+from app.schemas import TruckSyncItemSchema
+
+pytestmark = pytest.mark.anyio
+
+SYNC = "/api/v1/trucks/sync"
+
+
+async def _sync(client, trucks, headers=None, status_code=200):
+    response = await client.put(SYNC, json={"trucks": trucks}, headers=headers)
+    assert response.status_code == status_code, response.text
+    return response
+
+
+def _summary(response) -> tuple:
+    data = response.json()["data"]
+    return data["inserted"], data["updated"], data["unchanged"]
+
+
+async def test_sync_is_idempotent(client):
+    trucks = [{"board_number": f"SYN{i:03d}", "model_id": 1 + i % 2, "current_weight": i} for i in range(20)]
+
+    assert _summary(await _sync(client, trucks)) == (20, 0, 0)
+    assert _summary(await _sync(client, trucks)) == (0, 0, 20)
+
+    trucks[0]["current_weight"] = 99
+    trucks[1]["model_id"] = 2 if trucks[1]["model_id"] == 1 else 1
+    # Без веса у существующего вес не меняется
+    del trucks[2]["current_weight"]
+    assert _summary(await _sync(client, trucks)) == (0, 2, 18)
+
+
+async def test_idempotency_key_replays_result(client):
+    trucks = [{"board_number": "SYNKEY1", "model_id": 1, "current_weight": 3}]
+    headers = {"Idempotency-Key": "sync-test-1"}
+
+    first = await _sync(client, trucks, headers)
+    replay = await _sync(client, trucks, headers)
+
+    assert "idempotent-replayed" not in first.headers
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json()["data"] == first.json()["data"]
+
+    # Тот же ключ с другим списком
+    await _sync(client, [{**trucks[0], "current_weight": 4}], headers, status_code=422)
+
+
+async def test_idempotency_key_race(client, monkeypatch):
+    """ Параллельный запрос с тем же ключом не нашел запись при проверке: ответ — повтор, изменения откатываются """
+    trucks = [{"board_number": "SYNKEY2", "model_id": 1, "current_weight": 3}]
+    headers = {"Idempotency-Key": "sync-test-2"}
+    first = await _sync(client, trucks, headers)
+
+    missed = []
+
+    async def miss_first_lookup(db, scope, key):
+        if not missed:
+            missed.append(key)
+            return None
+        return await get_idempotency_record(db, scope, key)
+
+    monkeypatch.setattr("app.services.truck.get_idempotency_record", miss_first_lookup)
+    replay = await _sync(client, trucks, headers)
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json()["data"] == first.json()["data"]
+
+    missed.clear()
+    await _sync(client, [{**trucks[0], "current_weight": 4}], headers, status_code=422)
+    async with AsyncSessionLocal() as db:
+        weight = await db.scalar(select(DumpTruck.current_weight).where(DumpTruck.board_number == "SYNKEY2"))
+    assert weight == 3
+
+
+async def test_unknown_model(client):
+    await _sync(client, [{"board_number": "SYNBAD", "model_id": 999999}], status_code=404)
+
+
+async def test_duplicate_board_numbers(client):
+    trucks = [{"board_number": "SYNDUP", "model_id": 1}, {"board_number": "SYNDUP", "model_id": 2}]
+    await _sync(client, trucks, status_code=422)
+
+
+async def test_delete_missing(app):
+    async with AsyncSessionLocal() as db:
+        fleet = (await db.execute(select(DumpTruck.board_number, DumpTruck.model_id))).all()
+        items = [TruckSyncItemSchema(board_number=row.board_number, model_id=row.model_id) for row in fleet[1:]]
+
+        summary = await sync_trucks(db, items, delete_missing=True)
+
+        assert (summary["deleted"], summary["unchanged"]) == (1, len(fleet) - 1)
+        assert await db.scalar(select(DumpTruck.id).where(DumpTruck.board_number == fleet[0].board_number)) is None
+        # Парк общий для всех тестов — изменения не фиксируются
+        await db.rollback()
@@ -0,0 +1,63 @@
+"""
+    Трассировка запросов (app.utils.tracing, TracingMiddleware): распространение traceparent,
+    дерево участков api -> сервис -> SQL, экспорт в OTLP JSON.
+"""
+import json
+
+import pytest
+
+from app.utils.tracing import NOOP_SPAN, Span, TraceExporter, exporter, start_span
+
+pytestmark = pytest.mark.anyio
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def _traceparent(flags: str = "01") -> str:
+    return f"00-{TRACE_ID}-00f067aa0ba902b7-{flags}"
+
+
+async def test_sampled_request_builds_span_tree(client):
+    response = await client.get("/api/v1/trucks/1", headers={"traceparent": _traceparent()})
+
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+    spans = exporter.trace(TRACE_ID)
+    by_id = {span["span_id"]: span for span in spans}
+    root = next(span for span in spans if span["parent_id"] == "00f067aa0ba902b7")
+    assert root["name"] == "GET /api/v1/trucks/{truck_id}"
+    assert root["attributes"]["http.status_code"] == 200
+    assert any(span["name"].startswith("SQL SELECT") for span in spans)
+    # Каждый участок, кроме корневого, вложен в участок той же трассировки
+    assert all(span["parent_id"] in by_id for span in spans if span is not root)
+
+
+@pytest.mark.parametrize("headers", [{"traceparent": _traceparent("00")}, {}, {"traceparent": "garbage"}])
+async def test_unsampled_request_has_no_trace(client, headers):
+    # sample_ratio по умолчанию 0: без выборки во входящем заголовке трассировка не ведется
+    response = await client.get("/api/v1/trucks/1", headers=headers)
+
+    assert "traceparent" not in response.headers
+
+
+async def test_no_span_outside_trace():
+    assert start_span("вне запроса") is NOOP_SPAN
+
+
+async def test_otlp_export(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    local = TraceExporter(buffer_size=10, otlp_file=str(path), batch_size=2)
+    root = Span("root", TRACE_ID, None)
+    child = Span("child", TRACE_ID, root.span_id)
+    child.set_attribute("rows", 3)
+    for span in (child, root):
+        span.end_ns = span.start_ns + 1000
+        local.export(span)
+
+    request = json.loads(path.read_text(encoding="utf-8"))
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["child", "root"]
+    assert spans[0]["parentSpanId"] == root.span_id
+    assert spans[0]["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
+    assert "parentSpanId" not in spans[1]
+    summary = local.traces()
+    assert [(trace["trace_id"], trace["name"], trace["spans"]) for trace in summary] == [(TRACE_ID, "root", 2)]
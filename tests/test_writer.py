@@ -0,0 +1,91 @@
+"""
+    Писатель с групповой фиксацией (app.db.writer): каждая операция пакета — в своей точке
+    сохранения, ошибка одной не откатывает и не повторяет остальные.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.crud import changes
+from app.core.crud.truck import create_truck
+from app.db.models import ChangeLogEntry, DumpTruck
+from app.db.session import AsyncSessionLocal
+from app.db.writer import group_writer
+from app.schemas import DumpTruckCreateSchema
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create(db, board_number: str) -> int:
+    truck = await create_truck(db, DumpTruckCreateSchema(model_id=1, board_number=board_number, current_weight=5))
+    return truck.id
+
+
+async def _create_and_fail(db, board_number: str) -> None:
+    await _create(db, board_number)
+    raise RuntimeError("сбой операции")
+
+
+async def _count(model, *where) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(model).where(*where))
+
+
+@pytest.fixture
+def published():
+    """ Бортовые номера самосвалов из изменений, опубликованных после фиксации """
+    boards = []
+
+    def listener(rows):
+        boards.extend(row["data"]["board_number"] for row in rows if row["entity"] == changes.TRUCK)
+
+    changes.subscribe(listener)
+    yield boards
+    changes._listeners.remove(listener)
+
+
+async def test_failed_operation_rolls_back_alone(app, published):
+    before = group_writer.stats()
+    boards = [f"WRB{i}" for i in range(9)]
+    results = await asyncio.gather(
+        *(
+            group_writer.submit(_create_and_fail if i % 3 == 1 else _create, board_number=board)
+            for i, board in enumerate(boards)
+        ),
+        return_exceptions=True,
+    )
+
+    ok = [board for board, result in zip(boards, results) if not isinstance(result, Exception)]
+    assert [isinstance(result, RuntimeError) for result in results] == [i % 3 == 1 for i in range(9)]
+    assert await _count(DumpTruck, DumpTruck.board_number.like("WRB%")) == len(ok)
+    assert await _count(ChangeLogEntry, ChangeLogEntry.data["board_number"].as_string().like("WRB%")) == len(ok)
+    assert sorted(published) == sorted(ok)
+
+    stats = group_writer.stats()
+    assert stats["failed"] - before["failed"] == 3
+    # Успешные операции не выполнялись повторно
+    assert stats["retried"] == before["retried"]
+
+
+async def test_commit_failure_retries_each_operation(app, published, monkeypatch):
+    commit = AsyncSession.commit
+    calls = 0
+
+    async def flaky_commit(self):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("ошибка фиксации")
+        return await commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", flaky_commit)
+    before = group_writer.stats()
+    boards = [f"WRC{i}" for i in range(4)]
+    results = await asyncio.gather(*(group_writer.submit(_create, board_number=board) for board in boards))
+
+    assert all(isinstance(truck_id, int) for truck_id in results)
+    assert await _count(DumpTruck, DumpTruck.board_number.like("WRC%")) == 4
+    assert sorted(published) == boards
+    assert group_writer.stats()["retried"] - before["retried"] == 4